@@ -21,16 +21,13 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-from rawscribe.utils.config_loader import ConfigLoader
+from rawscribe.utils.config_loader import config_loader  # shared with routes and auth
 from rawscribe.utils.auth import AuthValidator
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Configure config loader
-config_loader = ConfigLoader()
-
 # Load configuration once at startup
 try:
     config = config_loader.load_config()
@@ -18,7 +18,7 @@ from rawscribe.utils.auth import get_current_user_or_default, get_auth_validator
 from rawscribe.utils.storage_factory import StorageManager
 from rawscribe.utils.storage_base import StorageError, StorageNotFoundError
 from rawscribe.utils.metadata import DraftMetadata
-from rawscribe.utils.config_loader import ConfigLoader
+from rawscribe.utils.config_loader import load_config
 from rawscribe.utils.rbac_enforcement import require_draft_permission, filter_viewable_data
 
 logger = logging.getLogger(__name__)
@@ -91,9 +91,9 @@ async def get_storage_manager(request: Request) -> StorageManager:
         import os
         
         # Load config from the proper source
-        config_loader = ConfigLoader()
-        loaded_config = config_loader.load_config()
-        storage_dict = loaded_config['lambda']['storage']
+        loaded_config = load_config()
+        # Copy so the bucket overrides below don't leak into the shared config
+        storage_dict = dict(loaded_config['lambda']['storage'])
         
         # Ensure all bucket names are configured for deployed environments
         if 'FORMS_BUCKET' in os.environ:
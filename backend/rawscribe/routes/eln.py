@@ -17,7 +17,7 @@ from datetime import datetime
 from rawscribe.utils.storage_factory import StorageManager
 from rawscribe.utils.storage_base import StorageError, StorageNotFoundError, ImmutableStorageError
 from rawscribe.utils.metadata import ELNMetadata, DraftMetadata
-from rawscribe.utils.config_loader import ConfigLoader
+from rawscribe.utils.config_loader import get_storage_config
 from rawscribe.utils.auth import get_current_user, get_current_user_or_default, User
 from rawscribe.utils.eln_access_control import eln_access_control
 from rawscribe.utils.rbac_enforcement import require_submit_permission, require_view_permission, filter_viewable_data
@@ -74,8 +74,8 @@ class ELNListResponse(BaseModel):
 
 # Dependency injection
 async def get_storage_manager() -> StorageManager:
-    config_loader = ConfigLoader()
-    storage_config_dict = config_loader.get_storage_config()
+    # Copy so the bucket overrides below don't leak into the shared config
+    storage_config_dict = dict(get_storage_config())
     
     # Ensure all bucket names are configured for deployed environments
     import os
@@ -330,7 +330,7 @@ async def get_prerequisite_elns(
                 "eln_uuid": metadata.eln_uuid,
                 "filename": metadata.filename,
                 "user_id": metadata.user_id,
-                "timestamp": metadata.timestamp.isoformat(),
+                "timestamp": metadata.iso_timestamp,
                 "form_data": eln_data.get("form_data", {}),
                 "variables": metadata.variables
             })
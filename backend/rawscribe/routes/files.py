@@ -18,7 +18,7 @@ from datetime import datetime, timezone
 from rawscribe.utils.auth import get_current_user_or_default, User
 from rawscribe.utils.storage_factory import StorageManager
 from rawscribe.utils.storage_base import StorageError
-from rawscribe.utils.config_loader import ConfigLoader
+from rawscribe.utils.config_loader import load_config
 from rawscribe.utils.filename_generator import FilenameGenerator
 from rawscribe.utils.file_validation import file_validator, FileValidationError, escape_field_id, unescape_field_id
 
@@ -47,9 +47,9 @@ async def get_storage_manager(request: Request) -> StorageManager:
     if not hasattr(request.app.state, 'storage_manager'):
         import os
         # Load config from the proper source
-        config_loader = ConfigLoader()
-        loaded_config = config_loader.load_config()
-        storage_dict = loaded_config['lambda']['storage']
+        loaded_config = load_config()
+        # Copy so the bucket overrides below don't leak into the shared config
+        storage_dict = dict(loaded_config['lambda']['storage'])
         
         # Ensure all bucket names are configured for deployed environments
         if 'FORMS_BUCKET' in os.environ:
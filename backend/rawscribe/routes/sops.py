@@ -16,7 +16,7 @@ import yaml
 import json
 from pathlib import Path
 
-from rawscribe.utils.config_loader import ConfigLoader
+from rawscribe.utils.config_loader import get_storage_config
 from rawscribe.utils.auth import get_current_user_or_default
 from rawscribe.utils.storage_factory import StorageManager
 from rawscribe.utils.storage_base import StorageError, StorageNotFoundError
@@ -56,8 +56,8 @@ async def get_storage_manager(request: Request) -> StorageManager:
     """Get storage manager from app state or create one"""
     if not hasattr(request.app.state, 'storage_manager'):
         # Create storage manager
-        config_loader = ConfigLoader()
-        storage_dict = config_loader.get_storage_config()
+        # Copy so the bucket overrides below don't leak into the shared config
+        storage_dict = dict(get_storage_config())
         
         # Ensure all bucket names are configured for deployed environments
         if 'FORMS_BUCKET' in os.environ:
@@ -18,7 +18,7 @@ import logging
 from botocore.exceptions import ClientError
 
 from rawscribe.utils.config_loader import config_loader
-from rawscribe.utils.auth import get_current_user
+from rawscribe.utils.auth import get_current_user, User
 
 router = APIRouter(tags=["user-management"])
 logger = logging.getLogger(__name__)
@@ -73,6 +73,20 @@ def check_cognito_only():
         )
 
 
+def require_user_manager(current_user: Optional[User] = Depends(get_current_user)) -> User:
+    """
+    Dependency requiring manage:users permission (ADMINS or LAB_MANAGERS)
+    
+    Rejects anonymous access as well, since get_current_user returns None
+    when auth is disabled.
+    """
+    if current_user is None or not (
+        '*' in current_user.permissions or 'manage:users' in current_user.permissions
+    ):
+        raise HTTPException(status_code=403, detail="Requires manage:users permission")
+    return current_user
+
+
 def get_cognito_client():
     """Get Cognito client with region from auth provider"""
     check_cognito_only()
@@ -119,18 +133,12 @@ def generate_secure_password(length: int = 16) -> str:
 @router.get("/v1/user-management/users/{username}")
 async def get_user(
     username: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: User = Depends(require_user_manager)
 ):
     """
     Get details for a specific user
     Requires manage:users permission (ADMINS or LAB_MANAGERS)
     """
-    # Check user management permission
-    user_permissions = current_user.permissions if hasattr(current_user, 'permissions') else []
-    has_permission = '*' in user_permissions or 'manage:users' in user_permissions
-    if not has_permission:
-        raise HTTPException(status_code=403, detail="Requires manage:users permission")
-    
     try:
         client = get_cognito_client()
         pool_id = get_user_pool_id()
@@ -172,18 +180,12 @@ async def get_user(
 @router.post("/v1/user-management/users", response_model=UserResponse)
 async def create_user(
     request: CreateUserRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: User = Depends(require_user_manager)
 ):
     """
     Create a new Cognito user
     Requires manage:users permission (ADMINS or LAB_MANAGERS)
     """
-    # Check user management permission
-    user_permissions = current_user.permissions if hasattr(current_user, 'permissions') else []
-    has_permission = '*' in user_permissions or 'manage:users' in user_permissions
-    if not has_permission:
-        raise HTTPException(status_code=403, detail="Requires manage:users permission")
-    
     try:
         client = get_cognito_client()
         pool_id = get_user_pool_id()
@@ -240,17 +242,11 @@ async def create_user(
 
 
 @router.post("/v1/user-management/test-users", response_model=List[UserResponse])
-async def create_test_users(current_user: dict = Depends(get_current_user)):
+async def create_test_users(current_user: User = Depends(require_user_manager)):
     """
     Create all default test users
     Requires manage:users permission (ADMINS or LAB_MANAGERS)
     """
-    # Check user management permission
-    user_permissions = current_user.permissions if hasattr(current_user, 'permissions') else []
-    has_permission = '*' in user_permissions or 'manage:users' in user_permissions
-    if not has_permission:
-        raise HTTPException(status_code=403, detail="Requires manage:users permission")
-    
     results = []
     
     for username, user_data in DEFAULT_TEST_USERS.items():
@@ -283,18 +279,12 @@ async def create_test_users(current_user: dict = Depends(get_current_user)):
 
 
 @router.get("/v1/user-management/test-users", response_model=List[Dict])
-async def list_test_users(current_user: dict = Depends(get_current_user)):
+async def list_test_users(current_user: User = Depends(require_user_manager)):
     """
     List all test users with their credentials
     Requires manage:users permission (ADMINS or LAB_MANAGERS)
     WARNING: Returns passwords in plaintext (test users only!)
     """
-    # Check user management permission
-    user_permissions = current_user.permissions if hasattr(current_user, 'permissions') else []
-    has_permission = '*' in user_permissions or 'manage:users' in user_permissions
-    if not has_permission:
-        raise HTTPException(status_code=403, detail="Requires manage:users permission")
-    
     try:
         client = get_cognito_client()
         pool_id = get_user_pool_id()
@@ -341,17 +331,11 @@ async def list_test_users(current_user: dict = Depends(get_current_user)):
 
 
 @router.get("/v1/user-management/groups", response_model=List[Dict])
-async def list_groups(current_user: dict = Depends(get_current_user)):
+async def list_groups(current_user: User = Depends(require_user_manager)):
     """
     List all available Cognito groups with their permissions
     Requires manage:users permission (ADMINS or LAB_MANAGERS)
     """
-    # Check user management permission
-    user_permissions = current_user.permissions if hasattr(current_user, 'permissions') else []
-    has_permission = '*' in user_permissions or 'manage:users' in user_permissions
-    if not has_permission:
-        raise HTTPException(status_code=403, detail="Requires manage:users permission")
-    
     try:
         # Load group definitions from config
         config = config_loader.load_config()
@@ -374,17 +358,11 @@ async def list_groups(current_user: dict = Depends(get_current_user)):
 
 
 @router.delete("/v1/user-management/test-users")
-async def remove_test_users(current_user: dict = Depends(get_current_user)):
+async def remove_test_users(current_user: User = Depends(require_user_manager)):
     """
     Remove all test users
     Requires manage:users permission (ADMINS or LAB_MANAGERS)
     """
-    # Check user management permission
-    user_permissions = current_user.permissions if hasattr(current_user, 'permissions') else []
-    has_permission = '*' in user_permissions or 'manage:users' in user_permissions
-    if not has_permission:
-        raise HTTPException(status_code=403, detail="Requires manage:users permission")
-    
     try:
         client = get_cognito_client()
         pool_id = get_user_pool_id()
@@ -413,7 +391,7 @@ async def remove_test_users(current_user: dict = Depends(get_current_user)):
 
 
 @router.post("/v1/user-management/secure-production")
-async def secure_production(current_user: dict = Depends(get_current_user)):
+async def secure_production(current_user: User = Depends(require_user_manager)):
     """
     Secure production environment:
     1. Remove all test users
@@ -421,12 +399,6 @@ async def secure_production(current_user: dict = Depends(get_current_user)):
     
     Requires manage:users permission (ADMINS or LAB_MANAGERS)
     """
-    # Check user management permission
-    user_permissions = current_user.permissions if hasattr(current_user, 'permissions') else []
-    has_permission = '*' in user_permissions or 'manage:users' in user_permissions
-    if not has_permission:
-        raise HTTPException(status_code=403, detail="Requires manage:users permission")
-    
     # Check environment
     env = config_loader.get_environment()
     if env not in ['prod', 'stage']:
@@ -443,7 +415,7 @@ async def secure_production(current_user: dict = Depends(get_current_user)):
         test_users_result = await remove_test_users(current_user)
         
         # 2. Rotate admin password if admin user exists
-        admin_users = ['admin@example.com', current_user.email if hasattr(current_user, 'email') else None]
+        admin_users = ['admin@example.com', current_user.email]
         new_admin_passwords = {}
         
         for admin_email in admin_users:
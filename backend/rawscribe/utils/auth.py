@@ -9,22 +9,30 @@ Extracts user information from API Gateway Cognito Authorizer context
 with ELN-specific access control and permission management.
 """
 
+import base64
+import atexit
+import hashlib
 import json
 import logging
 import os
-from typing import Optional, Dict, Any, List
-from functools import wraps
+import re
+import threading
+import time
+from typing import Optional, Dict, Any, FrozenSet, Iterable, List, Tuple
 from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 # Import PyJWT for Cognito token validation
 try:
     import jwt
-    from jwt import PyJWKClient
+    from jwt import PyJWKClient, PyJWKClientConnectionError, PyJWKClientError, PyJWKSet
     JWT_AVAILABLE = True
 except ImportError:
     jwt = None
     PyJWKClient = None
+    PyJWKClientConnectionError = None
+    PyJWKClientError = None
+    PyJWKSet = None
     JWT_AVAILABLE = False
     logging.warning("PyJWT library not available - Cognito JWT validation will be limited")
 
@@ -33,6 +41,192 @@ logger = logging.getLogger(__name__)
 # Auth provider types (simplified to 2 providers only)
 AUTH_PROVIDERS = ['cognito', 'jwt']  # Only 2 providers after v3 migration
 
+# Cognito group (lowercased) -> granted permissions
+_ADMIN_PERMISSIONS = frozenset(['*'])  # Full admin access
+_LAB_MANAGER_PERMISSIONS = frozenset(  # Lab managers can manage users
+    ['submit:*', 'view:*', 'draft:*', 'approve:*', 'manage:users'])
+_RESEARCHER_PERMISSIONS = frozenset(  # Researchers can submit and view their own data
+    ['submit:*', 'view:own', 'view:group', 'draft:*'])
+_CLINICIAN_PERMISSIONS = frozenset(  # Clinicians can submit and view their own data
+    ['submit:*', 'view:own', 'draft:*'])
+_DEFAULT_GROUP_PERMISSIONS = frozenset(['view:own'])  # Default: view own data only
+
+_COGNITO_GROUP_PERMISSIONS = {
+    'admin': _ADMIN_PERMISSIONS,
+    'admins': _ADMIN_PERMISSIONS,
+    'lab_manager': _LAB_MANAGER_PERMISSIONS,
+    'lab_managers': _LAB_MANAGER_PERMISSIONS,
+    'researcher': _RESEARCHER_PERMISSIONS,
+    'researchers': _RESEARCHER_PERMISSIONS,
+    'clinician': _CLINICIAN_PERMISSIONS,
+    'clinicians': _CLINICIAN_PERMISSIONS,
+}
+
+# How long the last good JWK set may be served while the JWKS endpoint is unreachable
+JWKS_MAX_STALE_SECONDS = 900
+# Minimum time between forced JWKS re-fetches (unknown kid or bad signature)
+JWKS_FORCED_REFRESH_SECONDS = 30
+
+# Shared keep-alive HTTP session for JWKS fetches (created on first use)
+_jwks_session = None
+_jwks_session_lock = threading.Lock()
+
+def _get_jwks_session():
+    """Get the pooled HTTP session used for JWKS fetches"""
+    global _jwks_session
+    if _jwks_session is None:
+        with _jwks_session_lock:
+            if _jwks_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                atexit.register(session.close)
+                _jwks_session = session
+    return _jwks_session
+
+if JWT_AVAILABLE:
+    class CachingJWKSClient(PyJWKClient):
+        """
+        PyJWKClient that rides out short JWKS endpoint outages
+        
+        Keeps the last successfully fetched JWK set and serves it if a
+        re-fetch fails, for at most max_stale seconds after that fetch.
+        Beyond the window the connection error propagates (fail closed),
+        so rotated-out keys are never trusted indefinitely.
+        
+        Fetches are serialized: auth dependencies run in FastAPI's threadpool,
+        so concurrent requests arriving on a cold or expired cache wait for a
+        single in-flight fetch instead of each hitting the JWKS endpoint.
+        The lock is PyJWT's own client lock (an RLock that get_signing_key
+        already takes), so no second lock is involved. Fetches go through a
+        shared keep-alive session rather than a fresh urllib connection, so
+        refreshes skip the TCP/TLS handshake.
+        
+        An unknown kid or a failed signature check may mean Cognito rotated
+        its keys, so both can force one re-fetch - at most once per
+        refresh_cooldown, so a stream of forged tokens can't hammer the
+        endpoint.
+        """
+        
+        def __init__(self, uri: str, max_stale: float = JWKS_MAX_STALE_SECONDS,
+                     refresh_cooldown: float = JWKS_FORCED_REFRESH_SECONDS, **kwargs):
+            super().__init__(uri, **kwargs)
+            self.max_stale = max_stale
+            self.refresh_cooldown = refresh_cooldown
+            self._last_forced_refresh: Optional[float] = None
+            self._last_good: Optional[Tuple[float, Any]] = None
+            if getattr(self, '_client_lock', None) is None:
+                # PyJWT < 2.14 has no client lock of its own
+                self._client_lock = threading.RLock()
+        
+        def fetch_data(self) -> Any:
+            requested_at = time.monotonic()
+            with self._client_lock:
+                # Another thread completed a fetch while we waited - reuse it
+                if self._last_good is not None and self._last_good[0] >= requested_at:
+                    return self._last_good[1]
+                
+                try:
+                    data = self._fetch_jwk_set()
+                except PyJWKClientConnectionError as e:
+                    if self._last_good is not None:
+                        fetched_at, data = self._last_good
+                        age = time.monotonic() - fetched_at
+                        if age <= self.max_stale:
+                            logger.warning(
+                                f"JWKS fetch failed, serving cached key set ({int(age)}s old): {e}"
+                            )
+                            return data
+                    raise
+                self._last_good = (time.monotonic(), data)
+                return data
+        
+        def get_jwk_set(self, refresh: bool = False) -> Any:
+            # Unlike the base class, never put what fetch_data returned back in
+            # the cache: a stale fallback would get a fresh timestamp and be
+            # served for another lifespan past max_stale
+            if self.jwk_set_cache is not None and not refresh:
+                cached = self.jwk_set_cache.get()
+                if cached is not None:
+                    return cached
+            
+            data = self.fetch_data()
+            # A successful fetch has already cached the parsed set
+            if self.jwk_set_cache is not None:
+                cached = self.jwk_set_cache.get()
+                if cached is not None:
+                    return cached
+            return data if isinstance(data, PyJWKSet) else PyJWKSet.from_dict(data)
+        
+        def get_signing_key(self, kid: str) -> Any:
+            # As in PyJWT, an unknown kid re-fetches the set once; here that
+            # re-fetch shares the forced-refresh rate limit on every version
+            with self._client_lock:
+                signing_key = self.match_kid(self.get_signing_keys(), kid)
+                if signing_key is None and self._claim_forced_refresh():
+                    signing_key = self.match_kid(self.get_signing_keys(refresh=True), kid)
+                if signing_key is None:
+                    raise PyJWKClientError(f'Unable to find a signing key that matches: "{kid}"')
+                return signing_key
+        
+        def refresh_if_allowed(self) -> bool:
+            """Force a JWK set re-fetch unless one was forced within refresh_cooldown"""
+            with self._client_lock:
+                if not self._claim_forced_refresh():
+                    return False
+                self.get_jwk_set(refresh=True)
+                return True
+        
+        def _claim_forced_refresh(self) -> bool:
+            """Take the forced-refresh slot if the cooldown has passed (caller holds _client_lock)"""
+            now = time.monotonic()
+            if (self._last_forced_refresh is not None
+                    and now - self._last_forced_refresh < self.refresh_cooldown):
+                return False
+            self._last_forced_refresh = now
+            return True
+        
+        def _fetch_jwk_set(self) -> Any:
+            """Fetch the JWK set over the pooled session and populate the JWK set cache"""
+            if getattr(self, 'ssl_context', None) is not None:
+                # The pooled session can't use a caller-supplied SSLContext;
+                # PyJWT's own fetch honours it
+                return PyJWKClient.fetch_data(self)
+            
+            import requests
+            try:
+                response = _get_jwks_session().get(
+                    self.uri,
+                    headers=self.headers,
+                    timeout=self.timeout,
+                    allow_redirects=False
+                )
+                response.raise_for_status()
+                jwk_set = response.json()
+            except requests.RequestException as e:
+                raise PyJWKClientConnectionError(
+                    f'Fail to fetch data from the url, err: "{e}"'
+                ) from e
+            
+            # Validate the shape before caching, as PyJWT does: an error object
+            # or list must not become the cached key set
+            if not isinstance(jwk_set, dict) or not isinstance(jwk_set.get('keys'), list):
+                raise PyJWKClientError("The JWKS endpoint did not return a JSON object with a 'keys' list")
+            
+            if self.jwk_set_cache is not None:
+                self.jwk_set_cache.put(jwk_set)
+            # Base-class bookkeeping for the unknown-kid refresh cooldown
+            self._last_successful_fetch = time.monotonic()
+            return jwk_set
+else:
+    CachingJWKSClient = None
+
+# Compiled once; validate_username runs for every User built from a token
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9._@]+$')
+
 def validate_username(username: str) -> bool:
     """
     Validate username format to prevent delimiter conflicts.
@@ -46,21 +240,9 @@ def validate_username(username: str) -> bool:
     Returns:
         bool: True if valid, False otherwise
     """
-    if not username:
-        return False
-    
-    # Forbid hyphens to avoid filename delimiter conflicts
-    if '-' in username:
-        return False
-        
-    # Basic character validation (alphanumeric, underscore, dot, at-sign)
-    import re
-    if not re.match(r'^[a-zA-Z0-9._@]+$', username):
-        return False
-
-
-        
-    return True
+    # Forbid hyphens to avoid filename delimiter conflicts, then apply basic
+    # character validation (alphanumeric, underscore, dot, at-sign)
+    return bool(username) and '-' not in username and _USERNAME_RE.match(username) is not None
 
 class User:
     """User model with authentication and authorization information
@@ -83,19 +265,57 @@ class User:
         self.permissions = permissions or []
         self.is_admin = is_admin
         self.token = token
+        
+        # Precomputed lookups for is_in_group / has_permission (exact match is the common case)
+        self._group_set = frozenset(self.groups)
+        self._group_set_lower: Optional[FrozenSet[str]] = None  # Built on first case-insensitive check
+        self._perm_set = frozenset(self.permissions)
+        self._has_star = '*' in self._perm_set
+        self._wildcard_prefixes = tuple(
+            p[:-1] for p in self._perm_set if p.endswith('*') and p != '*'
+        )
 
     def has_permission(self, permission: str) -> bool:
         """Check if user has a specific permission"""
         return (
-            '*' in self.permissions or
-            permission in self.permissions or
-            any(perm.endswith('*') and permission.startswith(perm[:-1]) 
-                for perm in self.permissions)
+            self._has_star or
+            permission in self._perm_set or
+            permission.startswith(self._wildcard_prefixes)
         )
 
     def is_in_group(self, group: str) -> bool:
         """Check if user is in a specific group"""
-        return group in self.groups
+        return group in self._group_set
+
+    def is_in_group_ignore_case(self, group: str) -> bool:
+        """Check if user is in a specific group, ignoring case"""
+        if self._group_set_lower is None:
+            self._group_set_lower = frozenset(g.lower() for g in self.groups)
+        return group.lower() in self._group_set_lower
+
+    def is_in_any_group(self, groups: Iterable[str]) -> bool:
+        """Check if user is in at least one of the given groups"""
+        return not self._group_set.isdisjoint(groups)
+
+    def has_any_permission(self, permissions: Iterable[str]) -> bool:
+        """Check if user has at least one of the given permissions"""
+        permissions = tuple(permissions)  # Iterated twice below; a generator would be drained
+        if self._has_star or not self._perm_set.isdisjoint(permissions):
+            return True
+        # Only wildcard grants ("view:*") can cover what the exact set missed
+        if not self._wildcard_prefixes:
+            return False
+        return any(p.startswith(self._wildcard_prefixes) for p in permissions)
+
+    def has_all_permissions(self, permissions: Iterable[str]) -> bool:
+        """Check if user has every one of the given permissions"""
+        permissions = tuple(permissions)  # Iterated twice below; a generator would be drained
+        if self._has_star or self._perm_set.issuperset(permissions):
+            return True
+        # Only wildcard grants ("view:*") can cover what the exact set missed
+        if not self._wildcard_prefixes:
+            return False
+        return all(self.has_permission(p) for p in permissions)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert user to dictionary"""
@@ -123,8 +343,25 @@ class AuthValidator:
     - Self-hosted: JWT with production signatures
     """
     
+    # Validated-token cache: entries live at most this long (and never past
+    # the token's own exp), keyed by SHA-256 so raw tokens are not retained
+    TOKEN_CACHE_TTL = 60
+    TOKEN_CACHE_MAXSIZE = 1024
+    # Rejected-token cache: repeat presentations of a bad token fail fast
+    FAILED_TOKEN_CACHE_TTL = 30
+    FAILED_TOKEN_CACHE_MAXSIZE = 4096
+    # Tolerated clock skew (seconds) for exp/iat/nbf checks
+    JWT_LEEWAY = 30
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        self._token_cache: Dict[bytes, Tuple[float, User]] = {}
+        self._failed_token_cache: Dict[bytes, Tuple[float, str]] = {}
+        # The caches are shared by threadpool workers (get_current_user is a
+        # sync dependency); every read, eviction and insert holds this lock
+        self._cache_lock = threading.Lock()
+        self._default_user: Optional[User] = None
+        self._default_user_loaded = False
         
         # Use existing config_loader pattern for environment detection
         from rawscribe.utils.config_loader import config_loader
@@ -132,12 +369,11 @@ class AuthValidator:
         self.is_aws_lambda = bool(os.environ.get('AWS_EXECUTION_ENV'))
         
         # Handle nested config structure: config.lambda.auth or config.auth
-        if 'lambda' in config and 'auth' in config['lambda']:
-            self.auth_config = config['lambda']['auth']
-        else:
-            self.auth_config = config.get('auth', {})
+        lambda_auth = (config.get('lambda') or {}).get('auth')
+        self.auth_config = lambda_auth if lambda_auth is not None else config.get('auth', {})
         
         self.provider = self.auth_config.get('provider', 'jwt')
+        self.auth_required = (lambda_auth or {}).get('required', True)
         
         logger.info(
             f"AuthValidator: provider={self.provider}, "
@@ -153,6 +389,10 @@ class AuthValidator:
         
         # Initialize provider-specific configurations
         self._init_provider_configs()
+        
+        # Bind the validation path for this provider/environment once, so
+        # validate_token does no per-call dispatch
+        self._validate_provider_token = self._build_validator()
 
     def _init_provider_configs(self):
         """Initialize provider-specific configurations"""
@@ -163,6 +403,14 @@ class AuthValidator:
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
     
+    def _build_validator(self):
+        """Select the token validation function for the configured provider/environment"""
+        if self.provider == 'cognito':
+            return self._validate_cognito_token
+        if self.dev_tokens_enabled:
+            return self._validate_jwt_or_dev_token
+        return self._validate_jwt_token
+    
     def _init_jwt_config(self):
         """Initialize JWT configuration"""
         jwt_config = self.auth_config.get('jwt', {})
@@ -172,6 +420,22 @@ class AuthValidator:
         self.jwt_audience = jwt_config.get('audience')
         self.mock_users = jwt_config.get('mockUsers', [])
         
+        # Fixed jwt.decode arguments, built once
+        self._jwt_decode_kwargs = {
+            'algorithms': [self.jwt_algorithm],
+            'options': {
+                "verify_signature": True,
+                "verify_exp": True,
+                "verify_aud": bool(self.jwt_audience),
+                "verify_iss": bool(self.jwt_issuer)
+            },
+            'audience': self.jwt_audience,
+            'issuer': self.jwt_issuer,
+            'leeway': self.JWT_LEEWAY,
+        }
+        # Dev tokens are only honoured locally; elsewhere skip probing for them
+        self.dev_tokens_enabled = self.environment in ('dev', 'test') and not self.is_aws_lambda
+        
         # Validate production JWT
         if self.environment in ['stage', 'prod']:
             if self.jwt_secret in ['dev-secret', 'dev-secret-replace-with-strong-secret']:
@@ -203,67 +467,187 @@ class AuthValidator:
         if not all([self.cognito_region, self.cognito_user_pool_id, self.cognito_client_id]):
             raise ValueError("Cognito requires region, userPoolId, clientId")
         
+        self._expected_issuer = (
+            f"https://cognito-idp.{self.cognito_region}.amazonaws.com/"
+            f"{self.cognito_user_pool_id}"
+        )
+        
+        # Fixed jwt.decode arguments, built once
+        self._jwt_decode_kwargs = {
+            'algorithms': ["RS256"],
+            'options': {
+                "verify_signature": True,
+                "verify_exp": True,
+                "verify_aud": True,
+                "verify_iss": True
+            },
+            'audience': self.cognito_client_id,
+            'issuer': self._expected_issuer,
+            'leeway': self.JWT_LEEWAY,
+        }
+        
         # Initialize JWKS client
         if not JWT_AVAILABLE or not PyJWKClient:
             raise RuntimeError("PyJWT library required. Install: pip install 'PyJWT[crypto]'")
         
         try:
-            jwks_url = (
-                f"https://cognito-idp.{self.cognito_region}.amazonaws.com/"
-                f"{self.cognito_user_pool_id}/.well-known/jwks.json"
+            jwks_url = f"{self._expected_issuer}/.well-known/jwks.json"
+            # The JWK set is cached already parsed, so repeat verifications
+            # skip the network and key parsing. PyJWT's per-kid key cache is
+            # left off: it has no TTL, and a rotated-out key must stop being
+            # trusted once the set expires
+            self.jwks_client = CachingJWKSClient(
+                jwks_url,
+                cache_jwk_set=True,
+                lifespan=300,
+                timeout=10
             )
-            self.jwks_client = PyJWKClient(jwks_url, timeout=10)
             logger.info(f"JWKS client initialized: {jwks_url}")
         except Exception as e:
             raise RuntimeError(f"JWKS initialization failed: {e}")
 
+    def get_default_user(self) -> Optional[User]:
+        """
+        Get the configured default user for auth-disabled requests
+        
+        Built from the first entry of auth.users on first use and reused
+        afterwards. Returns None when no users are configured.
+        """
+        if not self._default_user_loaded:
+            mock_users = self.auth_config.get('users', [])
+            if mock_users:
+                # Use the first configured user as default
+                default_user_config = mock_users[0]
+                self._default_user = User(
+                    id=default_user_config['id'],
+                    email=default_user_config['email'],
+                    username=default_user_config['username'],
+                    name=default_user_config['name'],
+                    groups=default_user_config.get('groups', ['admin']),
+                    permissions=default_user_config.get('permissions', ['*']),
+                    is_admin=default_user_config.get('isAdmin', True)
+                )
+            self._default_user_loaded = True
+        return self._default_user
+
+    def refresh_jwks(self) -> None:
+        """Force a JWKS re-fetch (e.g. after Cognito key rotation)"""
+        if not getattr(self, 'jwks_client', None):
+            raise AuthError("JWKS client not initialized")
+        self.jwks_client.fetch_data()
+        # Keys may have been rotated out; re-verify tokens against the new set
+        self.clear_token_cache()
+
     def validate_token(self, token: str) -> User:
-        """Validate token based on provider"""
+        """Validate token based on provider (recent results, good or bad, are served from cache)"""
+        cache_key = hashlib.sha256(token.encode('utf-8')).digest()
+        now = time.time()
+        cached = self._cache_get(self._token_cache, cache_key, now)
+        if cached is not None:
+            return cached
+        
+        failed = self._cache_get(self._failed_token_cache, cache_key, now)
+        if failed is not None:
+            raise AuthError(failed)
+        
         try:
-            if self.provider == 'jwt':
-                return self._validate_jwt_token(token)
-            elif self.provider == 'cognito':
-                return self._validate_cognito_token(token)
-            else:
-                raise AuthError(f"Unsupported provider: {self.provider}")
-        except AuthError:
+            user = self._validate_provider_token(token)
+        except AuthError as e:
+            # Errors chained from an unexpected exception (e.g. JWKS endpoint
+            # unreachable) say nothing about the token itself - don't cache them
+            if e.__cause__ is None:
+                self._cache_put(self._failed_token_cache, self.FAILED_TOKEN_CACHE_MAXSIZE,
+                                cache_key, now + self.FAILED_TOKEN_CACHE_TTL, str(e), now)
             raise
         except Exception as e:
             logger.error(f"Token validation failed: {e}")
-            raise AuthError(f"Invalid token: {e}")
+            raise AuthError(f"Invalid token: {e}") from e
+        
+        # Validated users are cached and shared across requests; don't keep
+        # the raw bearer token on them
+        user.token = None
+        self._cache_validated_token(cache_key, token, user, now)
+        return user
 
-    def _validate_jwt_token(self, token: str) -> User:
-        """Validate JWT token (dev or production)"""
-        import time
+    def _cache_validated_token(self, cache_key: bytes, token: str, user: User, now: float) -> None:
+        """Remember a validated token until min(TTL, token exp)"""
+        expires_at = now + self.TOKEN_CACHE_TTL
+        exp = self._get_token_exp(token)
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        if expires_at <= now:
+            return
+        
+        self._cache_put(self._token_cache, self.TOKEN_CACHE_MAXSIZE,
+                        cache_key, expires_at, user, now)
+
+    def _cache_get(self, cache: Dict[bytes, Tuple[float, Any]], key: bytes, now: float) -> Any:
+        """Look up a bounded expiring cache, dropping the entry if it has expired"""
+        with self._cache_lock:
+            entry = cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] > now:
+                return entry[1]
+            cache.pop(key, None)
+            return None
+
+    def _cache_put(self, cache: Dict[bytes, Tuple[float, Any]], maxsize: int,
+                   key: bytes, expires_at: float, value: Any, now: float) -> None:
+        """Insert into a bounded expiring cache"""
+        with self._cache_lock:
+            if len(cache) >= maxsize:
+                # Entries go in with a fixed TTL, so the oldest expire first:
+                # drop expired entries from the front, then the oldest live one
+                # if still full. No full scan, even when flooded with new keys
+                while cache:
+                    oldest = next(iter(cache))
+                    if len(cache) < maxsize and cache[oldest][0] > now:
+                        break
+                    del cache[oldest]
+            
+            cache[key] = (expires_at, value)
+
+    def _get_token_exp(self, token: str) -> Optional[float]:
+        """Read the exp claim of an already-validated token (None if absent/unreadable)"""
+        try:
+            payload = json.loads(self._base64url_decode(token.split('.')[1]))
+            exp = payload.get('exp')
+            return float(exp) if exp is not None else None
+        except Exception:
+            return None
+
+    def clear_token_cache(self) -> None:
+        """Forget all cached token validations"""
+        with self._cache_lock:
+            self._token_cache.clear()
+            self._failed_token_cache.clear()
+
+    def _validate_jwt_or_dev_token(self, token: str) -> User:
+        """
+        Validate JWT token, accepting dev tokens (local dev/test only)
         
-        # Check for dev token
+        Stage/prod bind _validate_jwt_token directly and never probe for dev tokens.
+        """
         parts = token.split('.')
         if len(parts) == 3:
             try:
                 header = json.loads(self._base64url_decode(parts[0]))
                 if header.get('dev_mode'):
+                    logger.debug("Dev token header detected")
                     return self._validate_dev_token(token)
             except:
                 pass  # Not a dev token
         
-        # Production JWT validation
+        return self._validate_jwt_token(token)
+
+    def _validate_jwt_token(self, token: str) -> User:
+        """Validate production JWT token"""
         if not JWT_AVAILABLE:
             raise AuthError("PyJWT not available")
         
         try:
-            decoded = jwt.decode(
-                token,
-                self.jwt_secret,
-                algorithms=[self.jwt_algorithm],
-                options={
-                    "verify_signature": True,
-                    "verify_exp": True,
-                    "verify_aud": bool(self.jwt_audience),
-                    "verify_iss": bool(self.jwt_issuer)
-                },
-                audience=self.jwt_audience,
-                issuer=self.jwt_issuer
-            )
+            decoded = jwt.decode(token, self.jwt_secret, **self._jwt_decode_kwargs)
         except jwt.ExpiredSignatureError:
             raise AuthError("Token expired")
         except jwt.InvalidTokenError as e:
@@ -302,8 +686,6 @@ class AuthValidator:
             raise AuthError("Dev tokens only valid with JWT provider")
         
         try:
-            import time
-            
             parts = token.split('.')
             if len(parts) != 3:
                 raise AuthError("Invalid dev token format")
@@ -346,28 +728,24 @@ class AuthValidator:
             raise AuthError("JWKS client not initialized")
         
         try:
-            # Get signing key
-            signing_key = self.jwks_client.get_signing_key_from_jwt(token)
-            
-            expected_issuer = (
-                f"https://cognito-idp.{self.cognito_region}.amazonaws.com/"
-                f"{self.cognito_user_pool_id}"
-            )
+            # Get signing key by kid from the cached, already parsed JWK set
+            kid = jwt.get_unverified_header(token).get('kid')
+            if not kid:
+                raise AuthError("Cognito token missing 'kid' header")
+            signing_key = self.jwks_client.get_signing_key(kid).key
             
             # Verify signature and claims
-            decoded = jwt.decode(
-                token,
-                signing_key.key,
-                algorithms=["RS256"],
-                options={
-                    "verify_signature": True,
-                    "verify_exp": True,
-                    "verify_aud": True,
-                    "verify_iss": True
-                },
-                audience=self.cognito_client_id,
-                issuer=expected_issuer
-            )
+            try:
+                decoded = jwt.decode(token, signing_key, **self._jwt_decode_kwargs)
+            except jwt.InvalidSignatureError:
+                # The key behind this kid may have been replaced: re-fetch the
+                # JWK set once (rate limited) and verify against it
+                if not self.jwks_client.refresh_if_allowed():
+                    raise
+                # Tokens cached under the old key set must be verified again
+                self.clear_token_cache()
+                signing_key = self.jwks_client.get_signing_key(kid).key
+                decoded = jwt.decode(token, signing_key, **self._jwt_decode_kwargs)
             
             logger.debug("Cognito token verified")
             
@@ -392,9 +770,11 @@ class AuthValidator:
             raise AuthError("Cognito token expired")
         except jwt.InvalidTokenError as e:
             raise AuthError(f"Invalid Cognito token: {e}")
+        except AuthError:
+            raise
         except Exception as e:
             logger.error(f"Cognito validation error: {e}")
-            raise AuthError(f"Cognito auth failed: {e}")
+            raise AuthError(f"Cognito auth failed: {e}") from e
 
     def _map_cognito_permissions(self, groups: List[str]) -> List[str]:
         """
@@ -408,22 +788,7 @@ class AuthValidator:
         """
         permissions = set()
         for group in groups:
-            g = group.lower()
-            if g in ['admin', 'admins']:
-                # Full admin access
-                permissions.add('*')
-            elif g in ['lab_manager', 'lab_managers']:
-                # Lab managers can manage users
-                permissions.update(['submit:*', 'view:*', 'draft:*', 'approve:*', 'manage:users'])
-            elif g in ['researcher', 'researchers']:
-                # Researchers can submit and view their own data
-                permissions.update(['submit:*', 'view:own', 'view:group', 'draft:*'])
-            elif g in ['clinician', 'clinicians']:
-                # Clinicians can submit and view their own data
-                permissions.update(['submit:*', 'view:own', 'draft:*'])
-            else:
-                # Default: view own data only
-                permissions.add('view:own')
+            permissions |= _COGNITO_GROUP_PERMISSIONS.get(group.lower(), _DEFAULT_GROUP_PERMISSIONS)
         return list(permissions)
     
     @staticmethod
@@ -436,28 +801,32 @@ class AuthValidator:
         - Uses '_' instead of '/'
         - No padding '=' characters
         """
-        import base64
-        
-        # Replace URL-safe characters with standard base64
-        data = data.replace('-', '+').replace('_', '/')
-        
-        # Add padding if needed
-        padding = 4 - (len(data) % 4)
-        if padding != 4:
-            data += '=' * padding
-        
-        return base64.b64decode(data).decode('utf-8')
+        # Restore stripped padding; urlsafe_b64decode handles the alphabet
+        pad = b'=' * (-len(data) % 4)
+        return base64.urlsafe_b64decode(data.encode('ascii') + pad).decode('utf-8')
 
 
 # FastAPI dependencies
 security = HTTPBearer(auto_error=False)
 
+# Process-wide validator, built on first use. Rebuilding per request would
+# throw away the JWKS client (and its key cache) on every authenticated call.
+_auth_validator: Optional[AuthValidator] = None
+
 def get_auth_validator() -> AuthValidator:
-    """Get auth validator instance with loaded configuration"""
-    from .config_loader import config_loader
-    config = config_loader.load_config()
-    logger.debug(f"get_auth_validator: loaded config={config}")
-    return AuthValidator(config)
+    """Get auth validator instance with loaded configuration (singleton)"""
+    global _auth_validator
+    if _auth_validator is None:
+        from .config_loader import config_loader
+        config = config_loader.load_config()
+        logger.debug(f"get_auth_validator: loaded config={config}")
+        _auth_validator = AuthValidator(config)
+    return _auth_validator
+
+def reset_auth_validator() -> None:
+    """Drop the cached auth validator so the next request rebuilds it from config"""
+    global _auth_validator
+    _auth_validator = None
 
 def get_current_user(
     auth_validator: AuthValidator = Depends(get_auth_validator),
@@ -491,11 +860,8 @@ def get_current_user(
             return {"message": "This is a private endpoint"}
         
     """
-    logger.debug(f"get_current_user: auth_validator.config={auth_validator.config}")
-    logger.debug(f"get_current_user: auth.required={auth_validator.config.get('lambda', {}).get('auth', {}).get('required', True)}")
-    
-    # Check if auth is required
-    if not auth_validator.config.get('lambda', {}).get('auth', {}).get('required', True):
+    # Check if auth is required (resolved once from the validator's config snapshot)
+    if not auth_validator.auth_required:
         # Auth is disabled - return None to indicate no user
         logger.debug("get_current_user: Auth disabled, returning None")
         return None
@@ -549,22 +915,11 @@ def get_current_user_or_default(
     
     # Auth is disabled - return default user from config
     # This ensures consistency between what saves drafts and what queries them
-    auth_config = auth_validator.auth_config
-    mock_users = auth_config.get('users', [])
+    default_user = auth_validator.get_default_user()
     
-    if mock_users:
-        # Use the first configured user as default
-        default_user_config = mock_users[0]
-        logger.debug(f"get_current_user_or_default: Using configured default user: {default_user_config['id']}")
-        return User(
-            id=default_user_config['id'],
-            email=default_user_config['email'],
-            username=default_user_config['username'],
-            name=default_user_config['name'],
-            groups=default_user_config.get('groups', ['admin']),
-            permissions=default_user_config.get('permissions', ['*']),
-            is_admin=default_user_config.get('isAdmin', True)
-        )
+    if default_user is not None:
+        logger.debug(f"get_current_user_or_default: Using configured default user: {default_user.id}")
+        return default_user
     else:
         # CRITICAL: No users configured - this should only happen in dev/test
         # DO NOT allow this in production as it would be a security vulnerability
@@ -588,68 +943,42 @@ def get_current_user_or_default(
         )
 
 def require_permission(permission: str):
-    """Decorator to require specific permission"""
-    def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            user = kwargs.get('current_user') or args[-1]  # Assume user is last param
-            if not isinstance(user, User):
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Authentication required"
-                )
-            
-            if not user.has_permission(permission):
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"Permission denied: {permission}"
-                )
-            
-            return await func(*args, **kwargs)
-        return wrapper
-    return decorator
-
-def require_group(group: str):
-    """Decorator to require specific group membership"""
-    def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            user = kwargs.get('current_user') or args[-1]  # Assume user is last param
-            if not isinstance(user, User):
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Authentication required"
-                )
-            
-            if not user.is_in_group(group):
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"Group membership required: {group}"
-                )
-            
-            return await func(*args, **kwargs)
-        return wrapper
-    return decorator
-
-def require_admin(func):
-    """Decorator to require admin privileges"""
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        user = kwargs.get('current_user') or args[-1]  # Assume user is last param
-        if not isinstance(user, User):
+    """
+    Dependency factory requiring a specific permission
+    
+    Example:
+        @router.post("/submit")
+        async def submit(current_user: User = Depends(require_permission('submit:*'))):
+            ...
+    """
+    def dependency(current_user: User = Depends(get_current_user_or_default)) -> User:
+        if not current_user.has_permission(permission):
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Permission denied: {permission}"
             )
-        
-        if not user.is_admin:
+        return current_user
+    return dependency
+
+def require_group(group: str):
+    """Dependency factory requiring specific group membership"""
+    def dependency(current_user: User = Depends(get_current_user_or_default)) -> User:
+        if not current_user.is_in_group(group):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Admin privileges required"
+                detail=f"Group membership required: {group}"
             )
-        
-        return await func(*args, **kwargs)
-    return wrapper
+        return current_user
+    return dependency
+
+def require_admin(current_user: User = Depends(get_current_user_or_default)) -> User:
+    """Dependency requiring admin privileges"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
 
 # Utility functions
 def extract_user_from_token(token: str, auth_validator: AuthValidator) -> Optional[User]:
@@ -661,5 +990,4 @@ def extract_user_from_token(token: str, auth_validator: AuthValidator) -> Option
 
 def generate_mock_token(user_id: str) -> str:
     """Generate mock token for testing"""
-    import time
     return f"mock-token-{user_id}-{int(time.time())}" 
\ No newline at end of file
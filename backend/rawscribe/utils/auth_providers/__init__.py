@@ -12,10 +12,10 @@ This package provides the provider pattern for authentication configuration,
 ensuring environment variables (CloudFormation) take precedence over
 baked-in config files.
 """
+import importlib
+
 from .base import AuthProvider
 from .factory import AuthProviderFactory
-from .cognito_provider import CognitoProvider
-from .jwt_provider import JWTProvider
 
 __all__ = [
     'AuthProvider',
@@ -24,3 +24,16 @@ __all__ = [
     'JWTProvider',
 ]
 
+
+_LAZY_PROVIDERS = {
+    'CognitoProvider': '.cognito_provider',
+    'JWTProvider': '.jwt_provider',
+}
+
+
+def __getattr__(name):
+    # Concrete providers are imported on first access (see AuthProviderFactory)
+    module_path = _LAZY_PROVIDERS.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_path, __name__), name)
@@ -19,7 +19,7 @@ class CognitoProvider(AuthProvider):
     
     def __init__(self, config: Dict):
         self._config = config
-        self._cognito_config = config.get('lambda', {}).get('auth', {}).get('cognito', {})
+        self._cognito_config = ((config.get('lambda') or {}).get('auth') or {}).get('cognito') or {}
     
     def get_config(self) -> Dict:
         """
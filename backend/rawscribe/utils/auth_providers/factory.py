@@ -8,25 +8,35 @@ Authentication provider factory
 Creates appropriate auth provider based on configuration.
 Extensible for future providers (LDAP, SAML, etc.)
 """
-from typing import Dict
+import importlib
+from typing import Any, Dict, Tuple
 from .base import AuthProvider
-from .cognito_provider import CognitoProvider
-from .jwt_provider import JWTProvider
 
 
 class AuthProviderFactory:
     """Factory for creating auth provider instances"""
     
-    _providers = {
-        'cognito': CognitoProvider,
-        'jwt': JWTProvider,
+    # Provider name -> (module path, class name); imported on first use so a
+    # deployment only pays for the provider it actually configures
+    _providers: Dict[str, Tuple[str, str]] = {
+        'cognito': ('rawscribe.utils.auth_providers.cognito_provider', 'CognitoProvider'),
+        'jwt': ('rawscribe.utils.auth_providers.jwt_provider', 'JWTProvider'),
     }
+    _resolved: Dict[str, type] = {}
+    
+    # (provider name, id(config)) -> (config, provider). The config is kept so
+    # its id can't be reused by another dict while the entry is alive.
+    _instances: Dict[Tuple[str, int], Tuple[Dict[str, Any], AuthProvider]] = {}
+    INSTANCE_CACHE_MAXSIZE = 8
     
     @classmethod
     def create(cls, config: Dict) -> AuthProvider:
         """
         Create appropriate auth provider based on config
         
+        Providers are reused for repeated calls with the same config object,
+        which is treated as an immutable snapshot (as ConfigLoader returns).
+        
         Args:
             config: Full application configuration dict
             
@@ -36,16 +46,46 @@ class AuthProviderFactory:
         Raises:
             ValueError: If provider not recognized
         """
-        provider_name = config.get('lambda', {}).get('auth', {}).get('provider', 'jwt')
+        auth_config = (config.get('lambda') or {}).get('auth') or {}
+        provider_name = auth_config.get('provider', 'jwt')
+        
+        key = (provider_name, id(config))
+        cached = cls._instances.get(key)
+        if cached is not None and cached[0] is config:
+            return cached[1]
+        
+        provider = cls._resolve(provider_name)(config)
+        if len(cls._instances) >= cls.INSTANCE_CACHE_MAXSIZE:
+            cls._instances.pop(next(iter(cls._instances)))
+        cls._instances[key] = (config, provider)
+        return provider
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop memoized provider instances"""
+        cls._instances.clear()
+    
+    @classmethod
+    def _resolve(cls, name: str) -> type:
+        """Return the provider class for name, importing it on first use"""
+        provider_class = cls._resolved.get(name)
+        if provider_class is not None:
+            return provider_class
         
-        provider_class = cls._providers.get(provider_name)
-        if not provider_class:
+        target = cls._providers.get(name)
+        if not target:
             raise ValueError(
-                f"Unknown auth provider: {provider_name}. "
-                f"Available: {list(cls._providers.keys())}"
+                f"Unknown auth provider: {name}. "
+                f"Available: {sorted(set(cls._providers) | set(cls._resolved))}"
             )
         
-        return provider_class(config)
+        module_path, class_name = target
+        provider_class = getattr(importlib.import_module(module_path), class_name)
+        cls._resolved[name] = provider_class
+        cls._instances = {
+            key: value for key, value in cls._instances.items() if key[0] != name
+        }
+        return provider_class
     
     @classmethod
     def register_provider(cls, name: str, provider_class: type):
@@ -56,5 +96,8 @@ class AuthProviderFactory:
             name: Provider name (e.g., 'ldap', 'saml')
             provider_class: Class implementing AuthProvider interface
         """
-        cls._providers[name] = provider_class
+        cls._resolved[name] = provider_class
+        cls._instances = {
+            key: value for key, value in cls._instances.items() if key[0] != name
+        }
 
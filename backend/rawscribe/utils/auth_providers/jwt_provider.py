@@ -17,7 +17,15 @@ class JWTProvider(AuthProvider):
     
     def __init__(self, config: Dict):
         self._config = config
-        self._jwt_config = config.get('lambda', {}).get('auth', {}).get('jwt', {})
+        self._jwt_config = ((config.get('lambda') or {}).get('auth') or {}).get('jwt') or {}
+        # Config is fixed for the provider's lifetime, so build the public view once
+        self._public_config = {
+            'algorithm': self._jwt_config.get('algorithm', 'HS256'),
+            'issuer': self._jwt_config.get('issuer'),
+            'audience': self._jwt_config.get('audience'),
+            'mockUsers': len(self._jwt_config.get('mockUsers') or ()),
+            'source': 'config_file'
+        }
     
     def get_config(self) -> Dict:
         """
@@ -26,13 +34,7 @@ class JWTProvider(AuthProvider):
         Returns public configuration (algorithm, issuer, audience).
         Does NOT return secret key.
         """
-        return {
-            'algorithm': self._jwt_config.get('algorithm', 'HS256'),
-            'issuer': self._jwt_config.get('issuer'),
-            'audience': self._jwt_config.get('audience'),
-            'mockUsers': len(self._jwt_config.get('mockUsers', [])),
-            'source': 'config_file'
-        }
+        return dict(self._public_config)
     
     def get_user_pool_id(self) -> Optional[str]:
         """JWT doesn't have user pool concept"""
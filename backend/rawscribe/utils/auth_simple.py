@@ -8,32 +8,59 @@ Extracts user information from API Gateway authorizer context
 """
 
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from fastapi import Request
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Frozen (and tuple-valued) because the same instances are shared across
+# requests; slots=True would also drop __dict__ but needs Python 3.10+
+@dataclass(frozen=True)
 class User:
     id: str
     email: str
     username: str
     name: str
-    groups: List[str]
-    permissions: List[str]
+    groups: Tuple[str, ...]
+    permissions: Tuple[str, ...]
     is_admin: bool
     token: Optional[str] = None
 
+# Auth is disabled on these paths, so every request gets the same user;
+# build them once instead of per request
+_TEST_USER = User(
+    id="test-user",
+    email="testuser@pwb.com",
+    username="testuser",
+    name="Test User",
+    groups=("admin",),
+    permissions=("*",),
+    is_admin=True
+)
+
+_DEFAULT_USER = User(
+    id="default-user",
+    email="default@localhost",
+    username="default",
+    name="Default User",
+    groups=("admin",),
+    permissions=("*",),
+    is_admin=True
+)
+
+# Group -> granted permissions; unknown groups grant nothing
+_GROUP_PERMS: Dict[str, Tuple[str, ...]] = {
+    'admin': ('*',),
+    'user': ('view:own', 'edit:own'),
+}
+
 def get_permissions_for_groups(groups: List[str]) -> List[str]:
-    """Get permissions based on user groups"""
-    permissions = []
+    """Get permissions based on user groups (deduplicated, in group order)"""
+    permissions: Dict[str, None] = {}
     for group in groups:
-        if group == 'admin':
-            permissions.extend(['*'])
-        elif group == 'user':
-            permissions.extend(['view:own', 'edit:own'])
-    return list(set(permissions))
+        permissions.update(dict.fromkeys(_GROUP_PERMS.get(group, ())))
+    return list(permissions)
 
 async def get_current_user_from_context(request: Request) -> Optional[User]:
     """
@@ -46,15 +73,7 @@ async def get_current_user_from_context(request: Request) -> Optional[User]:
         # For now, since auth is disabled, return a default user
         # TODO: Extract from actual authorizer context when auth is re-enabled
         
-        return User(
-            id="test-user",
-            email="testuser@pwb.com", 
-            username="testuser",
-            name="Test User",
-            groups=["admin"],
-            permissions=["*"],
-            is_admin=True
-        )
+        return _TEST_USER
         
     except Exception as e:
         logger.error(f"Failed to extract user from context: {e}")
@@ -63,15 +82,7 @@ async def get_current_user_from_context(request: Request) -> Optional[User]:
 # For backward compatibility
 def get_current_user_or_default() -> User:
     """Get current user or default when auth is disabled"""
-    return User(
-        id="default-user",
-        email="default@localhost",
-        username="default",
-        name="Default User", 
-        groups=["admin"],
-        permissions=["*"],
-        is_admin=True
-    )
+    return _DEFAULT_USER
 
 class AuthValidator:
     """Simplified authentication validator for API Gateway Cognito Authorizer"""
@@ -79,10 +90,8 @@ class AuthValidator:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         # Handle nested config structure: config.lambda.auth or config.auth
-        if 'lambda' in config and 'auth' in config['lambda']:
-            self.auth_config = config['lambda']['auth']
-        else:
-            self.auth_config = config.get('auth', {})
+        lambda_auth = (config.get('lambda') or {}).get('auth')
+        self.auth_config = lambda_auth if lambda_auth is not None else config.get('auth', {})
         self.provider = self.auth_config.get('provider', 'mock')
         self.required = self.auth_config.get('required', False)
         
@@ -8,20 +8,64 @@ Loads from deployed config.json in lambda bucket
 """
 import json
 import os
+from functools import cached_property
 from pathlib import Path
 from typing import Dict, Any, Optional
 import logging
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    # Fall back to the stdlib parser when orjson isn't installed
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 class ConfigLoader:
     """Simple configuration loader for backend services"""
     
     def __init__(self):
+        # Parsed config is reused until the backing file's mtime changes
         self._cache: Optional[Dict[str, Any]] = None
-        self._cache_time: float = 0
-        self.CACHE_TTL = 300  # 5 minutes
-        self._auth_provider = None
+        self._cache_path: Optional[Path] = None
+        self._cache_mtime_ns: int = 0
+        # Config file chosen on first load; steady-state loads only stat it
+        self._resolved_path: Optional[Path] = None
+        self._refresh_env()
+    
+    def _refresh_env(self) -> None:
+        """
+        Snapshot the environment variables the loader depends on
+        
+        Lambda/container environments don't change after startup, so these
+        are read once rather than on every call. Tests that mutate the
+        environment should call this (or clear_cache) afterwards.
+        """
+        self._testing = os.environ.get('TESTING') == 'true'
+        self._config_path = os.environ.get('CONFIG_PATH', '/tmp/config.json')
+        self._env = os.environ.get('ENV')
+    
+    def _resolve_config_path(self) -> Path:
+        """
+        Resolve which config file to load
+        - Testing (TESTING=true): rawscribe/.config/config.json, must exist
+        - Otherwise: rawscribe/.config/config.json if present, else CONFIG_PATH (default /tmp/config.json)
+        """
+        if self._testing:
+            # Read from merged config file (created by make config)
+            test_config_path = Path('rawscribe/.config/config.json')
+            if not test_config_path.exists():
+                raise FileNotFoundError(f"Test config not found at: {test_config_path}")
+            return test_config_path
+        
+        # Try local development first (same directory as main.py)
+        local_config_path = Path('rawscribe/.config/config.json')
+        if local_config_path.exists():
+            return local_config_path
+        
+        # Try deployed location (e.g., from Lambda environment)
+        return Path(self._config_path)
     
     def load_config(self) -> Dict[str, Any]:
         """
@@ -29,59 +73,55 @@ class ConfigLoader:
         - Local development: ./config.json (copied from infra/.config/lambda/dev.json by make rule before deploying)
         - Production: Read from lambda bucket (via S3 or env CONFIG_PATH)
         - Testing: Read directly from infra/.config/lambda/test.json when TESTING=true
-        """
-        # Check cache first
-        import time
-        if self._cache and (time.time() - self._cache_time) < self.CACHE_TTL:
-            return self._cache
         
+        The parsed config is cached and only re-read when the file's mtime changes.
+        """
         try:
-            # Check if we're in testing mode
-            if os.environ.get('TESTING') == 'true':
-                # Read from merged config file (created by make config)
-                test_config_path = Path('rawscribe/.config/config.json')
-                logger.info(f"TESTING mode: loading config from {test_config_path}")
-                
-                if test_config_path.exists():
-                    with open(test_config_path, 'r') as f:
-                        config = json.load(f)
-                    logger.info(f"Loaded test config from: {test_config_path}")
-                else:
-                    raise FileNotFoundError(f"Test config not found at: {test_config_path}")
-            else:
-                # Try local development first (same directory as main.py)
-                local_config_path = Path('rawscribe/.config/config.json')
-                logger.info(f"local_config_path: {local_config_path}")
-                
-                if local_config_path.exists():
-                    with open(local_config_path, 'r') as f:
-                        config = json.load(f)
-                    logger.info(f"Loaded config from local development: {local_config_path}")
-                else:
-                    logger.warning(f"config.json not found at: ({local_config_path})")
-                    # Try deployed location (e.g., from Lambda environment)
-                    config_path = os.environ.get('CONFIG_PATH', '/tmp/config.json')
-                    with open(config_path, 'r') as f:
-                        config = json.load(f)
-                    logger.info(f"Loaded config from deployed location: {config_path}")
+            config_path = self._resolved_path
+            if config_path is None:
+                config_path = self._resolve_config_path()
+            try:
+                mtime_ns = os.stat(config_path).st_mtime_ns
+            except FileNotFoundError:
+                # File went away; search again on the next load
+                self._resolved_path = None
+                raise
+            self._resolved_path = config_path
+            
+            # Check cache first
+            if (self._cache is not None and config_path == self._cache_path
+                    and mtime_ns == self._cache_mtime_ns):
+                return self._cache
+            
+            config = _json_loads(config_path.read_bytes())
+            logger.info("Loaded config from: %s", config_path)
             
             # Validate config structure
             if 'lambda' not in config:
                 raise ValueError("Invalid config: missing lambda section")
             
+            reloaded = self._cache is not None
             self._cache = config
-            self._cache_time = time.time()
+            self._cache_path = config_path
+            self._cache_mtime_ns = mtime_ns
+            self.__dict__.pop('storage_config', None)
+            if reloaded:
+                # The file changed: providers built from the old auth section
+                # must be rebuilt too
+                self.__dict__.pop('auth_provider', None)
+                from .auth_providers.factory import AuthProviderFactory
+                AuthProviderFactory.clear_cache()
             
             return config
             
         except Exception as error:
             logger.error(f"Failed to load configuration: {error}")
             logger.error("Configuration paths checked:")
-            if os.environ.get('TESTING') == 'true':
+            if self._testing:
                 logger.error(f"  Test mode: infra/.config/lambda/test.json")
             else:
                 logger.error(f"  Local development: rawscribe/.config/config.json")
-                logger.error(f"  Deployed location: {os.environ.get('CONFIG_PATH', '/tmp/config.json')}")
+                logger.error(f"  Deployed location: {self._config_path}")
             logger.error("")
             logger.error("To fix this issue:")
             logger.error("1. Run 'make config ENV=dev' to copy lambda config to backend/rawscribe/config.json")
@@ -95,10 +135,14 @@ class ConfigLoader:
                 "or ensure configs are properly deployed."
             )
     
+    @cached_property
+    def storage_config(self) -> Dict[str, Any]:
+        """Storage section of the config, cached until clear_cache() or a reload"""
+        return self.load_config()['lambda']['storage']
+    
     def get_storage_config(self) -> Dict[str, Any]:
         """Get storage configuration for backward compatibility"""
-        config = self.load_config()
-        return config['lambda']['storage']
+        return self.storage_config
     
     def get_environment(self) -> str:
         """
@@ -106,10 +150,10 @@ class ConfigLoader:
         CRITICAL: No defaults - missing ENV should be a catastrophic failure
         to prevent accidentally deploying dev configs to production
         """
-        env = os.getenv('ENV')
+        env = self._env
         
         # Special case: if TESTING=true, we're in test mode
-        if os.getenv('TESTING') == 'true':
+        if self._testing:
             return 'test'
             
         if not env:
@@ -122,8 +166,33 @@ class ConfigLoader:
     def clear_cache(self) -> None:
         """Clear configuration cache"""
         self._cache = None
-        self._cache_time = 0
-        self._auth_provider = None
+        self._cache_path = None
+        self._cache_mtime_ns = 0
+        self._resolved_path = None
+        self.__dict__.pop('storage_config', None)
+        self.__dict__.pop('auth_provider', None)
+        self._refresh_env()
+        
+        # The factory memoizes providers per config object; drop those too so
+        # the next get_auth_provider() really builds a fresh one
+        from .auth_providers.factory import AuthProviderFactory
+        AuthProviderFactory.clear_cache()
+    
+    def reload(self) -> Dict[str, Any]:
+        """
+        Drop the cached configuration and load it again
+        
+        The auth validator keeps its own snapshot; call
+        rawscribe.utils.auth.reset_auth_validator() to pick up auth changes.
+        """
+        self.clear_cache()
+        return self.load_config()
+    
+    @cached_property
+    def auth_provider(self):
+        """Auth provider built from the config, cached until clear_cache() or a reload"""
+        from .auth_providers.factory import AuthProviderFactory
+        return AuthProviderFactory.create(self.load_config())
     
     def get_auth_provider(self):
         """
@@ -136,11 +205,22 @@ class ConfigLoader:
         Returns:
             AuthProvider instance (CognitoProvider or JWTProvider)
         """
-        if self._auth_provider is None:
-            from .auth_providers.factory import AuthProviderFactory
-            config = self.load_config()
-            self._auth_provider = AuthProviderFactory.create(config)
-        return self._auth_provider
+        return self.auth_provider
 
 # Export singleton instance
-config_loader = ConfigLoader() 
\ No newline at end of file
+config_loader = ConfigLoader()
+
+
+def load_config() -> Dict[str, Any]:
+    """
+    Load configuration through the shared loader
+    
+    Prefer this (or the config_loader singleton) over constructing a new
+    ConfigLoader, which starts with an empty cache and re-reads the file.
+    """
+    return config_loader.load_config()
+
+
+def get_storage_config() -> Dict[str, Any]:
+    """Get storage configuration through the shared loader"""
+    return config_loader.get_storage_config()
@@ -9,7 +9,7 @@ Python equivalent of the TypeScript configuration interfaces with Pydantic valid
 """
 
 from typing import Dict, List, Optional, Union, Literal, Any
-from pydantic import BaseModel, Field, field_validator, validator, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import datetime, timezone
 from enum import Enum
 
@@ -243,44 +243,72 @@ class ConfigWithSources(BaseModel):
     validation_result: ConfigValidationResult = Field(default_factory=lambda: ConfigValidationResult(valid=True))
 
 
+# Per-environment values for DefaultConfigFactory
+_NON_PROD_PRESET: Dict[str, Any] = {
+    'log_level': 'debug',
+    'beta_features': False,
+    'audit_trail': False,
+    'autosave_max_items': 50,
+    'debounce_delay': 1000,
+    'debounce_max_wait': 15000,
+    'retry_initial_delay': 500,
+    'toast_on_save': False,
+}
+
+_ENV_PRESETS: Dict[Environment, Dict[str, Any]] = {
+    Environment.DEV: {**_NON_PROD_PRESET, 'beta_features': True, 'toast_on_save': True},
+    Environment.TEST: _NON_PROD_PRESET,
+    Environment.STAGE: _NON_PROD_PRESET,
+    Environment.PROD: {
+        'log_level': 'info',
+        'beta_features': False,
+        'audit_trail': True,
+        'autosave_max_items': 100,
+        'debounce_delay': 5000,
+        'debounce_max_wait': 30000,
+        'retry_initial_delay': 1000,
+        'toast_on_save': False,
+    },
+}
+
+
 class DefaultConfigFactory:
     """Factory for creating default configurations"""
     
     @staticmethod
     def create(environment: Environment) -> EnvironmentConfig:
         """Create default configuration for environment"""
+        preset = _ENV_PRESETS[environment]
         return EnvironmentConfig(
             webapp=ServiceConfig(
                 api=APIConfig(),
                 auth=AuthConfig(provider='jwt'),  # Changed from 'mock' to 'jwt'
                 storage=StorageConfig(type='local'),
-                logging=LoggingConfig(
-                    level='info' if environment == Environment.PROD else 'debug'
-                ),
+                logging=LoggingConfig(level=preset['log_level']),
                 features=FeatureFlags(
-                    enable_beta_features=environment == Environment.DEV,
-                    enable_audit_trail=environment == Environment.PROD
+                    enable_beta_features=preset['beta_features'],
+                    enable_audit_trail=preset['audit_trail']
                 ),
                 autosave=AutosaveConfig(
                     storage={
                         'type': 'localStorage',
                         'key_prefix': f'autosave-{environment.value}',
-                        'max_items': 100 if environment == Environment.PROD else 50,
+                        'max_items': preset['autosave_max_items'],
                         'ttl': 7 * 24 * 60 * 60 * 1000
                     },
                     debounce={
-                        'delay': 5000 if environment == Environment.PROD else 1000,
-                        'max_wait': 30000 if environment == Environment.PROD else 15000
+                        'delay': preset['debounce_delay'],
+                        'max_wait': preset['debounce_max_wait']
                     },
                     retry={
                         'max_retries': 3,
                         'backoff_multiplier': 2,
-                        'initial_delay': 1000 if environment == Environment.PROD else 500
+                        'initial_delay': preset['retry_initial_delay']
                     },
                     ui={
                         'show_status': True,
                         'status_position': 'bottom-right',
-                        'toast_on_save': environment == Environment.DEV,
+                        'toast_on_save': preset['toast_on_save'],
                         'toast_on_error': True
                     }
                 )
@@ -317,12 +345,12 @@ def validate_environment_config(config_dict: Dict[str, Any]) -> ConfigValidation
     
     try:
         # Attempt to parse the configuration
-        EnvironmentConfig.parse_obj(config_dict)
+        parsed = EnvironmentConfig.model_validate(config_dict)
         
-        # Additional business logic validation
+        # Required fields are checked against the raw input, since the model
+        # fills in defaults for anything that was omitted
         webapp_config = config_dict.get('webapp', {})
         
-        # Check for required fields
         if not webapp_config.get('api', {}).get('base_url'):
             errors.append(ConfigValidationError(
                 path='webapp.api.base_url',
@@ -345,10 +373,9 @@ def validate_environment_config(config_dict: Dict[str, Any]) -> ConfigValidation
             ))
         
         # Check for warnings
-        auth_provider = webapp_config.get('auth', {}).get('provider')
-        environment = config_dict.get('meta', {}).get('environment')
+        environment = parsed.meta.environment if parsed.meta else None
         
-        if auth_provider == 'jwt' and environment == 'prod':
+        if parsed.webapp.auth.provider == 'jwt' and environment == Environment.PROD:
             warnings.append(ConfigValidationWarning(
                 path='webapp.auth.provider',
                 message='JWT auth in production should use secure secrets (not dev defaults)'
@@ -365,4 +392,4 @@ def validate_environment_config(config_dict: Dict[str, Any]) -> ConfigValidation
         valid=len(errors) == 0,
         errors=errors,
         warnings=warnings
-    ) 
\ No newline at end of file
+    ) 
@@ -9,27 +9,69 @@ Functional utilities for document preparation and filename handling
 
 import json
 import hashlib
+import secrets
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List
 
-from .eln_filename_utils import parse_eln_filename
+from .eln_filename_utils import parse_eln_filename_parts
 from .filename_generator import FilenameGenerator
 
+def _dumps(data: Any) -> bytes:
+    # Always the stdlib encoder: the canonical bytes feed stored checksums, so
+    # they must not depend on which optional packages are installed (orjson
+    # formats floats differently, writes NaN as null and rejects big ints and
+    # non-str keys)
+    return json.dumps(
+        data, sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    ).encode('utf-8')
+
 
 def generate_timestamp() -> datetime:
     """Generate UTC timestamp for documents"""
     return datetime.now(timezone.utc)
 
 
+def canonicalize(data: Any) -> bytes:
+    """
+    Serialize data once to canonical JSON bytes (compact, sorted keys, UTF-8)
+    
+    Size, checksum and stored payload can all be derived from the result
+    without re-encoding the document.
+    """
+    return _dumps(data)
+
+
+def canonicalize_document(document: Dict[str, Any], form_data_bytes: bytes) -> bytes:
+    """
+    Canonical bytes of a prepared document whose form_data is already canonicalized
+    
+    Canonical JSON is compositional, so the document is encoded with a unique
+    placeholder string in place of form_data and the existing bytes are spliced
+    in; the result equals canonicalize(document) without encoding form_data again.
+    """
+    placeholder = f"\x00form_data-{secrets.token_hex(16)}"
+    shell = _dumps({**document, 'form_data': placeholder})
+    return shell.replace(_dumps(placeholder), form_data_bytes, 1)
+
+
+def calculate_document_size_bytes(buf: bytes) -> int:
+    """Calculate document size from canonical bytes"""
+    return len(buf)
+
+
 def calculate_document_size(data: Dict[str, Any]) -> int:
     """Calculate document size in bytes"""
-    return len(json.dumps(data).encode('utf-8'))
+    return calculate_document_size_bytes(canonicalize(data))
 
 
 def extract_uuid_from_filename(filename: str) -> str:
     """Extract UUID from ELN filename"""
-    parsed = parse_eln_filename(filename)
-    return parsed['uuid']
+    # Generated names end in "-{uuid:8}.json", so slice it at a fixed offset;
+    # anything else goes through the full parser
+    if (len(filename) > 14 and filename[-14] == '-' and filename.endswith('.json')
+            and '-' not in filename[-13:-5] and filename.count('-') >= 3):
+        return filename[-13:-5]
+    return parse_eln_filename_parts(filename).uuid
 
 
 def generate_filename_and_uuid(
@@ -45,15 +87,45 @@ def generate_filename_and_uuid(
         tuple: (filename, uuid)
     """
     filename_generator = FilenameGenerator()
-    filename = filename_generator.generate_filename(
+    return filename_generator.generate_filename_with_uuid(
         status=status,
         username=user_id,
         filename_variables=filename_variables,
         field_ids=field_ids
     )
-    
-    uuid = extract_uuid_from_filename(filename)
-    return filename, uuid
+
+
+# Key layout of saved documents; prepare_document copies these and fills in
+# the per-document values. Never mutate them in place.
+_DRAFT_DOCUMENT_TEMPLATE: Dict[str, Any] = {
+    'draft_id': '',
+    'draft_uuid': '',
+    'filename': '',
+    'sop_id': '',
+    'user_id': '',
+    'timestamp': '',
+    'form_data': None,
+    'status': '',
+    'session_id': 'default',
+}
+
+# ELN document with LD-JSON compliance
+_ELN_DOCUMENT_TEMPLATE: Dict[str, Any] = {
+    'draft_id': '',
+    'draft_uuid': '',
+    'filename': '',
+    'sop_id': '',
+    'user_id': '',
+    'timestamp': '',
+    'form_data': None,
+    'status': '',
+    '@context': 'https://schema.org',
+    '@type': 'Dataset',
+    'eln_uuid': '',
+    'sop_metadata': None,
+    'field_definitions': None,
+    'checksum': '',
+}
 
 
 def prepare_document(
@@ -75,53 +147,51 @@ def prepare_document(
     draft_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """Prepare document with standard structure - handles both drafts and ELNs"""
-    
-    # Base document structure common to both drafts and ELNs
-    prepared_document = {
-        'draft_id': draft_id or '',
-        'draft_uuid': draft_uuid or '',
-        'filename': filename,
-        'sop_id': sop_id,
-        'user_id': user_id,
-        'timestamp': timestamp.isoformat(),
-        'form_data': data,
-        'status': status,
-    }
-
     if is_draft:
-        # Draft-specific fields
-        prepared_document.update({
-            'draft_id': filename[:-5] if filename.endswith('.json') else filename,  # Remove .json extension
-            'draft_uuid': document_uuid,
-            'session_id': session_id or 'default'
-        })
+        document = _DRAFT_DOCUMENT_TEMPLATE.copy()
+        document['draft_id'] = filename[:-5] if filename.endswith('.json') else filename  # Remove .json extension
+        document['draft_uuid'] = document_uuid
+        if session_id:
+            document['session_id'] = session_id
     else:
-        # ELN-specific fields with LD-JSON compliance
-        prepared_document.update({
-            '@context': 'https://schema.org',
-            '@type': 'Dataset',
-            'eln_uuid': document_uuid,
-            'sop_metadata': sop_metadata or {},
-            'field_definitions': field_definitions or [],
-            'checksum': checksum or ''
-        })
-
-    return prepared_document
+        document = _ELN_DOCUMENT_TEMPLATE.copy()
+        if draft_id:
+            document['draft_id'] = draft_id
+        if draft_uuid:
+            document['draft_uuid'] = draft_uuid
+        document['eln_uuid'] = document_uuid
+        document['sop_metadata'] = sop_metadata or {}
+        document['field_definitions'] = field_definitions or []
+        if checksum:
+            document['checksum'] = checksum
+    
+    document['filename'] = filename
+    document['sop_id'] = sop_id
+    document['user_id'] = user_id
+    document['timestamp'] = timestamp.isoformat()
+    document['form_data'] = data
+    document['status'] = status
+    return document
 
 def generate_session_id(timestamp: datetime) -> str:
     """Generate session ID from timestamp"""
     return f"session-{int(timestamp.timestamp())}"
 
 
+def calculate_checksum_bytes(buf: bytes) -> str:
+    """Calculate SHA256 checksum of canonical bytes"""
+    # Integrity check only, not a security primitive; lets FIPS builds use it
+    return hashlib.sha256(buf, usedforsecurity=False).hexdigest()
+
+
 def calculate_checksum(data: Dict[str, Any]) -> str:
     """Calculate SHA256 checksum for data integrity"""
-    content = json.dumps(data, sort_keys=True).encode('utf-8')
-    return hashlib.sha256(content).hexdigest()
+    return calculate_checksum_bytes(canonicalize(data))
 
 
 def serialize_document(data: Dict[str, Any]) -> str:
     """Serialize document data to JSON string"""
-    return json.dumps(data, sort_keys=True)
+    return canonicalize(data).decode('utf-8')
 
 
 def deserialize_document(json_str: str) -> Dict[str, Any]:
@@ -129,23 +199,6 @@ def deserialize_document(json_str: str) -> Dict[str, Any]:
     return json.loads(json_str)
 
 
-def safe_timestamp_key(item):
-    """
-    Safely extract timestamp for sorting, handling both timezone-aware and timezone-naive datetimes.
-    
-    Args:
-        item: Object with a timestamp attribute (DraftMetadata or ELNMetadata)
-        
-    Returns:
-        datetime: Timezone-aware datetime for safe comparison
-    """
-    ts = item.timestamp
-    # If timezone-naive, assume UTC
-    if ts.tzinfo is None:
-        return ts.replace(tzinfo=timezone.utc)
-    return ts
-
-
 def process_temp_filename(temp_filename: str) -> str:
     """Process temp filename and return final filename"""
     from .file_validation import parse_temp_filename_and_unescape
@@ -9,27 +9,48 @@ Handles ELN data access control based on SOP template authorization configuratio
 Uses filename variables to dynamically add groups for access control.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 import logging
 from .auth import User
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(frozen=True)
 class AuthorizationConfig:
-    """Authorization configuration from SOP template"""
+    """Authorization configuration from SOP template
+    
+    Immutable and slotted; __slots__ is spelled out because dataclass
+    slots=True requires Python 3.10.
+    """
+    __slots__ = (
+        'public', 'allowed_users', 'allowed_groups', 'filename_variable_access',
+        'required_permissions', 'allowed_users_set', 'allowed_groups_set', 'has_user_wildcard',
+    )
+    
     public: bool
-    allowed_users: List[str]
-    allowed_groups: List[str]
-    filename_variable_access: List[str]
-    required_permissions: List[str]
+    allowed_users: Tuple[str, ...]
+    allowed_groups: Tuple[str, ...]
+    filename_variable_access: Tuple[str, ...]
+    required_permissions: Tuple[str, ...]
+    
+    def __post_init__(self):
+        # Derived lookups, built once per parsed config
+        object.__setattr__(self, 'allowed_users_set', frozenset(self.allowed_users))
+        object.__setattr__(self, 'allowed_groups_set', frozenset(self.allowed_groups))
+        object.__setattr__(self, 'has_user_wildcard', any(u.startswith("*:") for u in self.allowed_users))
 
 class ELNAccessControl:
     """ELN access control system"""
     
+    AUTH_CONFIG_CACHE_MAXSIZE = 128
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # (id(sop), config_key) -> (sop, parsed config). SOP templates are
+        # treated as immutable once loaded; the SOP itself is kept so its id
+        # can't be reused by another dict while the entry is alive.
+        self._auth_cache: Dict[Tuple[int, str], Tuple[Dict[str, Any], AuthorizationConfig]] = {}
     
     def can_access_eln(
         self, 
@@ -44,40 +65,54 @@ class ELNAccessControl:
             user: Current user
             eln_metadata: ELN metadata (creator, filename variables, etc.)
             sop_template: SOP template with authorization configuration
+        
+        Raises:
+            Exception: If the SOP authorization config is malformed; callers
+            must treat this as a denial
         """
-        try:
-            # Get authorization configuration from SOP template
-            auth_config = self._parse_authorization_config(sop_template, 'eln_default_permissions')
-            
-            # Check admin override
-            if user.is_admin:
-                return True
-            
-            # Check if public
-            if auth_config.public:
-                return True
-            
-            # Check allowed users
-            if self._check_allowed_users(user, auth_config.allowed_users):
-                return True
-            
-            # Get dynamic groups from filename variables
-            dynamic_groups = self._get_dynamic_groups(eln_metadata, auth_config.filename_variable_access)
-            all_allowed_groups = auth_config.allowed_groups + dynamic_groups
-            
-            # Check allowed groups
-            if self._check_allowed_groups(user, all_allowed_groups):
-                return True
-            
-            # Check required permissions
-            if not self._check_required_permissions(user, auth_config.required_permissions):
-                return False
-            
+        # Reject malformed inputs up front instead of relying on a catch-all
+        if not isinstance(eln_metadata, dict) or not isinstance(sop_template, dict):
+            return False
+        
+        # Get authorization configuration from SOP template
+        auth_config = self._parse_authorization_config(sop_template, 'eln_default_permissions')
+        return self._can_access_eln_with_config(user, eln_metadata, auth_config)
+    
+    def _can_access_eln_with_config(
+        self,
+        user: User,
+        eln_metadata: Dict[str, Any],
+        auth_config: AuthorizationConfig
+    ) -> bool:
+        """Access check against an already parsed authorization config"""
+        # Check admin override
+        if user.is_admin:
             return True
-            
-        except Exception as e:
-            self.logger.error(f"ELN access check failed: {e}")
+        
+        # Check if public
+        if auth_config.public:
+            return True
+        
+        # Check allowed users
+        if self._check_allowed_users(user, auth_config):
+            return True
+        
+        # Check static allowed groups
+        if self._check_allowed_groups(user, auth_config.allowed_groups_set):
+            return True
+        
+        # Get dynamic groups from filename variables
+        dynamic_groups = self._get_dynamic_groups(eln_metadata, auth_config.filename_variable_access)
+        
+        # Check dynamic groups
+        if self._check_allowed_groups(user, dynamic_groups):
+            return True
+        
+        # Check required permissions
+        if not self._check_required_permissions(user, auth_config.required_permissions):
             return False
+        
+        return True
     
     def can_import_prerequisite_eln(
         self,
@@ -148,13 +183,42 @@ class ELNAccessControl:
             sop_template = {"metadata": {"permissions": {"required_groups": ["project_id:123"]}}}
             eln_access_control.filter_accessible_elns(user, elns, sop_template)
         """
-        accessible_elns = []
+        # Single handler for the whole batch: any failure denies access to all
+        try:
+            return self._filter_accessible_elns(user, elns, sop_template)
+        except Exception as e:
+            self.logger.error(f"ELN access check failed: {e}")
+            return []
+    
+    def _filter_accessible_elns(
+        self,
+        user: User,
+        elns: List[Dict[str, Any]],
+        sop_template: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        # Malformed ELN entries are never accessible
+        elns = [eln for eln in elns if isinstance(eln, dict)]
+        
+        # Same SOP for every ELN, so parse its authorization config once
+        auth_config = self._parse_authorization_config(sop_template, 'eln_default_permissions')
         
-        for eln in elns:
-            if self.can_access_eln(user, eln, sop_template):
-                accessible_elns.append(eln)
+        # Everything except the filename-variable groups is the same for
+        # every ELN; if any of those checks grants access, all ELNs pass
+        if (user.is_admin
+                or auth_config.public
+                or self._check_allowed_users(user, auth_config)
+                or self._check_allowed_groups(user, auth_config.allowed_groups_set)
+                or self._check_required_permissions(user, auth_config.required_permissions)):
+            return elns
         
-        return accessible_elns
+        filename_variables = auth_config.filename_variable_access
+        if not filename_variables:
+            return []
+        
+        return [
+            eln for eln in elns
+            if self._check_allowed_groups(user, self._get_dynamic_groups(eln, filename_variables))
+        ]
     
     def _parse_authorization_config(self, sop: Dict[str, Any], config_key: str) -> AuthorizationConfig:
         """Parse authorization configuration from SOP
@@ -174,21 +238,35 @@ class ELNAccessControl:
             auth_config = eln_access_control._parse_authorization_config(sop, 'eln_default_permissions')
             # Returns AuthorizationConfig object with public, allowed_users, allowed_groups, filename_variable_access, and required_permissions
         """
+        key = (id(sop), config_key)
+        cached = self._auth_cache.get(key)
+        if cached is not None and cached[0] is sop:
+            return cached[1]
+        
         auth_config = sop.get('metadata', {}).get(config_key, {})
-        return AuthorizationConfig(
+        parsed = AuthorizationConfig(
             public=auth_config.get('public', False),
-            allowed_users=auth_config.get('allowed_users', []),
-            allowed_groups=auth_config.get('allowed_groups', []),
-            filename_variable_access=auth_config.get('filename_variable_access', []),
-            required_permissions=auth_config.get('required_permissions', [])
+            allowed_users=tuple(auth_config.get('allowed_users', ())),
+            allowed_groups=tuple(auth_config.get('allowed_groups', ())),
+            filename_variable_access=tuple(auth_config.get('filename_variable_access', ())),
+            required_permissions=tuple(auth_config.get('required_permissions', ()))
         )
+        
+        if len(self._auth_cache) >= self.AUTH_CONFIG_CACHE_MAXSIZE:
+            self._auth_cache.pop(next(iter(self._auth_cache)))
+        self._auth_cache[key] = (sop, parsed)
+        return parsed
+    
+    def clear_cache(self) -> None:
+        """Drop parsed authorization configs (e.g. after SOPs are reloaded)"""
+        self._auth_cache.clear()
     
-    def _check_allowed_users(self, user: User, allowed_users: List[str]) -> bool:
+    def _check_allowed_users(self, user: User, auth_config: AuthorizationConfig) -> bool:
         """Check if any version of the user (id, email, username) is in allowed users list
         
         Args:
             user: Current user
-            allowed_users: List of allowed users
+            auth_config: Parsed authorization config (uses its allowed users set)
 
         Returns:
             True if user is in allowed users list, False otherwise
@@ -198,39 +276,28 @@ class ELNAccessControl:
 
         Example:
             user = User(id="123", username="john.doe", email="john.doe@example.com", is_admin=False)
-            allowed_users = ["john.doe@example.com", "jane.doe@example.com"]
-            eln_access_control._check_allowed_users(user, allowed_users)
+            auth_config = eln_access_control._parse_authorization_config(sop, 'eln_default_permissions')
+            eln_access_control._check_allowed_users(user, auth_config)
             # Returns True if user is in allowed users list, False otherwise
         """
-        if not allowed_users:
+        allowed = auth_config.allowed_users_set
+        if not allowed:
             return False
         
-        # Check exact user ID match
-        if user.id in allowed_users:
-            return True
-        
-        # Check username match
-        if user.username in allowed_users:
-            return True
-        
-        # Check email match
-        if user.email in allowed_users:
+        # Check user ID, username and email match
+        if user.id in allowed or user.username in allowed or user.email in allowed:
             return True
         
         # Check wildcard patterns (e.g., "*:admin" for all admins)
-        for pattern in allowed_users:
-            if pattern.startswith("*:") and user.is_admin:
-                return True
-        
-        return False
+        return auth_config.has_user_wildcard and user.is_admin
     
-    def _check_allowed_groups(self, user: User, allowed_groups: List[str]) -> bool:
+    def _check_allowed_groups(self, user: User, allowed_groups: Iterable[str]) -> bool:
         """Check if user is in any of the allowed groups"""
-        return bool(allowed_groups) and any(user.is_in_group(group) for group in allowed_groups)
+        return user.is_in_any_group(allowed_groups)
     
-    def _check_required_permissions(self, user: User, required_permissions: List[str]) -> bool:
+    def _check_required_permissions(self, user: User, required_permissions: Iterable[str]) -> bool:
         """Check if user has all required permissions"""
-        return all(user.has_permission(perm) for perm in required_permissions)
+        return user.has_all_permissions(required_permissions)
     
     def _get_dynamic_groups(self, eln_metadata: Dict[str, Any], filename_variables: List[str]) -> List[str]:
         """
@@ -253,15 +320,8 @@ class ELNAccessControl:
             eln_access_control._get_dynamic_groups(eln_metadata, filename_variables)
             # Returns ["123"]
         """
-        dynamic_groups = []
-        
-        for var_name in filename_variables:
-            var_value = eln_metadata.get(var_name)
-            if var_value:
-                # Add the filename variable value as a group name
-                dynamic_groups.append(str(var_value))
-        
-        return dynamic_groups
+        # Each non-empty filename variable value becomes a group name
+        return [str(value) for value in map(eln_metadata.get, filename_variables) if value]
 
 # Global instance
 eln_access_control = ELNAccessControl() 
\ No newline at end of file
@@ -8,15 +8,33 @@ Handles parsing and validation of regulatory-compliant ELN filenames
 """
 
 import re
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# {status}-{username}-[{vars}-]{timestamp}-{uuid}.json, any content per part
+_ELN_FILENAME_PARTS_RE = re.compile(r'([^-]*)-([^-]*)-(?:(.*)-)?([^-]*)-([^-]*)\.json', re.DOTALL)
+
+# Same layout with the status, timestamp and uuid formats enforced
+_VALID_ELN_FILENAME_RE = re.compile(
+    r'(?:draft|final)-[^-]*-(?:.*-)?\d{8}_\d{6}-[a-f0-9]{8}\.json', re.DOTALL
+)
+
 class FilenameGenerationError(Exception):
     """Base exception for filename generation errors"""
     pass
 
+class ParsedELNFilename(NamedTuple):
+    """Immutable ELN filename components (see parse_eln_filename_parts)"""
+    status: str
+    username: str
+    variables: Tuple[str, ...]
+    timestamp: str
+    uuid: str
+    full_filename: str
+
 def parse_eln_filename(filename: str) -> Dict[str, str]:
     """
     Parse ELN filename back into components
@@ -30,35 +48,45 @@ def parse_eln_filename(filename: str) -> Dict[str, str]:
     Raises:
         FilenameGenerationError: If filename format is invalid
     """
-    # Remove .json extension
-    if not filename.endswith('.json'):
-        raise FilenameGenerationError(f"Invalid filename extension: {filename}")
+    parsed = parse_eln_filename_parts(filename)
+    return {
+        'status': parsed.status,
+        'username': parsed.username,
+        'variables': list(parsed.variables),
+        'timestamp': parsed.timestamp,
+        'uuid': parsed.uuid,
+        'full_filename': parsed.full_filename
+    }
+
+@lru_cache(maxsize=4096)
+def parse_eln_filename_parts(filename: str) -> ParsedELNFilename:
+    """
+    Parse ELN filename into an immutable tuple of components
     
-    base_name = filename[:-5]  # Remove .json
+    Results are memoized per filename, since listing and access checks
+    parse the same names repeatedly. Use parse_eln_filename for a dict.
     
-    # Split into parts
-    parts = base_name.split('-')
+    Raises:
+        FilenameGenerationError: If filename format is invalid
+    """
+    if not filename.endswith('.json'):
+        raise FilenameGenerationError(f"Invalid filename extension: {filename}")
     
-    if len(parts) < 4:
+    match = _ELN_FILENAME_PARTS_RE.fullmatch(filename)
+    if not match:
         raise FilenameGenerationError(f"Invalid filename format: {filename}")
     
-    # Extract components
-    status = parts[0]
-    username = parts[1]
-    timestamp = parts[-2]
-    uuid_part = parts[-1]
+    status, username, variables, timestamp, uuid_part = match.groups()
     
-    # Variables are everything between username and timestamp
-    variables = parts[2:-2] if len(parts) > 4 else []
-    
-    return {
-        'status': status,
-        'username': username,
-        'variables': variables,
-        'timestamp': timestamp,
-        'uuid': uuid_part,
-        'full_filename': filename
-    }
+    return ParsedELNFilename(
+        status=status,
+        username=username,
+        # Variables are everything between username and timestamp
+        variables=tuple(variables.split('-')) if variables is not None else (),
+        timestamp=timestamp,
+        uuid=uuid_part,
+        full_filename=filename
+    )
 
 def validate_eln_filename_format(filename: str) -> bool:
     """
@@ -70,25 +98,5 @@ def validate_eln_filename_format(filename: str) -> bool:
     Returns:
         True if format is valid, False otherwise
     """
-    try:
-        parsed = parse_eln_filename(filename)
-        
-        # Validate status
-        if parsed['status'] not in ['draft', 'final']:
-            return False
-        
-        # Validate timestamp format
-        timestamp = parsed['timestamp']
-        if not re.match(r'^\d{8}_\d{6}$', timestamp):
-            return False
-        
-        # Validate UUID format
-        uuid_part = parsed['uuid']
-        if not re.match(r'^[a-f0-9]{8}$', uuid_part):
-            return False
-        
-        return True
-        
-    except FilenameGenerationError:
-        return False
+    return _VALID_ELN_FILENAME_RE.fullmatch(filename) is not None
  
\ No newline at end of file
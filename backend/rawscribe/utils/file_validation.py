@@ -7,12 +7,16 @@ File Upload Validation and Security Controls for CLAIRE
 Provides comprehensive validation for uploaded files including type, size, and content checks
 """
 
+import asyncio
+import codecs
+import hashlib
 import mimetypes
 import logging
-from typing import Set, Optional, Tuple, List
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Tuple, List
 from fastapi import UploadFile, HTTPException
-from pathlib import Path
-import hashlib
 
 # Optional magic import for better MIME detection
 try:
@@ -24,6 +28,69 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+def _split_extension(filename: str) -> Tuple[str, str]:
+    """Split a bare filename into (stem, suffix) with pathlib's rules ('.bashrc' has no suffix)"""
+    i = filename.rfind('.')
+    if 0 < i < len(filename) - 1:
+        return filename[:i], filename[i:]
+    return filename, ''
+
+def _mime_suffix_key(filename: str) -> str:
+    """
+    Reduce a filename to what mimetypes.guess_type actually looks at
+    
+    guess_type only uses the last two suffixes (e.g. '.tar.gz'), so names
+    sharing them map to the same key and cache entry. Names where the stem
+    is empty or all dots are returned as-is.
+    """
+    i = filename.rfind('.')
+    if i <= 0:
+        return filename
+    j = filename.rfind('.', 0, i)
+    k = j if j > 0 else i
+    if not filename[:k].lstrip('.'):
+        return filename
+    return 'x' + filename[k:]
+
+@lru_cache(maxsize=256)
+def _guess_type_by_suffix(suffix_key: str) -> Optional[str]:
+    return mimetypes.guess_type(suffix_key)[0]
+
+# Characters replaced with '_' in uploaded filenames
+_FILENAME_SANITIZE_TABLE = str.maketrans(dict.fromkeys('<>:"|?*\0', '_'))
+
+# Common MIME variations that are acceptable per extension
+_ACCEPTABLE_MIME_VARIANTS: Dict[str, FrozenSet[str]] = {
+    '.txt': frozenset({'text/plain', 'application/octet-stream'}),
+    '.csv': frozenset({'text/csv', 'text/plain', 'application/csv'}),
+    '.json': frozenset({'application/json', 'text/plain'}),
+    '.xml': frozenset({'application/xml', 'text/xml', 'text/plain'}),
+    '.yaml': frozenset({'text/yaml', 'text/x-yaml', 'text/plain'}),
+    '.yml': frozenset({'text/yaml', 'text/x-yaml', 'text/plain'}),
+}
+_NO_VARIANTS: FrozenSet[str] = frozenset()
+
+# File signatures libmagic would resolve the same way, checked before calling it.
+# Zip is left to libmagic since it has to tell OOXML documents apart.
+_MAGIC_PREFIX_TYPES: Tuple[Tuple[bytes, str], ...] = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'\x1f\x8b', 'application/gzip'),
+)
+_MAGIC_PREFIXES: Tuple[bytes, ...] = tuple(prefix for prefix, _ in _MAGIC_PREFIX_TYPES)
+
+# Detected from the head only as a generic container; re-sniffed on the whole file
+_CONTAINER_MIME_TYPES: FrozenSet[str] = frozenset({
+    'application/zip', 'application/x-ole-storage', 'application/CDFV2',
+})
+
+# Shell shebang or PHP anywhere in the checked head (not anchored, so a BOM,
+# blank line or other leading bytes can't hide a script)
+_SCRIPT_CONTENT_RE = re.compile(rb'#!\s*/bin/|<\?php', re.IGNORECASE)
+
 class FileValidationError(Exception):
     """Exception raised when file validation fails"""
     def __init__(self, message: str, error_code: str = "VALIDATION_ERROR", details: dict = None):
@@ -36,7 +103,7 @@ class FileValidator:
     """Comprehensive file validation with security controls"""
     
     # Allowed file extensions (case insensitive)
-    ALLOWED_EXTENSIONS: Set[str] = {
+    ALLOWED_EXTENSIONS: FrozenSet[str] = frozenset({
         # Documents
         '.pdf', '.doc', '.docx', '.txt', '.rtf',
         # Excel files
@@ -47,10 +114,12 @@ class FileValidator:
         '.zip', '.tar', '.gz',
         # Data formats
         '.json', '.xml', '.yaml', '.yml'
-    }
+    })
+    _ALLOWED_EXTENSIONS_SORTED: Tuple[str, ...] = tuple(sorted(ALLOWED_EXTENSIONS))
+    _ALLOWED_EXTENSIONS_TEXT: str = ', '.join(_ALLOWED_EXTENSIONS_SORTED)
     
     # Allowed MIME types with their expected extensions
-    ALLOWED_MIME_TYPES: Set[str] = {
+    ALLOWED_MIME_TYPES: FrozenSet[str] = frozenset({
         # Documents
         'application/pdf',
         'application/msword',
@@ -67,22 +136,58 @@ class FileValidator:
         'application/zip', 'application/x-tar', 'application/gzip',
         # Data
         'application/json', 'application/xml', 'text/yaml', 'text/x-yaml'
-    }
+    })
     
     # Dangerous extensions that should never be allowed
-    DANGEROUS_EXTENSIONS: Set[str] = {
+    DANGEROUS_EXTENSIONS: FrozenSet[str] = frozenset({
         '.exe', '.bat', '.cmd', '.com', '.scr', '.pif', '.vbs', '.js', '.jar',
         '.sh', '.bash', '.php', '.asp', '.aspx', '.jsp', '.pl', '.py', '.rb',
         '.msi', '.deb', '.rpm', '.dmg', '.app', '.run'
-    }
+    })
+    
+    # Executable magic numbers, matched byte for byte at the start of the file
+    EXECUTABLE_SIGNATURES: Tuple[bytes, ...] = (
+        b'MZ',  # PE executable
+        b'\x7fELF',  # ELF executable
+        b'\xfe\xed\xfa',  # Mach-O
+    )
+    
+    # Extensions whose content is scanned for script injection
+    TEXT_EXTENSIONS: FrozenSet[str] = frozenset({'.txt', '.csv', '.json', '.xml', '.yaml', '.yml'})
+    
+    # Script injection patterns rejected in text-based files (matched lowercase)
+    SUSPICIOUS_PATTERNS: Tuple[str, ...] = (
+        '<script', '</script>', 'javascript:', 'vbscript:',
+        'onload=', 'onerror=', 'onclick=', 'eval(',
+        'document.cookie', 'document.write'
+    )
+    _SUSPICIOUS_PATTERNS_BYTES: Tuple[bytes, ...] = tuple(p.encode('ascii') for p in SUSPICIOUS_PATTERNS)
+    
+    # Uploads are streamed: the first SNIFF_SIZE bytes are kept for MIME
+    # detection and the executable check, the rest is read in chunks
+    SNIFF_SIZE = 8 * 1024
+    READ_CHUNK_SIZE = 64 * 1024
+    # Text scanning is batched into executor calls of about this size;
+    # batches smaller than a read chunk are cheaper to scan inline
+    SCAN_BATCH_SIZE = 1024 * 1024
+    
+    # Sniffed heads whose libmagic result is remembered
+    MAGIC_CACHE_MAXSIZE = 1024
     
     # File size limits
     MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB per file
     MAX_TOTAL_UPLOAD_SIZE = 100 * 1024 * 1024  # 100MB per upload batch
     MAX_FILES_PER_UPLOAD = 10
     
+    # Files of one batch validated concurrently
+    MAX_CONCURRENT_VALIDATIONS = 4
+    
     def __init__(self):
         """Initialize file validator"""
+        # blake2b digest of a sniffed head -> libmagic result
+        self._magic_cache: Dict[bytes, str] = {}
+        self._magic_cache_lock = threading.Lock()
+        
         # Initialize magic for MIME type detection
         if HAS_MAGIC:
             try:
@@ -104,6 +209,11 @@ class FileValidator:
         Raises:
             FileValidationError: If file fails validation
         """
+        detected_mime, sanitized_filename, _ = await self._validate_file(file)
+        return detected_mime, sanitized_filename
+    
+    async def _validate_file(self, file: UploadFile) -> Tuple[str, str, int]:
+        """Validate a file and also return its size in bytes, as read during validation"""
         # Basic checks
         if not file.filename:
             raise FileValidationError(
@@ -113,21 +223,11 @@ class FileValidator:
         
         # Check file size
         if hasattr(file, 'size') and file.size and file.size > self.MAX_FILE_SIZE:
-            size_mb = file.size / (1024 * 1024)
-            max_mb = self.MAX_FILE_SIZE / (1024 * 1024)
-            raise FileValidationError(
-                f"File is too large ({size_mb:.1f} MB). Maximum file size is {max_mb:.0f} MB.",
-                error_code="FILE_TOO_LARGE",
-                details={
-                    "file_size": file.size,
-                    "max_size": self.MAX_FILE_SIZE,
-                    "filename": file.filename
-                }
-            )
+            raise self._file_too_large_error(file.size, file.filename)
         
         # Sanitize and validate filename
         sanitized_filename = self._sanitize_filename(file.filename)
-        file_ext = Path(sanitized_filename).suffix.lower()
+        file_ext = _split_extension(sanitized_filename)[1].lower()
         
         # Check for dangerous extensions FIRST (priority check)
         if file_ext in self.DANGEROUS_EXTENSIONS:
@@ -142,35 +242,45 @@ class FileValidator:
         
         # Check if extension is allowed
         if file_ext not in self.ALLOWED_EXTENSIONS:
-            allowed_list = ', '.join(sorted(self.ALLOWED_EXTENSIONS))
             raise FileValidationError(
-                f"File type '{file_ext}' is not supported. Supported types: {allowed_list}",
+                f"File type '{file_ext}' is not supported. Supported types: {self._ALLOWED_EXTENSIONS_TEXT}",
                 error_code="UNSUPPORTED_FILE_TYPE",
                 details={
                     "extension": file_ext,
                     "filename": file.filename,
-                    "allowed_extensions": sorted(self.ALLOWED_EXTENSIONS)
+                    "allowed_extensions": list(self._ALLOWED_EXTENSIONS_SORTED)
                 }
             )
         
-        # Read file content for MIME validation
-        file_content = await file.read()
+        # Stream the content instead of buffering the whole file: only the head
+        # is kept, while size and the text scan are computed chunk by chunk.
+        # Scanning and MIME sniffing are CPU work, so they run in the default
+        # executor to keep the event loop free for other requests; the scan
+        # is batched so a large upload costs a few thread hops, not hundreds.
+        loop = asyncio.get_running_loop()
+        text_scanner = self._text_security_scanner() if file_ext in self.TEXT_EXTENSIONS else None
+        head = await file.read(self.SNIFF_SIZE)
+        actual_size = 0
+        pending: List[bytes] = []
+        pending_size = 0
+        chunk = head
+        while chunk:
+            actual_size += len(chunk)
+            if actual_size > self.MAX_FILE_SIZE:
+                # Oversized: stop reading, the size check below rejects it
+                break
+            if text_scanner is not None:
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= self.SCAN_BATCH_SIZE:
+                    await self._feed_text_scanner(loop, text_scanner, pending)
+                    pending, pending_size = [], 0
+            chunk = await file.read(self.READ_CHUNK_SIZE)
         await file.seek(0)  # Reset file pointer
         
         # Validate file size from actual content
-        actual_size = len(file_content)
         if actual_size > self.MAX_FILE_SIZE:
-            size_mb = actual_size / (1024 * 1024)
-            max_mb = self.MAX_FILE_SIZE / (1024 * 1024)
-            raise FileValidationError(
-                f"File is too large ({size_mb:.1f} MB). Maximum file size is {max_mb:.0f} MB.",
-                error_code="FILE_TOO_LARGE",
-                details={
-                    "file_size": actual_size,
-                    "max_size": self.MAX_FILE_SIZE,
-                    "filename": file.filename
-                }
-            )
+            raise self._file_too_large_error(actual_size, file.filename)
         
         if actual_size == 0:
             raise FileValidationError(
@@ -180,10 +290,20 @@ class FileValidator:
             )
         
         # Additional security checks FIRST (before MIME validation)
-        self._check_file_content_security(file_content, file_ext)
+        self._check_executable_content(head, file_ext)
+        if text_scanner is not None:
+            if pending:
+                await self._feed_text_scanner(loop, text_scanner, pending)
+            text_scanner.check()
         
         # Detect MIME type
-        detected_mime = self._detect_mime_type(file_content, sanitized_filename)
+        detected_mime = await loop.run_in_executor(None, self._detect_mime_type, head, sanitized_filename)
+        if self.magic_mime and detected_mime in _CONTAINER_MIME_TYPES and actual_size > len(head):
+            # Container formats (OOXML, OLE) may need more than the head to be
+            # told apart, so sniff the whole file for those
+            file_content = await file.read()
+            await file.seek(0)
+            detected_mime = await loop.run_in_executor(None, self._detect_mime_type, file_content, sanitized_filename)
         
         # Validate MIME type
         if detected_mime not in self.ALLOWED_MIME_TYPES:
@@ -200,7 +320,30 @@ class FileValidator:
                 )
         
         logger.info(f"File validation passed: {sanitized_filename} ({detected_mime}, {actual_size} bytes)")
-        return detected_mime, sanitized_filename
+        return detected_mime, sanitized_filename, actual_size
+    
+    async def _feed_text_scanner(self, loop: asyncio.AbstractEventLoop,
+                                 scanner: '_TextSecurityScanner', chunks: List[bytes]) -> None:
+        """Feed a batch of read chunks to the text scanner (small batches inline)"""
+        data = b''.join(chunks)
+        if len(data) < self.READ_CHUNK_SIZE:
+            scanner.feed(data)
+        else:
+            await loop.run_in_executor(None, scanner.feed, data)
+    
+    def _file_too_large_error(self, file_size: int, filename: str) -> FileValidationError:
+        """Build the FILE_TOO_LARGE error (reported from the declared and the actual size)"""
+        size_mb = file_size / (1024 * 1024)
+        max_mb = self.MAX_FILE_SIZE / (1024 * 1024)
+        return FileValidationError(
+            f"File is too large ({size_mb:.1f} MB). Maximum file size is {max_mb:.0f} MB.",
+            error_code="FILE_TOO_LARGE",
+            details={
+                "file_size": file_size,
+                "max_size": self.MAX_FILE_SIZE,
+                "filename": filename
+            }
+        )
     
     async def validate_upload_batch(self, files: List[UploadFile]) -> List[Tuple[UploadFile, str, str]]:
         """
@@ -219,16 +362,26 @@ class FileValidator:
                 }
             )
         
+        # Validate files concurrently so reads and MIME sniffing overlap.
+        # Exceptions are collected and re-raised in file order below, so
+        # the reported error is the same as with one-by-one validation.
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_VALIDATIONS)
+        
+        async def validate_one(file: UploadFile) -> Tuple[str, str, int]:
+            async with semaphore:
+                return await self._validate_file(file)
+        
+        results = await asyncio.gather(*map(validate_one, files), return_exceptions=True)
+        
         validated_files = []
         total_size = 0
         
-        for file in files:
-            detected_mime, sanitized_filename = await self.validate_file(file)
+        for file, result in zip(files, results):
+            if isinstance(result, BaseException):
+                raise result
+            detected_mime, sanitized_filename, file_size = result
             
             # Check total upload size
-            file_size = len(await file.read())
-            await file.seek(0)  # Reset file pointer
-            
             total_size += file_size
             if total_size > self.MAX_TOTAL_UPLOAD_SIZE:
                 total_mb = total_size / (1024 * 1024)
@@ -249,17 +402,15 @@ class FileValidator:
     
     def _sanitize_filename(self, filename: str) -> str:
         """Sanitize filename to prevent path traversal and other attacks"""
-        # Remove path components
-        filename = Path(filename).name
+        # Remove path components (POSIX or Windows separators)
+        filename = filename.rpartition('/')[2].rpartition('\\')[2]
         
         # Remove dangerous characters
-        dangerous_chars = ['<', '>', ':', '"', '|', '?', '*', '\0']
-        for char in dangerous_chars:
-            filename = filename.replace(char, '_')
+        filename = filename.translate(_FILENAME_SANITIZE_TABLE)
         
         # Limit length
         if len(filename) > 255:
-            name, ext = Path(filename).stem, Path(filename).suffix
+            name, ext = _split_extension(filename)
             filename = name[:255-len(ext)] + ext
         
         # Ensure it's not empty or just dots
@@ -272,83 +423,109 @@ class FileValidator:
         """Detect MIME type using multiple methods"""
         # Try python-magic first (most accurate)
         if self.magic_mime:
+            # Unambiguous signatures give the same answer as libmagic without
+            # a trip through its database
+            if content.startswith(_MAGIC_PREFIXES):
+                for prefix, mime_type in _MAGIC_PREFIX_TYPES:
+                    if content.startswith(prefix):
+                        return mime_type
             try:
-                detected = self.magic_mime.from_buffer(content)
+                detected = self._magic_from_buffer(content)
                 if detected and detected != 'application/octet-stream':
                     return detected
             except Exception as e:
                 logger.warning(f"Magic MIME detection failed: {e}")
         
         # Fallback to mimetypes based on extension
-        guessed_type, _ = mimetypes.guess_type(filename)
+        guessed_type = _guess_type_by_suffix(_mime_suffix_key(filename))
         if guessed_type:
             return guessed_type
         
         # Default fallback
         return 'application/octet-stream'
     
+    def _magic_from_buffer(self, content: bytes) -> str:
+        """libmagic lookup, memoized per sniffed head since retried uploads resend the same bytes"""
+        if len(content) > self.SNIFF_SIZE:
+            return self.magic_mime.from_buffer(content)
+        
+        key = hashlib.blake2b(content, digest_size=16).digest()
+        detected = self._magic_cache.get(key)
+        if detected is None:
+            detected = self.magic_mime.from_buffer(content)
+            # Sniffing runs in executor threads, so guard the eviction
+            with self._magic_cache_lock:
+                if len(self._magic_cache) >= self.MAGIC_CACHE_MAXSIZE:
+                    self._magic_cache.pop(next(iter(self._magic_cache)), None)
+                self._magic_cache[key] = detected
+        return detected
+    
     def _is_acceptable_mime_variant(self, mime_type: str, file_ext: str) -> bool:
         """Check if MIME type is an acceptable variant for the file extension"""
-        # Common variations that are acceptable
-        acceptable_variants = {
-            '.txt': ['text/plain', 'application/octet-stream'],
-            '.csv': ['text/csv', 'text/plain', 'application/csv'],
-            '.json': ['application/json', 'text/plain'],
-            '.xml': ['application/xml', 'text/xml', 'text/plain'],
-            '.yaml': ['text/yaml', 'text/x-yaml', 'text/plain'],
-            '.yml': ['text/yaml', 'text/x-yaml', 'text/plain']
-        }
-        
-        return mime_type in acceptable_variants.get(file_ext, [])
+        return mime_type in _ACCEPTABLE_MIME_VARIANTS.get(file_ext, _NO_VARIANTS)
     
-    def _check_file_content_security(self, content: bytes, file_ext: str) -> None:
-        """Additional security checks on file content"""
-        # Check for executable signatures
-        executable_signatures = [
-            b'MZ',  # PE executable
-            b'\x7fELF',  # ELF executable
-            b'\xfe\xed\xfa',  # Mach-O
-            b'#!/bin/',  # Shell script
-            b'<?php',  # PHP script
-        ]
-        
-        content_start = content[:1024].lower()  # Check first 1KB
+    def _check_executable_content(self, content: bytes, file_ext: str) -> None:
+        """Reject executable or script content based on the start of the file"""
+        # Executable magic numbers only mean something at offset 0; script
+        # markers are searched for anywhere in the first 1KB
+        if (content.startswith(self.EXECUTABLE_SIGNATURES)
+                or _SCRIPT_CONTENT_RE.search(content, 0, 1024)):
+            raise FileValidationError(
+                "File contains executable content and cannot be uploaded for security reasons.",
+                error_code="EXECUTABLE_CONTENT",
+                details={"extension": file_ext}
+            )
+    
+    def _text_security_scanner(self) -> '_TextSecurityScanner':
+        return _TextSecurityScanner(self.SUSPICIOUS_PATTERNS, self._SUSPICIOUS_PATTERNS_BYTES)
+
+
+class _TextSecurityScanner:
+    """
+    Incremental scan of text content for script injection patterns
+    
+    Matches exactly what searching content.decode('utf-8', errors='ignore').lower()
+    would find, but works chunk by chunk. Matching happens on lowercased UTF-8
+    bytes; the patterns are ASCII, and UTF-8 never uses ASCII bytes inside
+    multi-byte sequences. A short tail is carried over so matches spanning
+    chunk boundaries are still found.
+    """
+    
+    def __init__(self, patterns: Tuple[str, ...], patterns_bytes: Tuple[bytes, ...]):
+        self._patterns = tuple(zip(patterns, patterns_bytes))
+        self._overlap = max(map(len, patterns_bytes)) - 1
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self._tail = b''
+        self.pattern: Optional[str] = None  # First suspicious pattern found
+    
+    def feed(self, chunk: bytes) -> None:
+        if self.pattern is not None:
+            return
         
-        for sig in executable_signatures:
-            if sig.lower() in content_start:
-                raise FileValidationError(
-                    "File contains executable content and cannot be uploaded for security reasons.",
-                    error_code="EXECUTABLE_CONTENT",
-                    details={"extension": file_ext}
-                )
+        if chunk.isascii():
+            # ASCII lowercases the same as bytes and as text, so skip the
+            # decode; a partial multi-byte sequence left over from the previous
+            # chunk is invalid now and would be dropped anyway
+            self._decoder.reset()
+            lowered = chunk.lower()
+        else:
+            lowered = self._decoder.decode(chunk).lower().encode('utf-8')
         
-        # Check for suspicious patterns in text files
-        if file_ext in ['.txt', '.csv', '.json', '.xml', '.yaml', '.yml']:
-            self._check_text_content_security(content)
+        haystack = self._tail + lowered
+        for pattern_name, pattern in self._patterns:
+            if pattern in haystack:
+                self.pattern = pattern_name
+                return
+        self._tail = haystack[-self._overlap:]
     
-    def _check_text_content_security(self, content: bytes) -> None:
-        """Security checks for text-based files"""
-        try:
-            text_content = content.decode('utf-8', errors='ignore').lower()
-            
-            # Check for script injection patterns
-            suspicious_patterns = [
-                '<script', '</script>', 'javascript:', 'vbscript:',
-                'onload=', 'onerror=', 'onclick=', 'eval(',
-                'document.cookie', 'document.write'
-            ]
-            
-            for pattern in suspicious_patterns:
-                if pattern in text_content:
-                    raise FileValidationError(
-                        f"File contains potentially unsafe content and cannot be uploaded for security reasons.",
-                        error_code="SUSPICIOUS_CONTENT",
-                        details={"pattern": pattern}
-                    )
-                    
-        except UnicodeDecodeError:
-            # If it's not valid UTF-8, it might be binary content in a text file
-            pass
+    def check(self) -> None:
+        """Raise if any fed chunk contained a suspicious pattern"""
+        if self.pattern is not None:
+            raise FileValidationError(
+                f"File contains potentially unsafe content and cannot be uploaded for security reasons.",
+                error_code="SUSPICIOUS_CONTENT",
+                details={"pattern": self.pattern}
+            )
 
 # Global validator instance
 file_validator = FileValidator()
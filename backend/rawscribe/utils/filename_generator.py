@@ -7,9 +7,9 @@ Filename Generator for Regulatory-Compliant ELN Storage
 Generates filenames with pattern: {status}-{username}-{var1}-{var2}-{timestamp}-{uuid}.json
 """
 
-import uuid
-from datetime import datetime, timezone
-from typing import List, Optional
+import secrets
+import time
+from typing import List, Optional, Tuple
 import logging
 
 from .eln_filename_utils import FilenameGenerationError
@@ -44,6 +44,28 @@ class FilenameGenerator:
         """
         Generate regulatory-compliant filename
         
+        See generate_filename_with_uuid for arguments and errors.
+        """
+        filename, _ = self.generate_filename_with_uuid(
+            status=status,
+            username=username,
+            filename_variables=filename_variables,
+            field_ids=field_ids,
+            existing_checker=existing_checker
+        )
+        return filename
+    
+    def generate_filename_with_uuid(
+        self,
+        status: str,
+        username: str,
+        filename_variables: List[str],
+        field_ids: Optional[List[str]] = None,
+        existing_checker: Optional[callable] = None
+    ) -> Tuple[str, str]:
+        """
+        Generate regulatory-compliant filename and return the UUID embedded in it
+        
         Args:
             status: 'draft' or 'final'
             username: User identifier from auth context
@@ -51,7 +73,7 @@ class FilenameGenerator:
             existing_checker: Function to check if filename already exists
             
         Returns:
-            Generated filename
+            tuple: (filename, uuid)
             
         Raises:
             FilenameGenerationError: If filename generation fails
@@ -85,17 +107,17 @@ class FilenameGenerator:
         # Generate timestamp
         timestamp = self._generate_timestamp()
         
+        # Everything before the UUID is fixed; build it once
+        filename_prefix = "-".join([status, normalized_username, *filename_vars, timestamp]) + "-"
+        
         # Generate unique UUID
-        unique_uuid = self._generate_unique_uuid(
-            status, normalized_username, filename_vars, timestamp, existing_checker
-        )
+        unique_uuid = self._generate_unique_uuid(filename_prefix, existing_checker)
         
         # Construct filename
-        filename_parts = [status, normalized_username] + filename_vars + [timestamp, unique_uuid]
-        filename = "-".join(filename_parts) + ".json"
+        filename = filename_prefix + unique_uuid + ".json"
         
         logger.info(f"Generated filename: {filename}")
-        return filename
+        return filename, unique_uuid
 
     def generate_temp_file_id(self, existing_checker: Optional[callable] = None) -> str:
         """
@@ -141,9 +163,8 @@ class FilenameGenerator:
             UUIDCollisionError: If unable to generate unique UUID
         """
         for attempt in range(self.max_uuid_retries):
-            # Generate 8-character UUID without dashes
-            full_uuid = str(uuid.uuid4()).replace('-', '')
-            short_uuid = full_uuid[:8]
+            # 8 hex characters (32 random bits), same shape as a truncated uuid4
+            short_uuid = secrets.token_hex(4)
             
             # Check for collision
             if not collision_checker(short_uuid):
@@ -164,25 +185,19 @@ class FilenameGenerator:
         Returns:
             Formatted timestamp string
         """
-        now = datetime.now(timezone.utc)
-        return now.strftime("%Y%m%d_%H%M%S")
+        return time.strftime("%Y%m%d_%H%M%S", time.gmtime())
     
     def _generate_unique_uuid(
         self,
-        status: str,
-        username: str,
-        filename_vars: List[str],
-        timestamp: str,
+        filename_prefix: str,
         existing_checker: Optional[callable] = None
     ) -> str:
         """
         Generate unique 8-character UUID with collision detection
         
         Args:
-            status: File status
-            username: Normalized username
-            filename_vars: List of filename variables
-            timestamp: Generated timestamp
+            filename_prefix: Filename up to and including the dash before the UUID
+                ({status}-{username}-{vars}-{timestamp}-)
             existing_checker: Function to check if filename exists
             
         Returns:
@@ -196,9 +211,7 @@ class FilenameGenerator:
             if existing_checker is None:
                 return False
             
-            test_filename_parts = [status, username] + filename_vars + [timestamp, short_uuid]
-            test_filename = "-".join(test_filename_parts) + ".json"
-            return existing_checker(test_filename)
+            return existing_checker(filename_prefix + short_uuid + ".json")
         
         return self._generate_8char_uuid(
             collision_checker=collision_checker,
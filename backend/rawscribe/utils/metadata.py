@@ -7,11 +7,12 @@ Metadata Classes for CLAIRE
 Contains metadata structures for drafts, ELNs, and base metadata functionality
 """
 
-import json
 import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 
+from .document_utils import canonicalize
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,21 +30,34 @@ class BaseMetadata:
     ):
         self.sop_id = sop_id
         self.user_id = user_id
-        self.timestamp = timestamp
+        # Normalized once here so timestamps always compare (and sort) directly
+        self.timestamp = self.ensure_timezone_aware(timestamp)
         self.size_bytes = size_bytes
         self.checksum = checksum
-        self.variables = variables or []
+        self.variables = variables or []  # Absent (None) normalized here, callers pass it through
+        # isoformat() of the timestamp object it was computed from
+        self._iso_timestamp: Optional[str] = None
+        self._iso_timestamp_source: Optional[datetime] = None
+
+    @property
+    def iso_timestamp(self) -> str:
+        """Timestamp in ISO format, formatted once per timestamp value"""
+        # Identity check so reassigning self.timestamp never serves a stale string
+        if self._iso_timestamp_source is not self.timestamp:
+            self._iso_timestamp = self.timestamp.isoformat()
+            self._iso_timestamp_source = self.timestamp
+        return self._iso_timestamp
 
     @property
     def uuid(self) -> str:
         """Get unique identifier for metadata"""
-        return f"{self.sop_id}-{self.user_id}-{self.timestamp.isoformat()}"
+        return f"{self.sop_id}-{self.user_id}-{self.iso_timestamp}"
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             'sop_id': self.sop_id,
             'user_id': self.user_id,
-            'timestamp': self.timestamp.isoformat(),
+            'timestamp': self.iso_timestamp,
             'size_bytes': self.size_bytes,
             'checksum': self.checksum,
             'variables': self.variables
@@ -57,7 +71,7 @@ class BaseMetadata:
             timestamp=datetime.fromisoformat(data['timestamp']),
             size_bytes=data.get('size_bytes', 0),
             checksum=data.get('checksum'),
-            variables=data.get('variables', [])
+            variables=data.get('variables')
         )
 
     @classmethod
@@ -69,9 +83,11 @@ class BaseMetadata:
     def calculate_size_bytes(cls, data: Any) -> int:
         """Calculate size in bytes for data"""
         if isinstance(data, dict):
-            return len(json.dumps(data, sort_keys=True).encode('utf-8'))
+            # Same canonical bytes the document is stored as
+            return len(canonicalize(data))
         elif isinstance(data, str):
-            return len(data.encode('utf-8'))
+            # ASCII text is one byte per character; skip the encode copy
+            return len(data) if data.isascii() else len(data.encode('utf-8'))
         else:
             return len(str(data).encode('utf-8'))
 
@@ -130,7 +146,7 @@ class BaseMetadata:
             timestamp=timestamp,
             size_bytes=size_bytes,
             checksum=checksum,
-            variables=variables or [],
+            variables=variables,
             **kwargs
         )
 
@@ -167,10 +183,7 @@ class DraftMetadata(BaseMetadata):
             return self._draft_uuid
         # Fallback: extract from draft_id (last 8 characters before any extension)
         # For draft_id like "draft-user-proj-20250729_123456-abc12345"
-        parts = self.draft_id.split('-')
-        if parts:
-            return parts[-1]  # Last part should be the UUID
-        return ""
+        return self.draft_id.rpartition('-')[2]  # Last part should be the UUID
 
     def to_dict(self) -> Dict[str, Any]:
         # call super to_dict to get the base metadata
@@ -197,7 +210,7 @@ class DraftMetadata(BaseMetadata):
             size_bytes=data.get('size_bytes', 0),
             draft_uuid=data.get('draft_uuid'),
             checksum=data.get('checksum'),
-            variables=data.get('variables', [])
+            variables=data.get('variables')
         )
 
 
@@ -238,7 +251,7 @@ class ELNMetadata(BaseMetadata):
             'sop_id': self.sop_id,
             'user_id': self.user_id,
             'status': self.status,
-            'timestamp': self.timestamp.isoformat(),
+            'timestamp': self.iso_timestamp,
             'size_bytes': self.size_bytes,
             'checksum': self.checksum,
             'variables': self.variables
@@ -255,5 +268,5 @@ class ELNMetadata(BaseMetadata):
             timestamp=datetime.fromisoformat(data['timestamp']),
             size_bytes=data.get('size_bytes', 0),
             checksum=data.get('checksum'),
-            variables=data.get('variables', [])
+            variables=data.get('variables')
         )
\ No newline at end of file
@@ -30,20 +30,11 @@ def can_submit(user: User, sop_id: Optional[str] = None) -> bool:
     # Admin override
     if user.is_admin:
         return True
-        
-    # Check wildcard submit permission
-    if user.has_permission("submit:*"):
-        return True
-        
-    # Check SOP-specific submit permission
-    if user.has_permission("submit:SOP*"):
-        return True
-        
-    # Check specific SOP permission if provided
-    if sop_id and user.has_permission(f"submit:{sop_id}"):
-        return True
-        
-    return False
+    
+    # Wildcard submit, SOP-wide submit, or the specific SOP if provided
+    if sop_id:
+        return user.has_any_permission(("submit:*", "submit:SOP*", f"submit:{sop_id}"))
+    return user.has_any_permission(("submit:*", "submit:SOP*"))
 
 def require_submit_permission(user: User, sop_id: Optional[str] = None) -> None:
     """
@@ -76,16 +67,9 @@ def can_manage_drafts(user: User, action: str = "create") -> bool:
     # Admin override
     if user.is_admin:
         return True
-        
-    # Check wildcard draft permission
-    if user.has_permission("draft:*"):
-        return True
-        
-    # Check specific draft action permission
-    if user.has_permission(f"draft:{action}"):
-        return True
-        
-    return False
+    
+    # Wildcard draft permission or the specific draft action
+    return user.has_any_permission(("draft:*", f"draft:{action}"))
 
 def require_draft_permission(user: User, action: str = "create") -> None:
     """
@@ -118,16 +102,9 @@ def can_view_data(user: User, scope: str = "own") -> bool:
     # Admin override
     if user.is_admin:
         return True
-        
-    # Check wildcard view permission
-    if user.has_permission("view:*"):
-        return True
-        
-    # Check specific view permission
-    if user.has_permission(f"view:{scope}"):
-        return True
-        
-    return False
+    
+    # Wildcard view permission or the specific view scope
+    return user.has_any_permission(("view:*", f"view:{scope}"))
 
 def require_view_permission(user: User, scope: str = "own") -> None:
     """
@@ -185,14 +162,13 @@ def filter_viewable_data(user: User, data_list: List[Dict[str, Any]], user_id_fi
     """
     if user.is_admin or user.has_permission("view:*"):
         return data_list
-        
-    viewable_data = []
-    for item in data_list:
-        target_user_id = item.get(user_id_field)
-        if target_user_id and can_view_user_data(user, target_user_id):
-            viewable_data.append(item)
-            
-    return viewable_data
+    
+    # Same decision as can_view_user_data, with the per-user checks done once
+    if user.has_permission("view:group"):
+        return [item for item in data_list if item.get(user_id_field)]
+    
+    own_ids = {uid for uid in (user.id, user.username) if uid}
+    return [item for item in data_list if item.get(user_id_field) in own_ids]
 
 def get_user_role_display(user: User) -> str:
     """
@@ -229,6 +205,6 @@ def has_role(user: User, role: str) -> bool:
     if role_lower == "admin":
         return user.is_admin
     elif role_lower in ["researcher", "viewer", "user"]:
-        return role_lower in [g.lower() for g in user.groups]
+        return user.is_in_group_ignore_case(role_lower)
     
     return False
\ No newline at end of file
@@ -8,11 +8,18 @@ Handles parsing SOP schemas to extract filename variables and normalize values
 """
 
 import re
+from operator import itemgetter
 from typing import Dict, List, Any
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Values that normalize_filename_value would return unchanged
+_CANONICAL_FILENAME_VALUE_RE = re.compile(r'[a-z0-9]+(?:[._][a-z0-9]+)*')
+# Anything but word characters, '.' and '_' (hyphens included)
+_INVALID_FILENAME_CHARS_RE = re.compile(r'[^\w._]')
+_MULTIPLE_UNDERSCORES_RE = re.compile(r'_+')
+
 def extract_filename_variables(
     form_data: Dict[str, Any], 
     sop_fields: List[Dict[str, Any]]
@@ -32,8 +39,8 @@ def extract_filename_variables(
     # Find fields that should be included in filename
     filename_fields = _find_filename_fields(sop_fields)
     
-    # Sort by filename order
-    filename_fields.sort(key=lambda x: _get_filename_order(x))
+    # Sort by filename order (always set by _find_filename_fields)
+    filename_fields.sort(key=itemgetter('filename_order'))
     
     # Extract values
     for field in filename_fields:
@@ -65,12 +72,17 @@ def _find_filename_fields(sop_fields: List[Dict[str, Any]]) -> List[Dict[str, An
     """
     filename_fields = []
     
-    def check_field_recursive(field_or_task: Dict[str, Any]):
-        """Recursively check fields and their children"""
+    # Depth-first, pre-order walk with an explicit stack (children pushed in
+    # reverse) so deep schemas don't cost a Python call per node and fields
+    # keep their schema order for ties in filename_order
+    stack = list(reversed(sop_fields))
+    while stack:
+        field_or_task = stack.pop()
+        children = field_or_task.get('children', ())
+        
         # Check if this field has filename component configuration
         # Schema-agnostic approach: look for 'type' property to identify fields
         if field_or_task.get('type'):  # Field has 'type' property
-            children = field_or_task.get('children', [])
             for child in children:
                 # Look for filename component configuration objects
                 # Schema-agnostic: check for filename_component property, not schema names
@@ -78,25 +90,15 @@ def _find_filename_fields(sop_fields: List[Dict[str, Any]]) -> List[Dict[str, An
                     isinstance(child.get('order'), int)):
                     filename_fields.append({
                         **field_or_task,
-                        'filename_order': child.get('order', 0)
+                        'filename_order': child['order']
                     })
                     break
         
-        # Recursively check children
-        children = field_or_task.get('children', [])
-        for child in children:
-            check_field_recursive(child)
-    
-    # Check all top-level fields and tasks
-    for item in sop_fields:
-        check_field_recursive(item)
+        # Nested fields can carry their own filename components
+        stack.extend(reversed(children))
     
     return filename_fields
 
-def _get_filename_order(field: Dict[str, Any]) -> int:
-    """Get filename order for field, default to 0"""
-    return field.get('filename_order', 0)
-
 def normalize_filename_value(value: str) -> str:
     """
     Normalize value for use in filename
@@ -110,16 +112,19 @@ def normalize_filename_value(value: str) -> str:
     if not value:
         return ''
     
+    # Already normalized (e.g. UUIDs, usernames, enum values): nothing to do
+    if isinstance(value, str) and len(value) <= 50 and _CANONICAL_FILENAME_VALUE_RE.fullmatch(value):
+        return value
+    
     # Convert to string and strip whitespace
     normalized = str(value).strip()
     
-    # Replace spaces and special characters with underscores (including hyphens per user requirement)
-    normalized = re.sub(r'[^\w._]', '_', normalized)
-    # Convert hyphens to underscores for filename component parsing
-    normalized = normalized.replace('-', '_')
+    # Replace spaces and special characters with underscores (including hyphens per user requirement,
+    # which keeps them out of filename component parsing)
+    normalized = _INVALID_FILENAME_CHARS_RE.sub('_', normalized)
     
     # Remove multiple consecutive underscores
-    normalized = re.sub(r'_+', '_', normalized)
+    normalized = _MULTIPLE_UNDERSCORES_RE.sub('_', normalized)
     
     # Remove leading/trailing underscores
     normalized = normalized.strip('_')
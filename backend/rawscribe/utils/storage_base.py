@@ -14,10 +14,11 @@ from typing import Dict, List, Optional, Any, Tuple, Type
 from datetime import datetime, timezone
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
 
 from .filename_generator import FilenameGenerator, FilenameGenerationError
-from .document_utils import extract_uuid_from_filename, serialize_document, deserialize_document, safe_timestamp_key, process_temp_filename
-from .eln_filename_utils import parse_eln_filename
+from .document_utils import extract_uuid_from_filename, serialize_document, deserialize_document, process_temp_filename
+from .eln_filename_utils import parse_eln_filename_parts
 from .file_validation import parse_temp_filename_and_unescape
 from . import document_utils
 from .metadata import BaseMetadata, DraftMetadata, ELNMetadata
@@ -144,14 +145,16 @@ class BaseJSONStorage(ABC):
         """Deserialize JSON string to data"""
         return deserialize_document(json_str)
     
-    async def _store_document(self, key: str, data: dict, metadata: dict = None) -> None:
-        """Store document with common logic"""
+    async def _store_document(self, key: str, data: dict, metadata: dict = None,
+                              json_content: Optional[str] = None) -> None:
+        """Store document with common logic (json_content: data already serialized)"""
         # Validate storage constraints
         if not await self._validate_storage_constraints(key, data):
             raise ImmutableStorageError(f"Storage constraint violation for key: {key}")
         
         # Serialize data
-        json_content = self._serialize_data(data)
+        if json_content is None:
+            json_content = self._serialize_data(data)
         
         # Store document (implementation-specific)
         await self._perform_storage(key, json_content, metadata or {})
@@ -300,8 +303,7 @@ class BaseJSONStorage(ABC):
                 if filename_variables:
                     filename = document.get('filename', '')
                     try:
-                        parsed = parse_eln_filename(filename)
-                        doc_variables = parsed.get('variables', [])
+                        doc_variables = parse_eln_filename_parts(filename).variables
                         # Check if all provided variables match
                         matches = all(
                             i < len(doc_variables) and doc_variables[i] == var
@@ -322,8 +324,8 @@ class BaseJSONStorage(ABC):
                 logger.warning(f"Failed to load {document_type} metadata from {doc_info['key']}: {e}")
                 continue
         
-        # Sort by timestamp (newest first) - handle timezone-aware and naive datetimes
-        items.sort(key=safe_timestamp_key, reverse=True)
+        # Sort by timestamp (newest first); metadata timestamps are always timezone-aware
+        items.sort(key=attrgetter('timestamp'), reverse=True)
         
         # Apply limit
         if limit:
@@ -374,6 +376,9 @@ class BaseJSONStorage(ABC):
             # Drafts are just ELNs in an unfinalized state - use unified document preparation
             is_draft = document_type == "drafts"
             
+            # Serialize the form data once; checksum/size are derived from it
+            data_bytes = document_utils.canonicalize(data)
+            
             # Prepare document using unified function
             document = document_utils.prepare_document(
                 document_uuid=document_uuid,
@@ -387,7 +392,7 @@ class BaseJSONStorage(ABC):
                 session_id=session_id,
                 sop_metadata=sop_metadata,
                 field_definitions=field_definitions,
-                checksum=document_utils.calculate_checksum(data) if not is_draft else None,
+                checksum=document_utils.calculate_checksum_bytes(data_bytes) if not is_draft else None,
                 draft_uuid=draft_uuid,
                 draft_id=draft_id
             )
@@ -397,23 +402,29 @@ class BaseJSONStorage(ABC):
                 document.update({
                     'completion_percentage': completion_percentage,
                     'title': title,
-                    'size_bytes': document_utils.calculate_document_size(data)
+                    'size_bytes': document_utils.calculate_document_size_bytes(data_bytes)
                 })
                 return_id = document['draft_id']
             else:
                 return_id = document_uuid
+            
+            # Stored payload, with the form data bytes from above spliced in
+            document_bytes = document_utils.canonicalize_document(document, data_bytes)
 
-            # Create metadata - set up parameters based on document type
+            # Create metadata - set up parameters based on document type; sizes
+            # come from the bytes above so metadata doesn't re-serialize
             create_params = {'sop_id': sop_id, 'user_id': user_id}
             
             if is_draft:
                 create_params.update({
-                    'data': data, 'draft_id': draft_id, 'session_id': session_id or 'default',
+                    'size_bytes': document_utils.calculate_document_size_bytes(data_bytes),
+                    'draft_id': draft_id, 'session_id': session_id or 'default',
                     'completion_percentage': completion_percentage, 'title': title, 'draft_uuid': document_uuid
                 })
             else:
                 create_params.update({
-                    'eln_document': document, 'checksum': document.get('checksum', ''),
+                    'size_bytes': document_utils.calculate_document_size_bytes(document_bytes),
+                    'checksum': document.get('checksum', ''),
                     'variables': filename_variables, 'timestamp': timestamp, 
                     'eln_uuid': document_uuid, 'filename': filename, 'status': status
                 })
@@ -424,12 +435,14 @@ class BaseJSONStorage(ABC):
             key = self._get_document_key(sop_id, filename, document_type)
             storage_metadata = {
                 f'{document_type}-uuid': document_uuid, 'user-id': user_id,
-                'status': status, 'timestamp': timestamp.isoformat()
+                # Reuse the ISO string prepare_document already formatted
+                'status': status, 'timestamp': document['timestamp']
             }
             if not is_draft:
                 storage_metadata['checksum'] = document.get('checksum', '')
             
-            await self._store_document(key, document, storage_metadata)
+            await self._store_document(key, document, storage_metadata,
+                                       json_content=document_bytes.decode('utf-8'))
             
             logger.info(f"{document_type.title()} saved: {filename}")
             return return_id, metadata
@@ -16,7 +16,7 @@ from datetime import datetime, timezone, timedelta
 from pathlib import Path
 import yaml  # Add yaml import
 
-from .storage_base import BaseJSONStorage, StorageError, StorageNotFoundError, ImmutableStorageError, safe_timestamp_key
+from .storage_base import BaseJSONStorage, StorageError, StorageNotFoundError, ImmutableStorageError
 from .metadata import DraftMetadata, ELNMetadata
 from .file_validation import parse_temp_filename_and_unescape
 from .config_types import StorageConfig
@@ -72,14 +72,14 @@ class LocalJSONStorage(BaseJSONStorage):
         file_path = bucket_path / key
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(file_path, 'w') as f:
+        with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
     
     async def _perform_retrieval(self, key: str) -> str:
         """Retrieve document from local storage"""
         bucket_path = self.base_path / self._get_bucket_name(key)
         file_path = bucket_path / key
-        with open(file_path, 'r') as f:
+        with open(file_path, 'r', encoding='utf-8') as f:
             return f.read()
     
     async def _perform_listing(self, prefix: str, filters: dict) -> List[dict]:
@@ -17,7 +17,7 @@ import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 import asyncio
 
-from .storage_base import BaseJSONStorage, StorageError, StorageNotFoundError, ImmutableStorageError, safe_timestamp_key
+from .storage_base import BaseJSONStorage, StorageError, StorageNotFoundError, ImmutableStorageError
 from .metadata import DraftMetadata, ELNMetadata
 from .file_validation import parse_temp_filename_and_unescape
 from .config_types import StorageConfig
@@ -10,8 +10,12 @@ import pytest
 from unittest.mock import Mock, patch
 from rawscribe.utils.auth import (
     User, AuthValidator, AuthError, 
-    extract_user_from_token, generate_mock_token
+    extract_user_from_token, generate_mock_token,
+    get_auth_validator, reset_auth_validator, CachingJWKSClient,
+    validate_username, get_current_user_or_default,
+    require_permission, require_group, require_admin, get_current_user
 )
+from jwt import PyJWKClientConnectionError
 
 
 
@@ -74,6 +78,49 @@ class TestUser:
         assert user.is_in_group("researcher") is True
         assert user.is_in_group("admin") is False
     
+    def test_group_and_permission_set_checks(self):
+        user = User(
+            id="test-1",
+            email="test@example.com",
+            username="test",
+            name="Test User",
+            groups=["user", "researcher"],
+            permissions=["view:own", "submit:SOP*"]
+        )
+        
+        assert user.is_in_any_group(["admin", "researcher"]) is True
+        assert user.is_in_any_group(frozenset({"admin"})) is False
+        assert user.is_in_any_group([]) is False
+        
+        assert user.is_in_group_ignore_case("Researcher") is True
+        assert user.is_in_group_ignore_case("RESEARCHER") is True
+        assert user.is_in_group_ignore_case("admin") is False
+        
+        assert user.has_all_permissions(["view:own"]) is True
+        assert user.has_all_permissions(("view:own", "submit:SOP-test")) is True  # Wildcard match
+        assert user.has_all_permissions(["view:own", "admin:delete"]) is False
+        assert user.has_all_permissions([]) is True
+        
+        wildcard_user = User(id="u2", email="w@example.com", username="wild", name="Wild", permissions=["view:*"])
+        assert wildcard_user.has_all_permissions(p for p in ["x", "view:own"]) is False
+        assert wildcard_user.has_all_permissions(p for p in ["view:own", "view:group"]) is True
+        assert wildcard_user.has_any_permission(p for p in ["view:own"]) is True
+        assert wildcard_user.has_any_permission(p for p in ["x", "y"]) is False
+        
+        assert user.has_any_permission(["admin:delete", "view:own"]) is True
+        assert user.has_any_permission(("admin:delete", "submit:SOP-test")) is True  # Wildcard match
+        assert user.has_any_permission(["admin:delete", "view:group"]) is False
+        assert user.has_any_permission([]) is False
+    
+    def test_validate_username(self):
+        assert validate_username("test_user.1@lab") is True
+        assert validate_username("") is False
+        assert validate_username("has-hyphen") is False
+        assert validate_username("has space") is False
+        
+        with pytest.raises(ValueError, match="Invalid username format"):
+            User(id="1", email="x@example.com", username="bad-name", name="Bad")
+    
     def test_to_dict(self):
         user = User(
             id="test-1",
@@ -149,6 +196,35 @@ class TestAuthValidator:
         with pytest.raises(RuntimeError, match="AWS Lambda requires Cognito"):
             AuthValidator(self.jwt_config)
     
+    @patch('rawscribe.utils.config_loader.config_loader.get_environment')
+    def test_cognito_jwks_client_caches_keys(self, mock_get_env, monkeypatch):
+        """Test Cognito JWKS client is built with JWK set and key caching"""
+        mock_get_env.return_value = 'dev'
+        monkeypatch.delenv('AWS_EXECUTION_ENV', raising=False)
+        config = {
+            'lambda': {
+                'auth': {
+                    'provider': 'cognito',
+                    'cognito': {
+                        'region': 'us-east-1',
+                        'userPoolId': 'us-east-1_test',
+                        'clientId': 'client123'
+                    }
+                }
+            }
+        }
+        
+        validator = AuthValidator(config)
+        
+        assert validator._expected_issuer == 'https://cognito-idp.us-east-1.amazonaws.com/us-east-1_test'
+        assert validator.jwks_client.uri == validator._expected_issuer + '/.well-known/jwks.json'
+        assert validator.jwks_client.jwk_set_cache is not None
+        assert validator.jwks_client.jwk_set_cache.lifespan == 300
+        
+        with patch.object(validator.jwks_client, 'fetch_data') as mock_fetch:
+            validator.refresh_jwks()
+            mock_fetch.assert_called_once()
+    
     @patch('os.environ.get')
     @patch('rawscribe.utils.config_loader.config_loader.get_environment')
     def test_dev_token_validation(self, mock_get_env, mock_env_get):
@@ -189,6 +265,616 @@ class TestAuthValidator:
         assert user.is_admin is True
 
 
+    
+    @patch('os.environ.get')
+    @patch('rawscribe.utils.config_loader.config_loader.get_environment')
+    def test_signed_jwt_validation(self, mock_get_env, mock_env_get):
+        """Test HS256 JWT validation including issuer/audience checks"""
+        import jwt
+        import time
+        
+        mock_get_env.return_value = 'dev'
+        mock_env_get.return_value = None
+        secret = 'a-strong-production-secret-of-32-bytes'
+        config = {'lambda': {'auth': {'provider': 'jwt', 'jwt': {
+            'secret': secret, 'issuer': 'claire-backend', 'audience': 'claire'
+        }}}}
+        validator = AuthValidator(config)
+        
+        claims = {'sub': '7', 'email': 'lab@example.com', 'iss': 'claire-backend',
+                  'aud': 'claire', 'exp': int(time.time()) + 60}
+        user = validator.validate_token(jwt.encode(claims, secret, 'HS256'))
+        assert user.id == '7'
+        assert user.username == 'lab'
+        
+        with pytest.raises(AuthError):
+            validator.validate_token(jwt.encode(dict(claims, iss='other'), secret, 'HS256'))
+    
+    @patch('os.environ.get')
+    @patch('rawscribe.utils.config_loader.config_loader.get_environment')
+    def test_dev_token_probe_skipped_in_prod(self, mock_get_env, mock_env_get):
+        """Test stage/prod never decode the header looking for dev tokens"""
+        mock_get_env.return_value = 'prod'
+        mock_env_get.return_value = None
+        config = {'lambda': {'auth': {'provider': 'jwt', 'jwt': {'secret': 'a-strong-production-secret-of-32-bytes'}}}}
+        
+        validator = AuthValidator(config)
+        assert validator.dev_tokens_enabled is False
+        assert validator._validate_provider_token == validator._validate_jwt_token
+        
+        import json
+        import base64
+        header = base64.urlsafe_b64encode(json.dumps({'alg': 'HS256', 'dev_mode': True}).encode()).decode().rstrip('=')
+        token = f"{header}.e30.sig"
+        
+        with patch.object(validator, '_validate_dev_token') as mock_dev:
+            with pytest.raises(AuthError):
+                validator.validate_token(token)
+            mock_dev.assert_not_called()
+    
+    @patch('os.environ.get')
+    @patch('rawscribe.utils.config_loader.config_loader.get_environment')
+    def test_validated_token_is_cached(self, mock_get_env, mock_env_get):
+        """Test repeat validations of the same token skip re-verification"""
+        mock_get_env.return_value = 'dev'
+        mock_env_get.return_value = None
+        
+        validator = AuthValidator(self.jwt_config)
+        
+        import json
+        import base64
+        import time
+        
+        def base64url_encode(data):
+            b64 = base64.b64encode(json.dumps(data).encode()).decode()
+            return b64.replace('+', '-').replace('/', '_').replace('=', '')
+        
+        header = {'alg': 'HS256', 'typ': 'JWT', 'dev_mode': True}
+        payload = {
+            'sub': '1', 'email': 'admin@local.dev', 'username': 'admin',
+            'name': 'Admin User', 'exp': int(time.time()) + 3600
+        }
+        token = f"{base64url_encode(header)}.{base64url_encode(payload)}.sig"
+        
+        with patch.object(validator, '_validate_dev_token', wraps=validator._validate_dev_token) as spy:
+            first = validator.validate_token(token)
+            second = validator.validate_token(token)
+            assert spy.call_count == 1
+        assert first is second
+        assert token.encode() not in validator._token_cache
+        assert first.token is None
+        assert all(cached_user.token is None for _, cached_user in validator._token_cache.values())
+        
+        # Entries never outlive the token's own exp
+        expires_at, _ = next(iter(validator._token_cache.values()))
+        assert expires_at <= payload['exp']
+        
+        validator.clear_token_cache()
+        assert validator._token_cache == {}
+    
+    def test_map_cognito_permissions(self):
+        """Test Cognito group to permission mapping"""
+        validator = AuthValidator.__new__(AuthValidator)
+        
+        assert validator._map_cognito_permissions(['ADMINS']) == ['*']
+        assert set(validator._map_cognito_permissions(['researchers'])) == {
+            'submit:*', 'view:own', 'view:group', 'draft:*'
+        }
+        assert set(validator._map_cognito_permissions(['clinician', 'lab_managers'])) == {
+            'submit:*', 'view:own', 'view:*', 'draft:*', 'approve:*', 'manage:users'
+        }
+        assert validator._map_cognito_permissions(['unknown']) == ['view:own']
+        assert validator._map_cognito_permissions([]) == []
+    
+    def test_base64url_decode(self):
+        """Test base64url decoding restores padding and URL-safe alphabet"""
+        import base64
+        
+        for raw in ['a', 'ab', 'abc', 'abcd', '{"k": "??>>"}']:
+            encoded = base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+            assert AuthValidator._base64url_decode(encoded) == raw
+
+class TestCognitoTokenValidation:
+    """Test Cognito ID token verification against a locally generated key"""
+    
+    @pytest.fixture
+    def validator(self, monkeypatch):
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        
+        monkeypatch.delenv('AWS_EXECUTION_ENV', raising=False)
+        config = {
+            'lambda': {
+                'auth': {
+                    'provider': 'cognito',
+                    'cognito': {
+                        'region': 'us-east-1',
+                        'userPoolId': 'us-east-1_test',
+                        'clientId': 'client123'
+                    }
+                }
+            }
+        }
+        with patch('rawscribe.utils.config_loader.config_loader.get_environment', return_value='dev'):
+            validator = AuthValidator(config)
+        
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        signing_key = Mock(key=self.private_key.public_key())
+        validator.jwks_client.get_signing_key = Mock(return_value=signing_key)
+        return validator
+    
+    def make_token(self, validator, **claims):
+        import jwt
+        import time
+        
+        payload = {
+            'sub': 'abc-123',
+            'email': 'researcher@example.com',
+            'cognito:groups': ['researchers'],
+            'aud': validator.cognito_client_id,
+            'iss': validator._expected_issuer,
+            'exp': int(time.time()) + 3600,
+        }
+        payload.update(claims)
+        return jwt.encode(payload, self.private_key, algorithm='RS256', headers={'kid': 'key-1'})
+    
+    def test_valid_token(self, validator):
+        user = validator.validate_token(self.make_token(validator))
+        
+        assert user.username == 'researcher'
+        assert user.has_permission('view:group')
+        assert user.is_admin is False
+    
+    def use_jwks(self, validator, kid='key-1'):
+        """Serve this test's public key from a fake JWKS endpoint"""
+        import json
+        import jwt
+        
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(self.private_key.public_key()))
+        jwk.update(kid=kid, use='sig', alg='RS256')
+        jwks = {'keys': [jwk]}
+        
+        def fetch():
+            validator.jwks_client.jwk_set_cache.put(jwks)
+            return jwks
+        
+        validator.jwks_client.__dict__.pop('get_signing_key', None)  # back to the real lookup
+        return patch.object(validator.jwks_client, '_fetch_jwk_set', side_effect=fetch)
+    
+    def test_signing_key_served_from_jwk_set_cache(self, validator):
+        with self.use_jwks(validator) as mock_fetch:
+            validator.validate_token(self.make_token(validator, sub='one'))
+            validator.validate_token(self.make_token(validator, sub='two'))
+        
+        mock_fetch.assert_called_once()
+    
+    def test_rotated_out_key_expires_with_jwk_set(self, validator):
+        token = self.make_token(validator)
+        with self.use_jwks(validator):
+            assert validator.validate_token(token).username == 'researcher'
+        
+        # The endpoint now only lists a new key; once the cached set expires
+        # the old kid must no longer verify
+        validator.clear_token_cache()
+        cache = validator.jwks_client.jwk_set_cache
+        with self.use_jwks(validator, kid='key-2'), \
+                patch.object(cache, 'is_expired', return_value=True):
+            with pytest.raises(AuthError, match="Unable to find a signing key"):
+                validator.validate_token(token)
+    
+    def test_signature_failure_refetches_keys_once(self, validator):
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        
+        token = self.make_token(validator)
+        replaced_key = Mock(key=rsa.generate_private_key(public_exponent=65537, key_size=2048).public_key())
+        current_key = validator.jwks_client.get_signing_key.return_value
+        validator.jwks_client.get_signing_key.side_effect = [replaced_key, current_key]
+        
+        with patch.object(validator.jwks_client, 'refresh_if_allowed', return_value=True) as mock_refresh:
+            assert validator.validate_token(token).username == 'researcher'
+        mock_refresh.assert_called_once()
+    
+    def test_signature_failure_within_cooldown_rejected(self, validator):
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        
+        token = self.make_token(validator)
+        validator.jwks_client.get_signing_key.return_value = Mock(
+            key=rsa.generate_private_key(public_exponent=65537, key_size=2048).public_key())
+        
+        with patch.object(validator.jwks_client, 'refresh_if_allowed', return_value=False):
+            with pytest.raises(AuthError, match="Invalid Cognito token"):
+                validator.validate_token(token)
+        validator.jwks_client.get_signing_key.assert_called_once_with('key-1')
+    
+    def test_clock_skew_within_leeway_accepted(self, validator):
+        import time
+        
+        user = validator.validate_token(self.make_token(validator, exp=int(time.time()) - 10))
+        assert user.username == 'researcher'
+        
+        with pytest.raises(AuthError, match="expired"):
+            validator.validate_token(self.make_token(validator, exp=int(time.time()) - 60))
+    
+    def test_rejected_token_is_negative_cached(self, validator):
+        token = self.make_token(validator, aud='someone-else')
+        
+        with patch('rawscribe.utils.auth.jwt.decode', wraps=__import__('jwt').decode) as spy:
+            for _ in range(3):
+                with pytest.raises(AuthError, match="Invalid Cognito token"):
+                    validator.validate_token(token)
+            assert spy.call_count == 1
+    
+    def test_jwks_outage_is_not_negative_cached(self, validator):
+        token = self.make_token(validator)
+        validator.jwks_client.get_signing_key.side_effect = PyJWKClientConnectionError('down')
+        
+        with pytest.raises(AuthError, match="Cognito auth failed"):
+            validator.validate_token(token)
+        
+        validator.jwks_client.get_signing_key.side_effect = None
+        assert validator.validate_token(token).username == 'researcher'
+    
+    def test_token_caches_safe_across_threads(self, validator):
+        import threading
+        
+        errors = []
+        
+        def fill(worker):
+            try:
+                for i in range(2000):
+                    key = f"{worker}-{i}".encode()
+                    # Half already expired so eviction purges while others insert
+                    validator._cache_put(validator._failed_token_cache, 64, key, float(i % 2), 'bad', 0.5)
+                    validator._cache_get(validator._failed_token_cache, key, 0.5)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=fill, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        assert len(validator._failed_token_cache) <= 64
+    
+    def test_cache_put_evicts_from_front(self, validator):
+        cache = {}
+        for key, expires_at in [(b'a', 1.0), (b'b', 1.0), (b'c', 9.0), (b'd', 9.0)]:
+            validator._cache_put(cache, 4, key, expires_at, 'bad', 0.0)
+        
+        # Full: the expired entries at the front go, live ones stay
+        validator._cache_put(cache, 4, b'e', 9.0, 'bad', 5.0)
+        assert list(cache) == [b'c', b'd', b'e']
+        
+        # Full of live entries: only the oldest is evicted
+        validator._cache_put(cache, 4, b'f', 9.0, 'bad', 5.0)
+        validator._cache_put(cache, 4, b'g', 9.0, 'bad', 5.0)
+        assert list(cache) == [b'd', b'e', b'f', b'g']
+    
+    def test_wrong_audience_rejected(self, validator):
+        with pytest.raises(AuthError, match="Invalid Cognito token"):
+            validator.validate_token(self.make_token(validator, aud='someone-else'))
+
+
+class TestCachingJWKSClient:
+    """Test stale-while-revalidate JWKS fallback"""
+    
+    JWKS = {'keys': []}
+    
+    def test_serves_last_good_set_within_window(self):
+        client = CachingJWKSClient('https://example.invalid/jwks.json', max_stale=900)
+        
+        with patch.object(CachingJWKSClient, '_fetch_jwk_set',
+                          side_effect=[self.JWKS, PyJWKClientConnectionError('down')]):
+            assert client.fetch_data() == self.JWKS
+            assert client.fetch_data() == self.JWKS
+    
+    def test_fails_closed_beyond_window(self):
+        client = CachingJWKSClient('https://example.invalid/jwks.json', max_stale=900)
+        
+        with patch.object(CachingJWKSClient, '_fetch_jwk_set',
+                          side_effect=[self.JWKS, PyJWKClientConnectionError('down')]):
+            client.fetch_data()
+            fetched_at, data = client._last_good
+            client._last_good = (fetched_at - 901, data)
+            
+            with pytest.raises(PyJWKClientConnectionError):
+                client.fetch_data()
+    
+    def test_stale_set_not_recached(self):
+        jwks = {'keys': [{'kty': 'oct', 'kid': 'key-1', 'k': 'c2VjcmV0'}]}
+        client = CachingJWKSClient('https://example.invalid/jwks.json', max_stale=900)
+        
+        with patch('rawscribe.utils.auth._get_jwks_session') as mock_session:
+            mock_session.return_value.get.return_value.json.return_value = jwks
+            client.get_jwk_set()
+            cached = client.jwk_set_cache.jwk_set_with_timestamp
+            
+            # Endpoint down after the cached set expired: the last good set is
+            # served, but the cache keeps its original timestamp
+            mock_session.return_value.get.side_effect = PyJWKClientConnectionError('down')
+            with patch.object(client.jwk_set_cache, 'is_expired', return_value=True):
+                assert client.get_jwk_set().keys[0].key_id == 'key-1'
+            assert client.jwk_set_cache.jwk_set_with_timestamp is cached
+            
+            # Once max_stale has passed since that fetch, fail closed
+            fetched_at, data = client._last_good
+            client._last_good = (fetched_at - 901, data)
+            with patch.object(client.jwk_set_cache, 'is_expired', return_value=True):
+                with pytest.raises(PyJWKClientConnectionError):
+                    client.get_jwk_set()
+    
+    def test_concurrent_fetches_coalesce(self):
+        import threading
+        import time
+        
+        client = CachingJWKSClient('https://example.invalid/jwks.json')
+        calls = []
+        
+        def slow_fetch(self_):
+            calls.append(1)
+            time.sleep(0.1)
+            return {'keys': []}
+        
+        with patch.object(CachingJWKSClient, '_fetch_jwk_set', slow_fetch):
+            threads = [threading.Thread(target=client.fetch_data) for _ in range(5)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        
+        assert len(calls) == 1
+    
+    def test_unknown_kid_refresh_is_rate_limited(self):
+        from jwt import PyJWKClientError
+        
+        jwks = {'keys': [{'kty': 'oct', 'kid': 'key-1', 'k': 'c2VjcmV0'}]}
+        client = CachingJWKSClient('https://example.invalid/jwks.json', refresh_cooldown=30)
+        
+        with patch('rawscribe.utils.auth._get_jwks_session') as mock_session:
+            mock_get = mock_session.return_value.get
+            mock_get.return_value.json.return_value = jwks
+            assert client.get_signing_key('key-1').key_id == 'key-1'
+            assert mock_get.call_count == 1
+            
+            # Unknown kids force a single re-fetch per cooldown
+            for _ in range(3):
+                with pytest.raises(PyJWKClientError, match="Unable to find a signing key"):
+                    client.get_signing_key('forged')
+            assert mock_get.call_count == 2
+            assert client.refresh_if_allowed() is False
+            
+            client._last_forced_refresh -= 31
+            assert client.refresh_if_allowed() is True
+            assert mock_get.call_count == 3
+    
+    def test_fetch_holds_pyjwt_client_lock(self):
+        client = CachingJWKSClient('https://example.invalid/jwks.json')
+        held = []
+        
+        def fetch(self_):
+            held.append(self_._client_lock._is_owned())
+            return self.JWKS
+        
+        with patch.object(CachingJWKSClient, '_fetch_jwk_set', fetch):
+            client.fetch_data()
+        
+        assert held == [True]
+        assert not hasattr(client, '_fetch_lock')
+    
+    def test_fetch_uses_shared_session(self):
+        import requests
+        
+        client = CachingJWKSClient('https://example.invalid/jwks.json', cache_jwk_set=False)
+        response = Mock()
+        response.json.return_value = self.JWKS
+        
+        with patch('rawscribe.utils.auth._get_jwks_session') as mock_session:
+            mock_session.return_value.get.return_value = response
+            assert client.fetch_data() == self.JWKS
+            mock_session.return_value.get.assert_called_once()
+            
+            mock_session.return_value.get.side_effect = requests.ConnectionError('refused')
+            client._last_good = None
+            with pytest.raises(PyJWKClientConnectionError):
+                client.fetch_data()
+    
+    @pytest.mark.parametrize('payload', [[], {'message': 'Forbidden'}, {'keys': 'none'}])
+    def test_malformed_payload_not_cached(self, payload):
+        from jwt import PyJWKClientError
+        
+        client = CachingJWKSClient('https://example.invalid/jwks.json')
+        response = Mock()
+        response.json.return_value = payload
+        
+        with patch('rawscribe.utils.auth._get_jwks_session') as mock_session:
+            mock_session.return_value.get.return_value = response
+            with pytest.raises(PyJWKClientError, match="'keys' list"):
+                client.fetch_data()
+        
+        assert client.jwk_set_cache.get() is None
+        assert client._last_good is None
+    
+    def test_successful_fetch_records_bookkeeping(self):
+        jwks = {'keys': [{'kty': 'oct', 'kid': 'key-1', 'k': 'c2VjcmV0'}]}
+        client = CachingJWKSClient('https://example.invalid/jwks.json')
+        response = Mock()
+        response.json.return_value = jwks
+        
+        with patch('rawscribe.utils.auth._get_jwks_session') as mock_session:
+            mock_session.return_value.get.return_value = response
+            client.fetch_data()
+        
+        assert client.jwk_set_cache.get() is not None
+        assert client._last_successful_fetch is not None
+    
+    def test_ssl_context_uses_pyjwt_fetch(self):
+        import ssl
+        from jwt import PyJWKClient
+        
+        client = CachingJWKSClient('https://example.invalid/jwks.json', ssl_context=ssl.create_default_context())
+        
+        with patch('rawscribe.utils.auth._get_jwks_session') as mock_session, \
+                patch.object(PyJWKClient, 'fetch_data', return_value=self.JWKS) as base_fetch:
+            assert client.fetch_data() == self.JWKS
+        
+        base_fetch.assert_called_once()
+        mock_session.assert_not_called()
+    
+    def test_raises_without_prior_fetch(self):
+        client = CachingJWKSClient('https://example.invalid/jwks.json')
+        
+        with patch.object(CachingJWKSClient, '_fetch_jwk_set',
+                          side_effect=PyJWKClientConnectionError('down')):
+            with pytest.raises(PyJWKClientConnectionError):
+                client.fetch_data()
+
+
+class TestGetAuthValidator:
+    """Test auth validator dependency caching"""
+    
+    def setup_method(self):
+        reset_auth_validator()
+        self.config = {
+            'lambda': {
+                'auth': {
+                    'provider': 'jwt',
+                    'jwt': {'secret': 'test', 'algorithm': 'HS256', 'mockUsers': []}
+                }
+            }
+        }
+    
+    def teardown_method(self):
+        reset_auth_validator()
+    
+    @patch('rawscribe.utils.config_loader.config_loader.get_environment')
+    @patch('rawscribe.utils.config_loader.config_loader.load_config')
+    def test_validator_is_reused_across_calls(self, mock_load, mock_get_env):
+        mock_get_env.return_value = 'dev'
+        mock_load.return_value = self.config
+        
+        first = get_auth_validator()
+        second = get_auth_validator()
+        
+        assert first is second
+        assert mock_load.call_count == 1
+    
+    @patch('rawscribe.utils.config_loader.config_loader.get_environment')
+    @patch('rawscribe.utils.config_loader.config_loader.load_config')
+    def test_reset_rebuilds_validator(self, mock_load, mock_get_env):
+        mock_get_env.return_value = 'dev'
+        mock_load.return_value = self.config
+        
+        first = get_auth_validator()
+        reset_auth_validator()
+        second = get_auth_validator()
+        
+        assert first is not second
+        assert mock_load.call_count == 2
+
+
+class TestCurrentUserOrDefault:
+    """Test default user resolution when auth is disabled"""
+    
+    @patch('os.environ.get')
+    @patch('rawscribe.utils.config_loader.config_loader.get_environment')
+    def test_configured_default_user_is_reused(self, mock_get_env, mock_env_get):
+        mock_get_env.return_value = 'dev'
+        mock_env_get.return_value = None
+        config = {
+            'lambda': {
+                'auth': {
+                    'provider': 'jwt',
+                    'required': False,
+                    'jwt': {'secret': 'test'},
+                    'users': [{
+                        'id': 'u1', 'email': 'lab@example.com',
+                        'username': 'lab', 'name': 'Lab User'
+                    }]
+                }
+            }
+        }
+        validator = AuthValidator(config)
+        
+        first = get_current_user_or_default(current_user=None, auth_validator=validator)
+        second = get_current_user_or_default(current_user=None, auth_validator=validator)
+        
+        assert first is second
+        assert first.id == 'u1'
+        assert first.is_admin is True
+    
+    @patch('os.environ.get')
+    @patch('rawscribe.utils.config_loader.config_loader.get_environment')
+    def test_auth_required_resolved_at_init(self, mock_get_env, mock_env_get):
+        mock_get_env.return_value = 'dev'
+        mock_env_get.return_value = None
+        
+        disabled = AuthValidator({'lambda': {'auth': {'provider': 'jwt', 'required': False}}})
+        enabled = AuthValidator({'lambda': {'auth': {'provider': 'jwt'}}})
+        
+        assert disabled.auth_required is False
+        assert enabled.auth_required is True
+        assert get_current_user(auth_validator=disabled, credentials=None) is None
+        
+        from fastapi import HTTPException
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_user(auth_validator=enabled, credentials=None)
+        assert exc_info.value.status_code == 401
+    
+    @patch('os.environ.get')
+    @patch('rawscribe.utils.config_loader.config_loader.get_environment')
+    def test_authenticated_user_passes_through(self, mock_get_env, mock_env_get):
+        mock_get_env.return_value = 'dev'
+        mock_env_get.return_value = None
+        validator = AuthValidator({'lambda': {'auth': {'provider': 'jwt'}}})
+        user = User(id="1", email="a@example.com", username="a", name="A")
+        
+        assert get_current_user_or_default(current_user=user, auth_validator=validator) is user
+
+
+class TestPermissionDependencies:
+    """Test require_permission / require_group / require_admin dependencies"""
+    
+    def make_client(self, user):
+        from fastapi import FastAPI, Depends
+        from fastapi.testclient import TestClient
+        
+        app = FastAPI()
+        
+        @app.get("/submit")
+        async def submit(current_user: User = Depends(require_permission('submit:SOP1'))):
+            return {'user': current_user.id}
+        
+        @app.get("/group")
+        async def group(current_user: User = Depends(require_group('researcher'))):
+            return {'user': current_user.id}
+        
+        @app.get("/admin")
+        async def admin(current_user: User = Depends(require_admin)):
+            return {'user': current_user.id}
+        
+        app.dependency_overrides[get_current_user_or_default] = lambda: user
+        return TestClient(app)
+    
+    def test_allowed_user(self):
+        user = User(id="r1", email="r@example.com", username="r", name="R",
+                    groups=["researcher"], permissions=["submit:*"])
+        client = self.make_client(user)
+        
+        assert client.get("/submit").json() == {'user': 'r1'}
+        assert client.get("/group").json() == {'user': 'r1'}
+        assert client.get("/admin").status_code == 403
+    
+    def test_denied_user(self):
+        user = User(id="v1", email="v@example.com", username="v", name="V",
+                    groups=["viewer"], permissions=["view:own"])
+        client = self.make_client(user)
+        
+        response = client.get("/submit")
+        assert response.status_code == 403
+        assert response.json()['detail'] == "Permission denied: submit:SOP1"
+        assert client.get("/group").status_code == 403
+
 
 class TestUtilityFunctions:
     """Test utility functions"""
@@ -39,6 +39,13 @@ class TestAuthProviderFactory:
         assert isinstance(provider, CognitoProvider)
         assert provider.provider_name == 'cognito'
     
+    def test_create_defaults_to_jwt_for_missing_or_null_auth(self):
+        """Should fall back to JWT when the auth section is absent or null"""
+        for config in ({}, {'lambda': None}, {'lambda': {'auth': None}}):
+            provider = AuthProviderFactory.create(config)
+            assert isinstance(provider, JWTProvider)
+            assert provider.get_config()['mockUsers'] == 0
+    
     def test_create_jwt_provider(self):
         """Should create JWT provider when configured"""
         config = {
@@ -78,6 +85,31 @@ class TestAuthProviderFactory:
         
         with pytest.raises(ValueError, match='Unknown auth provider: ldap'):
             AuthProviderFactory.create(config)
+    
+    def test_create_reuses_provider_for_same_config(self):
+        """Should memoize providers per config object"""
+        AuthProviderFactory.clear_cache()
+        config = {'lambda': {'auth': {'provider': 'jwt'}}}
+        
+        provider = AuthProviderFactory.create(config)
+        
+        assert AuthProviderFactory.create(config) is provider
+        assert AuthProviderFactory.create(dict(config)) is not provider
+        
+        AuthProviderFactory.clear_cache()
+        assert AuthProviderFactory.create(config) is not provider
+    
+    def test_register_provider(self):
+        """Should create a registered custom provider"""
+        class DummyProvider(JWTProvider):
+            pass
+        
+        AuthProviderFactory.register_provider('dummy', DummyProvider)
+        try:
+            provider = AuthProviderFactory.create({'lambda': {'auth': {'provider': 'dummy'}}})
+            assert isinstance(provider, DummyProvider)
+        finally:
+            AuthProviderFactory._resolved.pop('dummy', None)
 
 
 class TestCognitoProvider:
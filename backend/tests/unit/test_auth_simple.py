@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: 2024-2025 Pathway Bio, Inc. <https://pwbio.ai>
+# SPDX-FileContributor: Kimberly Robasky
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for simplified API Gateway authentication helpers
+"""
+
+import dataclasses
+
+import pytest
+
+from rawscribe.utils.auth_simple import (
+    get_current_user_or_default,
+    get_current_user_from_context,
+    get_permissions_for_groups,
+    AuthValidator,
+)
+
+
+class TestDefaultUsers:
+    """Test the auth-disabled default users"""
+    
+    def test_default_user_is_shared(self):
+        user = get_current_user_or_default()
+        
+        assert user is get_current_user_or_default()
+        assert user.id == "default-user"
+        assert list(user.groups) == ["admin"]
+        assert list(user.permissions) == ["*"]
+        assert user.is_admin is True
+    
+    @pytest.mark.asyncio
+    async def test_context_user_is_shared(self):
+        user = await get_current_user_from_context(request=None)
+        
+        assert user is await get_current_user_from_context(request=None)
+        assert user.id == "test-user"
+    
+    def test_default_user_is_immutable(self):
+        user = get_current_user_or_default()
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            user.is_admin = False
+        assert isinstance(user.groups, tuple)
+        assert isinstance(user.permissions, tuple)
+
+
+class TestGetPermissionsForGroups:
+    """Test group to permission mapping"""
+    
+    def test_known_groups(self):
+        assert get_permissions_for_groups(['admin']) == ['*']
+        assert get_permissions_for_groups(['user']) == ['view:own', 'edit:own']
+        assert get_permissions_for_groups(['user', 'admin', 'user']) == ['view:own', 'edit:own', '*']
+    
+    def test_unknown_groups_grant_nothing(self):
+        assert get_permissions_for_groups(['guest']) == []
+        assert get_permissions_for_groups([]) == []
+
+
+class TestSimpleAuthValidator:
+    """Test auth sub-config resolution"""
+    
+    def test_nested_lambda_auth_config(self):
+        validator = AuthValidator({'lambda': {'auth': {'provider': 'cognito', 'required': True}}})
+        
+        assert validator.get_provider() == 'cognito'
+        assert validator.is_auth_required() is True
+    
+    def test_top_level_auth_config(self):
+        validator = AuthValidator({'lambda': {}, 'auth': {'provider': 'jwt'}})
+        
+        assert validator.get_provider() == 'jwt'
+        assert validator.is_auth_required() is False
+    
+    def test_defaults(self):
+        validator = AuthValidator({})
+        
+        assert validator.get_provider() == 'mock'
+        assert validator.is_auth_required() is False
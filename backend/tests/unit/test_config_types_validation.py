@@ -16,7 +16,9 @@ from rawscribe.utils.config_types import (
     APIConfig,
     AuthConfig,
     ServiceConfig,
-    ConfigMetadata
+    ConfigMetadata,
+    DefaultConfigFactory,
+    validate_environment_config
 )
 
 
@@ -118,3 +120,52 @@ def test_validators_work():
     assert config.webapp.storage.local_path == './.local/s3'  # Default from validator
     assert config.webapp.auth.provider == 'jwt'
     assert config.meta.environment == Environment.TEST
+
+
+def test_validate_environment_config():
+    """Test validation results for valid, incomplete and production JWT configs"""
+    config_dict = {
+        'webapp': {
+            'api': {'base_url': '/api'},
+            'auth': {'provider': 'jwt'},
+            'storage': {'type': 'local'}
+        },
+        'meta': {'environment': 'prod'}
+    }
+    
+    result = validate_environment_config(config_dict)
+    assert result.valid
+    assert [w.path for w in result.warnings] == ['webapp.auth.provider']
+    
+    config_dict['meta']['environment'] = 'dev'
+    assert validate_environment_config(config_dict).warnings == []
+    
+    del config_dict['webapp']['api']
+    result = validate_environment_config(config_dict)
+    assert not result.valid
+    assert result.errors[0].path == 'webapp.api.base_url'
+    
+    result = validate_environment_config({'webapp': {'auth': {'provider': 'ldap'}}})
+    assert not result.valid
+    assert result.errors[0].path == 'root'
+
+
+@pytest.mark.parametrize('environment', list(Environment))
+def test_default_config_presets(environment):
+    """Test default configs pick the per-environment preset values"""
+    config = DefaultConfigFactory.create(environment)
+    is_prod = environment == Environment.PROD
+    is_dev = environment == Environment.DEV
+    
+    assert config.meta.environment == environment
+    assert config.webapp.logging.level == ('info' if is_prod else 'debug')
+    assert config.webapp.features.enable_beta_features is is_dev
+    assert config.webapp.features.enable_audit_trail is is_prod
+    assert config.webapp.autosave.storage['key_prefix'] == f'autosave-{environment.value}'
+    assert config.webapp.autosave.storage['max_items'] == (100 if is_prod else 50)
+    assert config.webapp.autosave.debounce == (
+        {'delay': 5000, 'max_wait': 30000} if is_prod else {'delay': 1000, 'max_wait': 15000}
+    )
+    assert config.webapp.autosave.retry['initial_delay'] == (1000 if is_prod else 500)
+    assert config.webapp.autosave.ui['toast_on_save'] is is_dev
+
@@ -0,0 +1,152 @@
+# SPDX-FileCopyrightText: 2024-2025 Pathway Bio, Inc. <https://pwbio.ai>
+# SPDX-FileContributor: Kimberly Robasky
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for document serialization helpers
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from rawscribe.utils import document_utils
+from rawscribe.utils.eln_filename_utils import FilenameGenerationError, parse_eln_filename
+
+
+class TestDocumentSerialization:
+    """Test serialization, size and checksum helpers"""
+    
+    def test_serialize_is_canonical(self):
+        data = {'b': 1, 'a': {'y': [1, 2], 'x': 'ü'}}
+        
+        serialized = document_utils.serialize_document(data)
+        
+        assert serialized == '{"a":{"x":"ü","y":[1,2]},"b":1}'
+        assert serialized == document_utils.serialize_document({'a': {'x': 'ü', 'y': [1, 2]}, 'b': 1})
+        assert document_utils.deserialize_document(serialized) == data
+    
+    def test_size_counts_utf8_bytes(self):
+        data = {'name': 'ü'}
+        
+        assert document_utils.calculate_document_size(data) == len('{"name":"ü"}'.encode('utf-8'))
+    
+    def test_checksum_matches_serialized_form(self):
+        data = {'b': 1, 'a': 2}
+        expected = hashlib.sha256(document_utils.serialize_document(data).encode('utf-8')).hexdigest()
+        
+        assert document_utils.calculate_checksum(data) == expected
+        assert document_utils.calculate_checksum({'a': 2, 'b': 1}) == expected
+    
+    def test_matches_stdlib_json(self):
+        data = {'b': [1, 2.5, None, True], 'a': {'é': 'x'}}
+        expected = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        
+        assert document_utils.serialize_document(data) == expected
+    
+    @pytest.mark.parametrize('data, expected', [
+        ({'x': 1e16}, '{"x":1e+16}'),
+        ({'x': float('nan')}, '{"x":NaN}'),
+        ({'x': 2 ** 70}, '{"x":%d}' % 2 ** 70),
+        ({1: 'a', 2: 'b'}, '{"1":"a","2":"b"}'),
+    ])
+    def test_edge_values_match_stdlib(self, data, expected):
+        serialized = document_utils.serialize_document(data)
+        
+        assert serialized == expected
+        assert serialized == json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        assert document_utils.calculate_checksum(data) == hashlib.sha256(expected.encode('utf-8')).hexdigest()
+    
+    def test_deserialize_reads_stdlib_documents(self):
+        stored = json.dumps({'x': float('inf'), 'y': 2 ** 70}, sort_keys=True)
+        
+        document = document_utils.deserialize_document(stored)
+        
+        assert document['x'] == float('inf')
+        assert document['y'] == 2 ** 70
+    
+    def test_canonicalize_document_splices_form_data(self):
+        form_data = {'b': 'ü', 'form_data': None, 'a': [1e16, {'x': 'form_data'}]}
+        document = {'z': 1, 'form_data': form_data, 'checksum': '', 'sop_metadata': {'form_data': None}}
+        
+        buf = document_utils.canonicalize_document(document, document_utils.canonicalize(form_data))
+        
+        assert buf == document_utils.canonicalize(document)
+    
+    def test_canonical_bytes_helpers(self):
+        data = {'b': 1, 'a': 'ü'}
+        buf = document_utils.canonicalize(data)
+        
+        assert buf == document_utils.serialize_document(data).encode('utf-8')
+        assert document_utils.calculate_document_size_bytes(buf) == document_utils.calculate_document_size(data)
+        assert document_utils.calculate_checksum_bytes(buf) == document_utils.calculate_checksum(data)
+
+
+class TestExtractUUID:
+    """Test UUID extraction agrees with the full filename parser"""
+    
+    @pytest.mark.parametrize('filename', [
+        'final-john_doe-proj_001-pat_123-20240115_143022-abcd1234.json',
+        'draft-user-20240115_143022-12345678.json',
+        'draft-user-20240115_143022-uuid1234.json',
+        'draft-user-20240115_143022-short.json',
+        'draft-user-20240115_143022-muchlongeruuid.json',
+        'a-b-c-d.json',
+        'x--y-abcd1234.json',
+    ])
+    def test_matches_parser(self, filename):
+        assert document_utils.extract_uuid_from_filename(filename) == parse_eln_filename(filename)['uuid']
+    
+    @pytest.mark.parametrize('filename', ['x-abcd1234.json', 'a-b-abcd1234.json', 'a-b-c-abcd1234.txt'])
+    def test_invalid_names_raise(self, filename):
+        with pytest.raises(FilenameGenerationError):
+            document_utils.extract_uuid_from_filename(filename)
+
+
+class TestPrepareDocument:
+    """Test draft document preparation (ELN documents are covered in test_eln_document_structure)"""
+    
+    def test_prepare_draft_document(self):
+        timestamp = datetime(2025, 1, 29, 10, 0, tzinfo=timezone.utc)
+        
+        document = document_utils.prepare_document(
+            document_uuid='abcd1234',
+            filename='draft-user-proj1-20250129_100000-abcd1234.json',
+            sop_id='SOP-1',
+            user_id='user',
+            status='draft',
+            timestamp=timestamp,
+            data={'field1': 'value1'},
+            is_draft=True,
+            draft_id='ignored',
+        )
+        
+        assert document == {
+            'draft_id': 'draft-user-proj1-20250129_100000-abcd1234',
+            'draft_uuid': 'abcd1234',
+            'filename': 'draft-user-proj1-20250129_100000-abcd1234.json',
+            'sop_id': 'SOP-1',
+            'user_id': 'user',
+            'timestamp': timestamp.isoformat(),
+            'form_data': {'field1': 'value1'},
+            'status': 'draft',
+            'session_id': 'default',
+        }
+    
+    def test_prepared_documents_do_not_share_state(self):
+        timestamp = datetime(2025, 1, 29, 10, 0, tzinfo=timezone.utc)
+        common = dict(document_uuid='abcd1234', filename='eln.json', sop_id='SOP-1',
+                      user_id='user', status='final', timestamp=timestamp, data={})
+        
+        first = document_utils.prepare_document(**common)
+        first['sop_metadata']['title'] = 'changed'
+        first['checksum'] = 'changed'
+        second = document_utils.prepare_document(**common)
+        
+        assert second['sop_metadata'] == {}
+        assert second['checksum'] == ''
+        assert list(second)[:8] == ['draft_id', 'draft_uuid', 'filename', 'sop_id',
+                                    'user_id', 'timestamp', 'form_data', 'status']
+
@@ -0,0 +1,152 @@
+# SPDX-FileCopyrightText: 2024-2025 Pathway Bio, Inc. <https://pwbio.ai>
+# SPDX-FileContributor: Kimberly Robasky
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for ELN access control based on SOP authorization config
+"""
+
+import dataclasses
+
+import pytest
+from unittest.mock import patch
+
+from rawscribe.utils.auth import User
+from rawscribe.utils.eln_access_control import ELNAccessControl
+
+
+def make_user(**overrides):
+    params = dict(
+        id="user-1",
+        email="jane@example.com",
+        username="jane",
+        name="Jane",
+        groups=["lab"],
+        permissions=["view:eln"],
+        is_admin=False,
+    )
+    params.update(overrides)
+    return User(**params)
+
+
+def make_sop(**permissions):
+    return {'metadata': {'eln_default_permissions': permissions}}
+
+
+class TestELNAccessControl:
+    """Test access decisions and authorization config caching"""
+    
+    def setup_method(self):
+        self.access = ELNAccessControl()
+    
+    def test_admin_and_public_access(self):
+        restricted = make_sop(required_permissions=['manage:eln'])
+        
+        assert self.access.can_access_eln(make_user(is_admin=True), {}, restricted)
+        assert self.access.can_access_eln(make_user(), {}, make_sop(public=True, required_permissions=['manage:eln']))
+        assert not self.access.can_access_eln(make_user(), {}, restricted)
+    
+    def test_allowed_users_and_groups(self):
+        user = make_user()
+        
+        assert self.access.can_access_eln(user, {}, make_sop(allowed_users=['jane@example.com'], required_permissions=['x']))
+        assert self.access.can_access_eln(user, {}, make_sop(allowed_groups=['lab'], required_permissions=['x']))
+        assert not self.access.can_access_eln(user, {}, make_sop(allowed_users=['bob'], allowed_groups=['other'], required_permissions=['x']))
+    
+    def test_allowed_user_lookups(self):
+        config = self.access._parse_authorization_config(
+            make_sop(allowed_users=['user-1', '*:admin']), 'eln_default_permissions'
+        )
+        
+        assert config.allowed_users_set == frozenset({'user-1', '*:admin'})
+        assert config.has_user_wildcard is True
+        assert self.access._check_allowed_users(make_user(), config)
+        assert self.access._check_allowed_users(make_user(id='other', username='other', email='o@x.com', is_admin=True), config)
+        assert not self.access._check_allowed_users(make_user(id='other', username='other', email='o@x.com'), config)
+    
+    def test_authorization_config_is_immutable(self):
+        config = self.access._parse_authorization_config(
+            make_sop(allowed_groups=['lab'], required_permissions=['x']), 'eln_default_permissions'
+        )
+        
+        assert config.allowed_groups == ('lab',)
+        assert not hasattr(config, '__dict__')
+        assert hash(config) == hash(self.access._parse_authorization_config(
+            make_sop(allowed_groups=['lab'], required_permissions=['x']), 'eln_default_permissions'
+        ))
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.public = True
+    
+    def test_filename_variable_groups(self):
+        sop = make_sop(filename_variable_access=['project_id'], required_permissions=['x'])
+        user = make_user(groups=['proj1'])
+        
+        assert self.access.can_access_eln(user, {'project_id': 'proj1'}, sop)
+        assert not self.access.can_access_eln(user, {'project_id': 'proj2'}, sop)
+    
+    def test_filter_parses_config_once(self):
+        sop = make_sop(filename_variable_access=['project_id'], required_permissions=['x'])
+        elns = [{'project_id': 'proj1'}, {'project_id': 'proj2'}, {'project_id': 'proj1'}]
+        user = make_user(groups=['proj1'])
+        
+        with patch.object(self.access, '_parse_authorization_config', wraps=self.access._parse_authorization_config) as mock_parse:
+            accessible = self.access.filter_accessible_elns(user, elns, sop)
+        
+        assert accessible == [elns[0], elns[2]]
+        assert mock_parse.call_count == 1
+    
+    def test_filter_fast_paths_skip_per_eln_checks(self):
+        elns = [{'project_id': 'proj1'}, {'project_id': 'proj2'}]
+        sop = make_sop(filename_variable_access=['project_id'], required_permissions=['x'])
+        
+        with patch.object(self.access, '_get_dynamic_groups') as mock_dynamic:
+            assert self.access.filter_accessible_elns(make_user(is_admin=True), elns, sop) == elns
+            assert self.access.filter_accessible_elns(make_user(), elns, make_sop(public=True)) == elns
+            assert self.access.filter_accessible_elns(make_user(permissions=['x']), elns, sop) == elns
+            mock_dynamic.assert_not_called()
+    
+    def test_filter_matches_per_eln_decisions(self):
+        sop = make_sop(filename_variable_access=['project_id'], required_permissions=['x'])
+        elns = [{'project_id': 'proj1'}, {'project_id': 'proj2'}, {}]
+        
+        for user in (make_user(groups=['proj2']), make_user(), make_user(permissions=['x'])):
+            expected = [eln for eln in elns if self.access.can_access_eln(user, eln, sop)]
+            assert self.access.filter_accessible_elns(user, elns, sop) == expected
+    
+    def test_parsed_config_cached_per_sop(self):
+        sop = make_sop(public=True)
+        
+        config = self.access._parse_authorization_config(sop, 'eln_default_permissions')
+        
+        assert self.access._parse_authorization_config(sop, 'eln_default_permissions') is config
+        assert self.access._parse_authorization_config(make_sop(public=True), 'eln_default_permissions') is not config
+        
+        self.access.clear_cache()
+        assert self.access._parse_authorization_config(sop, 'eln_default_permissions') is not config
+    
+    def test_malformed_inputs_denied(self):
+        user = make_user(is_admin=True)
+        
+        assert not self.access.can_access_eln(user, None, make_sop(public=True))
+        assert not self.access.can_access_eln(user, {}, None)
+        
+        # Malformed SOP config raises from the single check; batch callers deny everything
+        broken_sop = {'metadata': 'not-a-dict'}
+        with pytest.raises(AttributeError):
+            self.access.can_access_eln(make_user(), {}, broken_sop)
+        assert not self.access.can_import_prerequisite_eln(make_user(), {}, broken_sop, {})
+        assert self.access.filter_accessible_elns(make_user(), [{}], broken_sop) == []
+    
+    def test_filter_skips_malformed_elns(self):
+        sop = make_sop(filename_variable_access=['project_id'], required_permissions=['x'])
+        elns = [{'project_id': 'lab'}, None, 'bogus']
+        
+        assert self.access.filter_accessible_elns(make_user(), elns, sop) == [elns[0]]
+        assert self.access.filter_accessible_elns(make_user(is_admin=True), elns, sop) == [elns[0]]
+    
+    def test_dynamic_groups_skip_missing_and_empty_values(self):
+        eln = {'project_id': 'proj1', 'batch': 42, 'empty': ''}
+        
+        groups = self.access._get_dynamic_groups(eln, ['project_id', 'missing', 'empty', 'batch'])
+        
+        assert groups == ['proj1', '42']
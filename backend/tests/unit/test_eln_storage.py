@@ -22,6 +22,7 @@ import shutil
 from rawscribe.utils.storage_factory import StorageManager
 from rawscribe.utils.storage_base import StorageError, StorageNotFoundError, ImmutableStorageError
 from rawscribe.utils.metadata import ELNMetadata
+from rawscribe.utils import document_utils
 from rawscribe.utils.storage_s3 import S3JSONStorage
 from rawscribe.utils.storage_local import LocalJSONStorage
 from rawscribe.utils.config_types import StorageConfig
@@ -85,11 +86,11 @@ class TestS3StorageBackend:
             
             backend = S3JSONStorage(self.config, document_type="submissions")
             
-            with patch('rawscribe.utils.filename_generator.datetime') as mock_datetime:
-                mock_datetime.now.return_value = datetime(2024, 1, 15, 14, 30, 22, tzinfo=timezone.utc)
+            with patch('rawscribe.utils.filename_generator.time.gmtime') as mock_gmtime:
+                mock_gmtime.return_value = datetime(2024, 1, 15, 14, 30, 22, tzinfo=timezone.utc).utctimetuple()
                 
-                with patch('rawscribe.utils.filename_generator.uuid.uuid4') as mock_uuid:
-                    mock_uuid.return_value.__str__ = Mock(return_value='abcd1234-5678-90ab-cdef-1234567890ab')
+                with patch('rawscribe.utils.filename_generator.secrets.token_hex') as mock_uuid:
+                    mock_uuid.return_value = 'abcd1234'
                     
                     # Test ELN submission
                     _, metadata = await backend.save_document(
@@ -139,11 +140,11 @@ class TestS3StorageBackend:
                 Body='{"test": "data"}'
             )
             
-            with patch('rawscribe.utils.filename_generator.datetime') as mock_datetime:
-                mock_datetime.now.return_value = datetime(2024, 1, 15, 14, 30, 22, tzinfo=timezone.utc)
+            with patch('rawscribe.utils.filename_generator.time.gmtime') as mock_gmtime:
+                mock_gmtime.return_value = datetime(2024, 1, 15, 14, 30, 22, tzinfo=timezone.utc).utctimetuple()
                 
-                with patch('rawscribe.utils.filename_generator.uuid.uuid4') as mock_uuid:
-                    mock_uuid.return_value.__str__ = Mock(return_value='abcd1234-5678-90ab-cdef-1234567890ab')
+                with patch('rawscribe.utils.filename_generator.secrets.token_hex') as mock_uuid:
+                    mock_uuid.return_value = 'abcd1234'
                     
                     # Should fail due to existing file
                     with pytest.raises(ImmutableStorageError):
@@ -403,11 +404,11 @@ class TestLocalStorageBackend:
         """Test successful ELN submission to local storage"""
         backend = LocalJSONStorage(self.config, document_type="submissions")
         
-        with patch('rawscribe.utils.filename_generator.datetime') as mock_datetime:
-            mock_datetime.now.return_value = datetime(2024, 1, 15, 14, 30, 22, tzinfo=timezone.utc)
+        with patch('rawscribe.utils.filename_generator.time.gmtime') as mock_gmtime:
+            mock_gmtime.return_value = datetime(2024, 1, 15, 14, 30, 22, tzinfo=timezone.utc).utctimetuple()
             
-            with patch('rawscribe.utils.filename_generator.uuid.uuid4') as mock_uuid:
-                mock_uuid.return_value.__str__ = Mock(return_value='abcd1234-5678-90ab-cdef-1234567890ab')
+            with patch('rawscribe.utils.filename_generator.secrets.token_hex') as mock_uuid:
+                mock_uuid.return_value = 'abcd1234'
                 
                 # Test ELN submission
                 _, metadata = await backend.save_document(
@@ -439,6 +440,28 @@ class TestLocalStorageBackend:
                 assert stored_data['eln_uuid'] == 'abcd1234'
                 assert stored_data['form_data'] == self.sample_form_data
 
+    @pytest.mark.asyncio
+    async def test_save_encodes_form_data_once(self):
+        """Test the stored payload reuses the canonical form data bytes"""
+        backend = LocalJSONStorage(self.config, document_type="submissions")
+        form_data = {'b': 'ü', 'a': [1e16, None, {'form_data': None}]}
+        
+        with patch('rawscribe.utils.document_utils.canonicalize',
+                   wraps=document_utils.canonicalize) as spy:
+            _, metadata = await backend.save_document(
+                document_type="submissions", sop_id='SOP-001', user_id='test_user',
+                status='final', filename_variables=['proj_001'], data=form_data,
+                metadata_class=ELNMetadata, sop_metadata={'sop_id': 'SOP-001'}
+            )
+        
+        spy.assert_called_once_with(form_data)
+        
+        eln_file = Path(self.temp_dir) / 'eln' / 'submissions' / 'SOP-001' / metadata.filename
+        stored = eln_file.read_text(encoding='utf-8')
+        assert stored == document_utils.serialize_document(json.loads(stored))
+        assert json.loads(stored)['form_data'] == form_data
+        assert metadata.size_bytes == len(stored.encode('utf-8'))
+
     @pytest.mark.asyncio
     async def test_get_eln_success(self):
         """Test successful ELN retrieval from local storage"""
@@ -624,4 +647,60 @@ class TestStorageManager:
         assert result.eln_uuid is not None
         assert result.sop_id == 'SOP-001'
         assert result.user_id == 'test_user'
-        assert result.status == 'final' 
\ No newline at end of file
+        assert result.status == 'final' 
+
+class TestELNMetadataTimestamps:
+    """Test timestamp normalization on metadata construction"""
+    
+    def test_naive_timestamp_normalized_to_utc(self):
+        metadata = ELNMetadata.from_dict({
+            'eln_uuid': 'abc12345',
+            'filename': 'eln-sop1-user-20250101_000000-abc12345.json',
+            'sop_id': 'sop1',
+            'user_id': 'user',
+            'status': 'final',
+            'timestamp': '2025-01-01T00:00:00',
+        })
+        
+        assert metadata.timestamp == datetime(2025, 1, 1, tzinfo=timezone.utc)
+        assert metadata.timestamp.tzinfo is not None
+    
+    def test_mixed_timestamps_sort_directly(self):
+        naive = ELNMetadata('a', 'a.json', 'sop1', 'user', 'final', datetime(2025, 1, 2))
+        aware = ELNMetadata('b', 'b.json', 'sop1', 'user', 'final', datetime(2025, 1, 1, tzinfo=timezone.utc))
+        
+        items = sorted([aware, naive], key=lambda item: item.timestamp, reverse=True)
+        
+        assert items == [naive, aware]
+    
+    def test_iso_timestamp_follows_timestamp_changes(self):
+        metadata = ELNMetadata('a', 'a.json', 'sop1', 'user', 'final', datetime(2025, 1, 1))
+        
+        assert metadata.to_dict()['timestamp'] == '2025-01-01T00:00:00+00:00'
+        assert metadata.iso_timestamp is metadata.to_response_dict()['timestamp']
+        
+        metadata.update_timestamp(datetime(2025, 2, 1, tzinfo=timezone.utc))
+        assert metadata.to_dict()['timestamp'] == '2025-02-01T00:00:00+00:00'
+        
+        metadata.timestamp = datetime(2025, 3, 1, tzinfo=timezone.utc)
+        assert metadata.uuid == 'sop1-user-2025-03-01T00:00:00+00:00'
+
+
+
+class TestMetadataSize:
+    """Test payload size calculation on metadata creation"""
+    
+    def test_dict_size_matches_stored_document(self):
+        data = {'b': 'ü', 'a': [1, 2, {'c': None}]}
+        
+        metadata = ELNMetadata.create(
+            sop_id='sop1', user_id='user', eln_document=data,
+            eln_uuid='abc12345', filename='a.json', status='final'
+        )
+        
+        assert metadata.size_bytes == document_utils.calculate_document_size(data)
+        assert metadata.size_bytes == len(document_utils.serialize_document(data).encode('utf-8'))
+    
+    @pytest.mark.parametrize('text', ['', 'plain ascii', 'ü', 'naïve ☃ text'])
+    def test_str_size_counts_utf8_bytes(self, text):
+        assert ELNMetadata.calculate_size_bytes(text) == len(text.encode('utf-8'))
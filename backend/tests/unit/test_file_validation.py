@@ -7,11 +7,14 @@ Unit tests for file validation and security controls
 Tests file upload validation, MIME type detection, and field ID escaping
 """
 
+import asyncio
 import pytest
 import io
+import threading
+import mimetypes
 import os
 import sys
-from unittest.mock import MagicMock, AsyncMock
+from unittest.mock import MagicMock, AsyncMock, patch
 
 # Add backend to path
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -24,10 +27,17 @@ from rawscribe.utils.file_validation import (
     file_validator,
     escape_field_id,
     unescape_field_id,
-    parse_temp_filename_and_unescape
+    parse_temp_filename_and_unescape,
+    _TextSecurityScanner
 )
 from fastapi import UploadFile
 
+
+async def validate_content(validator, content, filename):
+    """Run content through the streaming validate_file path"""
+    return await validator.validate_file(UploadFile(filename=filename, file=io.BytesIO(content)))
+
+
 class TestFileValidator:
     """Test file validation functionality"""
 
@@ -69,7 +79,7 @@ class TestFileValidator:
         file_mock = MagicMock(spec=UploadFile)
         file_mock.filename = "test_document.txt"
         file_mock.size = len(content)
-        file_mock.read = AsyncMock(return_value=content)
+        file_mock.read = AsyncMock(side_effect=[content, b""])
         file_mock.seek = AsyncMock()
         
         # Should pass validation
@@ -117,6 +127,27 @@ class TestFileValidator:
         with pytest.raises(FileValidationError, match="too large"):
             await validator.validate_file(file_mock)
 
+    @pytest.mark.asyncio
+    async def test_validate_file_too_large_stops_reading(self):
+        """Test that an oversized upload without a declared size is not read to the end"""
+        validator = FileValidator()
+        bytes_read = 0
+        
+        async def endless_read(size=-1):
+            nonlocal bytes_read
+            bytes_read += size
+            return b"x" * size
+        
+        file_mock = MagicMock(spec=UploadFile)
+        file_mock.filename = "huge.txt"
+        file_mock.size = None
+        file_mock.read = endless_read
+        
+        with pytest.raises(FileValidationError, match="too large"):
+            await validator.validate_file(file_mock)
+        assert bytes_read <= validator.MAX_FILE_SIZE + validator.READ_CHUNK_SIZE
+        file_mock.seek.assert_awaited_with(0)
+
     @pytest.mark.asyncio
     async def test_validate_file_empty(self):
         """Test that empty files are rejected"""
@@ -156,7 +187,71 @@ class TestFileValidator:
         with pytest.raises(FileValidationError, match="Too many files"):
             await validator.validate_upload_batch(files)
 
-    @pytest.mark.asyncio 
+    @pytest.mark.asyncio
+    async def test_validate_upload_batch_reads_each_file_once(self):
+        """Test that batch validation reuses the size read during validation"""
+        validator = FileValidator()
+        
+        files = []
+        bytes_read = {}
+        for i in range(3):
+            file = UploadFile(filename=f"file_{i}.txt", file=io.BytesIO(b"hello world"))
+            
+            async def counting_read(size=-1, _read=file.read, _name=file.filename):
+                data = await _read(size)
+                bytes_read[_name] = bytes_read.get(_name, 0) + len(data)
+                return data
+            
+            file.read = counting_read
+            files.append(file)
+        
+        validated = await validator.validate_upload_batch(files)
+        
+        assert [name for _, _, name in validated] == ["file_0.txt", "file_1.txt", "file_2.txt"]
+        assert bytes_read == {f"file_{i}.txt": len(b"hello world") for i in range(3)}
+        
+        validator.MAX_TOTAL_UPLOAD_SIZE = 20
+        with pytest.raises(FileValidationError, match="Total upload size too large"):
+            await validator.validate_upload_batch(files)
+
+    @pytest.mark.asyncio
+    async def test_validate_upload_batch_concurrent(self):
+        """Test that batch files are validated concurrently, bounded, with errors in file order"""
+        validator = FileValidator()
+        active = 0
+        peak = 0
+        
+        def make_file(name, content, delay):
+            file = UploadFile(filename=name, file=io.BytesIO(content))
+            
+            async def slow_read(size=-1, _read=file.read):
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(delay)
+                active -= 1
+                return await _read(size)
+            
+            file.read = slow_read
+            return file
+        
+        files = [make_file(f"file_{i}.txt", b"hello world", 0.01) for i in range(8)]
+        validated = await validator.validate_upload_batch(files)
+        
+        assert [name for _, _, name in validated] == [f"file_{i}.txt" for i in range(8)]
+        assert 1 < peak <= validator.MAX_CONCURRENT_VALIDATIONS
+        
+        # The first failing file wins even if a later file fails sooner
+        files = [
+            make_file("ok.txt", b"hello world", 0),
+            make_file("slow.txt", b"MZ\x90\x00", 0.05),
+            make_file("fast.xyz", b"hello world", 0),
+        ]
+        with pytest.raises(FileValidationError) as exc_info:
+            await validator.validate_upload_batch(files)
+        assert exc_info.value.error_code == "EXECUTABLE_CONTENT"
+
+    @pytest.mark.asyncio
     async def test_security_executable_content_detection(self):
         """Test detection of executable content in files"""
         validator = FileValidator()
@@ -166,7 +261,7 @@ class TestFileValidator:
         file_mock = MagicMock(spec=UploadFile)
         file_mock.filename = "document.txt"  # Disguised as text
         file_mock.size = len(pe_content)
-        file_mock.read = AsyncMock(return_value=pe_content)
+        file_mock.read = AsyncMock(side_effect=[pe_content, b""])
         file_mock.seek = AsyncMock()
         
         with pytest.raises(FileValidationError, match="File contains executable content"):
@@ -182,12 +277,181 @@ class TestFileValidator:
         file_mock = MagicMock(spec=UploadFile)
         file_mock.filename = "innocent.txt"
         file_mock.size = len(malicious_content)
-        file_mock.read = AsyncMock(return_value=malicious_content)
+        file_mock.read = AsyncMock(side_effect=[malicious_content, b""])
         file_mock.seek = AsyncMock()
         
         with pytest.raises(FileValidationError, match="potentially unsafe content"):
             await validator.validate_file(file_mock)
 
+    @pytest.mark.asyncio
+    async def test_validate_file_streams_past_sniff_window(self):
+        """Test that size and text checks cover content beyond the sniffed head"""
+        validator = FileValidator()
+        
+        # Pattern straddles a read chunk boundary
+        padding = b"a" * (validator.SNIFF_SIZE + validator.READ_CHUNK_SIZE - 3)
+        content = padding + b"<script>" + b"b" * 100
+        file = UploadFile(filename="data.csv", file=io.BytesIO(content))
+        with pytest.raises(FileValidationError) as exc_info:
+            await validator.validate_file(file)
+        assert exc_info.value.details == {"pattern": "<script"}
+        
+        file = UploadFile(filename="data.csv", file=io.BytesIO(padding))
+        _, _, size = await validator._validate_file(file)
+        assert size == len(padding)
+        assert await file.read() == padding  # Pointer reset for the caller
+    
+    @pytest.mark.asyncio
+    async def test_validate_file_batches_text_scan(self):
+        """Test the text scan is fed in large batches rather than per read chunk"""
+        validator = FileValidator()
+        content = b"a" * (3 * validator.SCAN_BATCH_SIZE) + b"<script>"
+        fed = []
+        
+        scanner = validator._text_security_scanner()
+        def recording_feed(chunk):
+            fed.append(len(chunk))
+            _TextSecurityScanner.feed(scanner, chunk)
+        scanner.feed = recording_feed
+        
+        file = UploadFile(filename="data.csv", file=io.BytesIO(content))
+        with patch.object(validator, '_text_security_scanner', return_value=scanner):
+            with pytest.raises(FileValidationError, match="potentially unsafe content"):
+                await validator.validate_file(file)
+        
+        assert sum(fed) == len(content)
+        assert len(fed) <= 4  # instead of one per 64KB read (~48)
+    
+    @pytest.mark.asyncio
+    async def test_validate_file_runs_cpu_work_off_event_loop(self):
+        """Test MIME sniffing runs in executor threads"""
+        validator = FileValidator()
+        loop_thread = threading.current_thread()
+        threads = []
+        
+        detect = validator._detect_mime_type
+        def recording_detect(content, filename):
+            threads.append(threading.current_thread())
+            return detect(content, filename)
+        validator._detect_mime_type = recording_detect
+        
+        files = [UploadFile(filename=f"data_{i}.csv", file=io.BytesIO(b"a,b\n1,2\n")) for i in range(4)]
+        results = await asyncio.gather(*(validator.validate_file(f) for f in files))
+        
+        assert [name for _, name in results] == [f"data_{i}.csv" for i in range(4)]
+        assert threads and loop_thread not in threads
+
+    def test_text_scanner_handles_split_multibyte_sequences(self):
+        """Test chunked scanning matches a whole-buffer decode"""
+        validator = FileValidator()
+        content = "caf\u00e9 <SCR\u0130PT> K\u212aelvin docum\u00e9nt.cookie document.COOKIE".encode('utf-8')
+        expected = next(p for p in validator.SUSPICIOUS_PATTERNS
+                        if p in content.decode('utf-8', errors='ignore').lower())
+        
+        for size in range(1, 8):
+            scanner = validator._text_security_scanner()
+            for i in range(0, len(content), size):
+                scanner.feed(content[i:i + size])
+            assert scanner.pattern == expected
+
+    @pytest.mark.parametrize('content', [
+        b"\x7fELF\x02\x01\x01" + b"\x00" * 50,
+        b"\xfe\xed\xfa\xce" + b"\x00" * 50,
+        b"#!/bin/sh\necho hi\n",
+        b"#! /bin/bash\necho hi\n",
+        b"\xef\xbb\xbf#!/bin/sh\necho hi\n",
+        b"\n\n#!/bin/sh\necho hi\n",
+        b"name\nusage: #!/bin/sh in docs\n",
+        b"notes\n<?PHP system($_GET['c']); ?>\n",
+    ])
+    @pytest.mark.asyncio
+    async def test_executable_content_signatures(self, content):
+        """Test executable and script signatures are rejected"""
+        validator = FileValidator()
+        
+        with pytest.raises(FileValidationError, match="File contains executable content"):
+            await validate_content(validator, content, "notes.txt")
+    
+    @pytest.mark.asyncio
+    async def test_executable_signatures_anchored_at_start(self):
+        """Test magic numbers later in the head are not mistaken for executables"""
+        validator = FileValidator()
+        
+        await validate_content(validator, b"\x89PNG\r\n\x1a\n\x00MZ\x7fELF", "image.png")
+        await validate_content(validator, b"mzungu,count\n1,2\n", "data.csv")  # Magic numbers are case-sensitive
+        await validate_content(validator, b"x" * 1024 + b"<?php", "notes.txt")  # Only the first 1KB is checked
+        with pytest.raises(FileValidationError, match="File contains executable content"):
+            await validate_content(validator, b"x" * 1019 + b"<?php", "notes.txt")
+
+    @pytest.mark.parametrize('content, pattern', [
+        (b"a,b\n1,JavaScript:alert(1)\n", 'javascript:'),
+        ("caf\u00e9 <SCRIPT>x</script>".encode('utf-8'), '<script'),
+        (b"\xff\xfe onError=x", 'onerror='),
+    ])
+    @pytest.mark.asyncio
+    async def test_text_security_ascii_and_non_ascii(self, content, pattern):
+        """Test suspicious patterns are found case-insensitively with or without non-ASCII bytes"""
+        validator = FileValidator()
+        
+        with pytest.raises(FileValidationError) as exc_info:
+            await validate_content(validator, content, "data.csv")
+        assert exc_info.value.details == {"pattern": pattern}
+        
+        await validate_content(validator, b"plain,csv\n1,2\n", "data.csv")
+        await validate_content(validator, "caf\u00e9,cr\u00e8me\n".encode('utf-8'), "data.csv")
+
+    @pytest.mark.parametrize('content, expected', [
+        (b"%PDF-1.7\n", 'application/pdf'),
+        (b"\x89PNG\r\n\x1a\n\x00\x00", 'image/png'),
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", 'image/jpeg'),
+        (b"GIF89a\x01\x00", 'image/gif'),
+        (b"\x1f\x8b\x08\x00", 'application/gzip'),
+    ])
+    def test_mime_signature_fast_path(self, content, expected):
+        """Test well-known signatures are resolved without calling libmagic"""
+        validator = FileValidator()
+        validator.magic_mime = MagicMock()
+        
+        assert validator._detect_mime_type(content, 'upload.bin') == expected
+        validator.magic_mime.from_buffer.assert_not_called()
+        
+        validator.magic_mime.from_buffer.return_value = 'application/zip'
+        assert validator._detect_mime_type(b"PK\x03\x04", 'upload.zip') == 'application/zip'
+        validator.magic_mime.from_buffer.assert_called_once()
+
+    def test_magic_result_cached_per_head(self):
+        """Test libmagic runs once per distinct sniffed head"""
+        validator = FileValidator()
+        validator.magic_mime = MagicMock()
+        validator.magic_mime.from_buffer.side_effect = lambda content: 'text/csv'
+        
+        for _ in range(3):
+            assert validator._detect_mime_type(b"a,b\n1,2\n", 'data.csv') == 'text/csv'
+        validator._detect_mime_type(b"c,d\n3,4\n", 'data.csv')
+        assert validator.magic_mime.from_buffer.call_count == 2
+        
+        # Whole-file sniffs beyond the head window are not cached
+        large = b"x" * (validator.SNIFF_SIZE + 1)
+        validator._detect_mime_type(large, 'data.csv')
+        validator._detect_mime_type(large, 'data.csv')
+        assert validator.magic_mime.from_buffer.call_count == 4
+        
+        validator.MAGIC_CACHE_MAXSIZE = 2
+        validator._detect_mime_type(b"e,f\n", 'data.csv')
+        assert len(validator._magic_cache) == 2
+
+    @pytest.mark.parametrize('filename', [
+        'data.csv', 'Report.PDF', 'archive.tar.gz', 'backup.tgz', 'notes', '.bashrc',
+        '.tar.gz', 'a..gz', 'photo.final.JPG', 'unknown.xyz',
+    ])
+    def test_mime_fallback_matches_mimetypes(self, filename):
+        """Test the cached extension fallback agrees with mimetypes.guess_type"""
+        validator = FileValidator()
+        validator.magic_mime = None
+        
+        expected = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        assert validator._detect_mime_type(b"", filename) == expected
+
     def test_filename_sanitization(self):
         """Test filename sanitization"""
         validator = FileValidator()
@@ -198,6 +462,9 @@ class TestFileValidator:
         assert '<' not in sanitized
         assert '>' not in sanitized
         assert '|' not in sanitized
+        assert validator._sanitize_filename('a<b>c:d"e|f?g*h\0i.txt') == 'a_b_c_d_e_f_g_h_i.txt'
+        assert validator._sanitize_filename('C:\\Users\\me\\report.pdf') == 'report.pdf'
+        assert validator._sanitize_filename('..') == 'unnamed_file.bin'
         
         # Test path traversal
         traversal_filename = '../../etc/passwd'
@@ -209,6 +476,8 @@ class TestFileValidator:
         long_filename = 'x' * 300 + '.txt'
         sanitized = validator._sanitize_filename(long_filename)
         assert len(sanitized) <= 255
+        assert sanitized.endswith('.txt')
+        assert validator._sanitize_filename('.' + 'x' * 300) == '.' + 'x' * 254
 
 class TestFieldIdEscaping:
     """Test field ID escaping and unescaping functionality"""
@@ -34,6 +34,14 @@ class TestFileValidationErrors:
         assert error.details["extension"] == ".xyz"
         assert "allowed_extensions" in error.details
         assert len(error.details["allowed_extensions"]) > 0
+        assert error.details["allowed_extensions"] == sorted(file_validator.ALLOWED_EXTENSIONS)
+        assert ', '.join(sorted(file_validator.ALLOWED_EXTENSIONS)) in error.message
+        
+        # Callers get their own copy of the precomputed list
+        error.details["allowed_extensions"].clear()
+        with pytest.raises(FileValidationError) as exc_info:
+            await file_validator.validate_file(UploadFile(filename="test.xyz", file=io.BytesIO(content)))
+        assert exc_info.value.details["allowed_extensions"] == sorted(file_validator.ALLOWED_EXTENSIONS)
     
     @pytest.mark.asyncio
     async def test_file_too_large_error(self):
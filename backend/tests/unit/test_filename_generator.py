@@ -17,7 +17,11 @@ from rawscribe.utils.filename_generator import (
     FilenameGenerationError, 
     UUIDCollisionError
 )
-from rawscribe.utils.eln_filename_utils import parse_eln_filename, validate_eln_filename_format
+from rawscribe.utils.eln_filename_utils import (
+    parse_eln_filename,
+    parse_eln_filename_parts,
+    validate_eln_filename_format,
+)
 from rawscribe.utils.schema_utils import extract_filename_variables, normalize_filename_value
 
 class TestFilenameGenerator:
@@ -68,11 +72,11 @@ class TestFilenameGenerator:
 
     def test_generate_filename_basic(self):
         """Test basic filename generation"""
-        with patch('rawscribe.utils.filename_generator.datetime') as mock_datetime:
-            mock_datetime.now.return_value = datetime(2024, 1, 15, 14, 30, 22, tzinfo=timezone.utc)
+        with patch('rawscribe.utils.filename_generator.time.gmtime') as mock_gmtime:
+            mock_gmtime.return_value = datetime(2024, 1, 15, 14, 30, 22, tzinfo=timezone.utc).utctimetuple()
             
-            with patch('rawscribe.utils.filename_generator.uuid.uuid4') as mock_uuid:
-                mock_uuid.return_value.__str__ = lambda self: 'abcd1234-5678-90ab-cdef-1234567890ab'
+            with patch('rawscribe.utils.filename_generator.secrets.token_hex') as mock_uuid:
+                mock_uuid.return_value = 'abcd1234'
                 
                 filename = self.generator.generate_filename(
                     status='final',
@@ -85,11 +89,11 @@ class TestFilenameGenerator:
 
     def test_generate_filename_draft_status(self):
         """Test filename generation with draft status"""
-        with patch('rawscribe.utils.filename_generator.datetime') as mock_datetime:
-            mock_datetime.now.return_value = datetime(2024, 1, 15, 14, 30, 22, tzinfo=timezone.utc)
+        with patch('rawscribe.utils.filename_generator.time.gmtime') as mock_gmtime:
+            mock_gmtime.return_value = datetime(2024, 1, 15, 14, 30, 22, tzinfo=timezone.utc).utctimetuple()
             
-            with patch('rawscribe.utils.filename_generator.uuid.uuid4') as mock_uuid:
-                mock_uuid.return_value.__str__ = lambda self: 'abcd1234-5678-90ab-cdef-1234567890ab'
+            with patch('rawscribe.utils.filename_generator.secrets.token_hex') as mock_uuid:
+                mock_uuid.return_value = 'abcd1234'
                 
                 filename = self.generator.generate_filename(
                     status='draft',
@@ -100,6 +104,18 @@ class TestFilenameGenerator:
                 assert filename.startswith('draft-jane_smith-')
                 assert filename.endswith('.json')
 
+    def test_generate_filename_with_uuid(self):
+        """Test the UUID is returned alongside the filename it is embedded in"""
+        filename, file_uuid = self.generator.generate_filename_with_uuid(
+            status='final',
+            username='john_doe',
+            filename_variables=['proj_001']
+        )
+        
+        assert len(file_uuid) == 8
+        assert filename.endswith(f'-{file_uuid}.json')
+        assert parse_eln_filename(filename)['uuid'] == file_uuid
+
     def test_invalid_status(self):
         """Test error handling for invalid status"""
         with pytest.raises(FilenameGenerationError, match="Invalid status"):
@@ -127,10 +143,29 @@ class TestFilenameGenerator:
             result = normalize_filename_value(input_val)
             assert result == expected, f"Failed for input: {input_val}"
 
+    @pytest.mark.parametrize('value, expected', [
+        ('abcd1234', 'abcd1234'),
+        ('john_doe', 'john_doe'),
+        ('v1.2', 'v1.2'),
+        ('a' * 50, 'a' * 50),
+        ('a' * 51, 'a' * 50),
+        ('_lead', 'lead'),
+        ('a__b', 'a_b'),
+        ('Mixed', 'mixed'),
+        ('a b', 'a_b'),
+    ])
+    def test_normalize_filename_value_canonical_fast_path(self, value, expected):
+        """Test already-normalized values are returned as-is and others still normalized"""
+        result = normalize_filename_value(value)
+        
+        assert result == expected
+        if value == expected:
+            assert result is value
+
     def test_generate_timestamp(self):
         """Test timestamp generation format"""
-        with patch('rawscribe.utils.filename_generator.datetime') as mock_datetime:
-            mock_datetime.now.return_value = datetime(2024, 12, 31, 23, 59, 59, tzinfo=timezone.utc)
+        with patch('rawscribe.utils.filename_generator.time.gmtime') as mock_gmtime:
+            mock_gmtime.return_value = datetime(2024, 12, 31, 23, 59, 59, tzinfo=timezone.utc).utctimetuple()
             
             timestamp = self.generator._generate_timestamp()
             assert timestamp == '20241231_235959'
@@ -144,21 +179,21 @@ class TestFilenameGenerator:
             # First UUID collides, second doesn't
             return len(collision_check_calls) == 1
         
-        with patch('rawscribe.utils.filename_generator.uuid.uuid4') as mock_uuid:
-            # Mock uuid4 to return different UUIDs on subsequent calls
-            mock_uuid.side_effect = [
-                type('MockUUID', (), {'__str__': lambda self: 'collision-1234-5678-90ab-cdef12345678'})(),
-                type('MockUUID', (), {'__str__': lambda self: 'newuuid4-5678-90ab-cdef-123456789012'})()
-            ]
+        with patch('rawscribe.utils.filename_generator.secrets.token_hex') as mock_uuid:
+            # Return different UUIDs on subsequent calls
+            mock_uuid.side_effect = ['collisio', 'newuuid4']
             
             uuid_result = self.generator._generate_unique_uuid(
-                'final', 'test_user', ['var1', 'var2'], '20240115_143022',
+                'final-test_user-var1-var2-20240115_143022-',
                 mock_existing_checker
             )
             
-            # Should return second UUID after collision (first 8 chars)
+            # Should return second UUID after collision
             assert uuid_result == 'newuuid4'
-            assert len(collision_check_calls) >= 1
+            assert collision_check_calls == [
+                'final-test_user-var1-var2-20240115_143022-collisio.json',
+                'final-test_user-var1-var2-20240115_143022-newuuid4.json',
+            ]
 
     def test_uuid_collision_max_retries(self):
         """Test UUID collision handling with max retries exceeded"""
@@ -167,7 +202,7 @@ class TestFilenameGenerator:
         
         with pytest.raises(UUIDCollisionError, match="Unable to generate unique UUID"):
             self.generator._generate_unique_uuid(
-                'final', 'test_user', ['var1'], '20240115_143022',
+                'final-test_user-var1-20240115_143022-',
                 always_collides
             )
 
@@ -200,6 +235,19 @@ class TestFilenameGenerator:
         assert parsed['timestamp'] == '20240115_143022'
         assert parsed['uuid'] == 'uuid1234'
 
+    def test_parse_filename_cached_parts(self):
+        """Test cached tuple parsing and that dict results are independent copies"""
+        filename = 'final-john_doe-proj_001-pat_123-20240115_143022-abcd1234.json'
+        
+        parts = parse_eln_filename_parts(filename)
+        assert parts is parse_eln_filename_parts(filename)
+        assert parts.variables == ('proj_001', 'pat_123')
+        assert parts.uuid == 'abcd1234'
+        
+        parsed = parse_eln_filename(filename)
+        parsed['variables'].append('mutated')
+        assert parse_eln_filename(filename)['variables'] == ['proj_001', 'pat_123']
+
     def test_parse_filename_invalid_extension(self):
         """Test parsing filename with invalid extension"""
         with pytest.raises(FilenameGenerationError, match="Invalid filename extension"):
@@ -360,6 +408,29 @@ class TestFilenameGenerator:
         
         assert variables == []
 
+    def test_filename_fields_keep_schema_order_and_depth(self):
+        """Test equal orders keep pre-order schema order, and deep nesting is handled"""
+        def field(field_id, order, children=()):
+            return {
+                'id': field_id,
+                'type': 'string',
+                'children': [{'filename_component': True, 'order': order}, *children]
+            }
+        
+        fields = [field('a', 1, [field('b', 1)]), field('c', 1)]
+        
+        deep = field('deepest', 2)
+        for i in range(2000):
+            deep = {'id': f'group_{i}', 'type': 'group', 'children': [deep]}
+        fields.append(deep)
+        
+        variables = extract_filename_variables(
+            {'a': 'A', 'b': 'B', 'c': 'C', 'deepest': 'D'},
+            fields
+        )
+        
+        assert variables == ['a', 'b', 'c', 'd']
+
     def test_special_characters_in_values(self):
         """Test handling of special characters in field values"""
         test_data = {
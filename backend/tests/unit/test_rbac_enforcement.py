@@ -60,6 +60,15 @@ class TestCanSubmit:
         )
         assert can_submit(user, "sop1") is True
         assert can_submit(user, "sop2") is False
+    
+    def test_partial_wildcard_permissions(self):
+        user = User(
+            id="user1", email="user@test.com", username="user", name="User",
+            groups=["custom"], permissions=["submit:S*", "dra*"]
+        )
+        assert can_submit(user) is True  # Covers "submit:SOP*"
+        assert can_manage_drafts(user, "delete") is True
+        assert can_view_data(user, "own") is False
 
 
 class TestRequireSubmitPermission:
@@ -214,6 +223,22 @@ class TestFilterViewableData:
         ]
         filtered = filter_viewable_data(user, data)
         assert len(filtered) == 3
+    
+    def test_filter_matches_can_view_user_data(self):
+        users = [
+            User(id="user1", email="user@test.com", username="alias1", name="User",
+                 groups=["researcher"], permissions=["view:own"]),
+            User(id="user1", email="user@test.com", username="alias1", name="User",
+                 groups=["researcher"], permissions=["view:group"]),
+        ]
+        data = [
+            {"user_id": "user1"}, {"user_id": "alias1"}, {"user_id": "user2"},
+            {"user_id": ""}, {"user_id": None}, {"content": "no owner"}
+        ]
+        for user in users:
+            expected = [item for item in data
+                        if item.get("user_id") and can_view_user_data(user, item["user_id"])]
+            assert filter_viewable_data(user, data) == expected
 
 
 class TestRoleUtilities:
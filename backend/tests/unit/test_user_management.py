@@ -0,0 +1,40 @@
+# SPDX-FileCopyrightText: 2024-2025 Pathway Bio, Inc. <https://pwbio.ai>
+# SPDX-FileContributor: Kimberly Robasky
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for user management route permission checks
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from rawscribe.utils.auth import User
+from rawscribe.routes.user_management import require_user_manager
+
+
+def make_user(permissions):
+    return User(
+        id="u1",
+        email="u1@example.com",
+        username="u1",
+        name="User One",
+        permissions=permissions
+    )
+
+
+class TestRequireUserManager:
+    """Test the manage:users dependency"""
+    
+    @pytest.mark.parametrize("permissions", [["*"], ["manage:users", "view:own"]])
+    def test_allows_user_managers(self, permissions):
+        user = make_user(permissions)
+        assert require_user_manager(current_user=user) is user
+    
+    @pytest.mark.parametrize("user", [None, make_user(["submit:*", "view:own"])])
+    def test_rejects_others(self, user):
+        with pytest.raises(HTTPException) as exc_info:
+            require_user_manager(current_user=user)
+        
+        assert exc_info.value.status_code == 403
+        assert exc_info.value.detail == "Requires manage:users permission"